@@ -3,38 +3,76 @@
 # ---     Bilal Emiroglu 2025    ---
 # ---                            ---
 # --- ************************** ---
+import boot_profile
+boot_profile.mark("start")
 import network
 import usocket
 import time
 import ujson
-import ntptime
 import machine
-import re
-import gc
+import sys
 import errno
 import os
+import struct
+import instrumentation
+from prayer_schedule import PrayerSchedule, ScheduleCache, VAKIT_SAYISI, VAKIT_ADLARI, VAKIT_ADLARI_ASCII
+from prayer_schedule import pack_schedule, unpack_schedule
+from refresh_scheduler import RefreshScheduler, FETCH_TODAY, date_key, next_date_key
+from timing import Deadline, Interval
+from memory_manager import MemoryManager
+# Kurulum sunucusu, NTP istemcisi ve RSS ayrıştırıcısı ilk kullanımda yüklenir (bkz. release_modules)
+boot_profile.mark("imports")
 
 # --- Sabitler ve Global Ayarlar ---
 CONFIG_FILE = "config.json"
 AP_MODE_SSID = "NamazVaktiSetup"
 NTP_SERVER = "pool.ntp.org"
+FIRMWARE_VERSION = 5 # Toplu yapılandırmada keşif yanıtıyla bildirilir
 
 # Varsayılan yapılandırma ayarları
 DEFAULT_CONFIG = {
     "ssid": "Bilal",
     "password": "12345678",
     "rss_url": "http://namazvakti.com/DailyRSS.php?cityID=16741",
-    "timezone_offset": 3 # Türkiye için varsayılan GMT+3
+    "timezone_offset": 3, # Türkiye için varsayılan GMT+3
+    "large_countdown": False, # True ise kalan süre alt iki satırda büyük rakamlarla gösterilir
+    "seconds_countdown": False, # True ise alt satırdaki kalan süre saniyeli (SS:DD:ss) gösterilir
+    "double_buffer": False, # True ise çizim arka tampona yapılır, ekran aktarımı ayrı thread'de beklemeden yapılır
+    "net_worker": False, # True ise Wi-Fi/NTP/RSS işleri ayrı bir thread'de yapılır, ekran bloklanmaz
+    "power_save": False, # True ise senkronlar arasında radyo kapatılır, ekran vakitlere göre kısılır/gece kapatılır
+    "prayer_pin": -1, # Vakit girdiğinde darbe verilecek GPIO (buzzer/röle); -1 ise kapalı
+    "prayer_pulse_ms": 500, # GPIO darbe süresi
+    "prayer_invert_seconds": 0, # Vakit girdiğinde ekranın ters çevrileceği süre; 0 ise kapalı
+    "cities": [], # Çoklu şehir: [{"name": "Ankara", "rss_url": "..."}]; boşsa sadece rss_url kullanılır
+    "city_rotate_seconds": 10, # Çoklu şehirde ekranın bir sonraki şehre geçme süresi
+    "rss_prefetch": False, # True ise 23:30'da yarının vakitleri önceden çekilir (kaynak yarını gece yarısından önce yayınlıyorsa)
+    "sources": [], # Yedek kaynaklar: [{"url": "...", "parser": "auto"}]; rss_url ile yarıştırılır (parser: auto, rss, rss_regex, json, csv)
+    "watchdog_seconds": 90, # Donanım watchdog süresi; 0 ise watchdog kapalı
+    "fleet_key": "", # Toplu UDP yapılandırması için paylaşılan anahtar; boşsa kapalı
+    "fleet_counter": 0 # Kabul edilen son toplu yapılandırma sayacı (tekrar gönderime karşı)
 }
 
-# RSS ve NTP güncelleme aralıkları (sabit olarak tanımlandı, kolayca değiştirilebilir)
-RSS_UPDATE_INTERVAL_SECONDS = 21600 # 6 saat
+RSS_TIMEOUT_SECONDS = 15
+FEED_RACE_STAGGER_MS = 1500 # Yedek kaynağa istek atmadan önce öncekine tanınan süre
+# Kaynak başına gecikme/başarı istatistikleri (en hızlı kaynak önce denenir). Yenilemeler arasında korunması için
+# düz sözlük olarak burada tutulur; feed_race modülü her yenilemeden sonra bellekten çıkarılır.
+feed_source_stats = {}
+
+# NTP güncelleme aralığı (sabit olarak tanımlandı, kolayca değiştirilebilir)
+# RSS güncellemesi gün dönümüne göre RefreshScheduler tarafından zamanlanır
 NTP_UPDATE_INTERVAL_SECONDS = 21600 # 6 saat
+FRAGMENTATION_CHECK_SECONDS = 3600 # Heap parçalanması saatte bir ölçülür
+
+# Her döngüde toplama yapmak yerine gc.threshold ayırma hızına göre ayarlanır,
+# büyük işlerden (RSS çekme, sayfa çizimi) önce memory.before_large() ile toplanır
+memory = MemoryManager()
 
 # --- OLED Ekran Ayarları ve Fonksiyonları ---
 WIDTH = 128
 HEIGHT = 64
 oled = None # Global oled değişkenini varsayılan olarak None yapıyoruz
+bitmap_cache = None # Sabit satırlar ve büyük rakamlar için bitmap önbelleği (sadece gerçek OLED'de)
+BITMAP_CACHE_BUDGET_BYTES = 2048 # Önbelleğin RAM'de kaplayabileceği en fazla bayt
 
 class FallbackMockOLED:
     """OLED kütüphanesi veya donanım hatası durumunda kullanılan sahte OLED sınıfı."""
@@ -46,10 +84,24 @@ class FallbackMockOLED:
         pass
     def clear_line(self, line): # Yeni eklenen metod
         pass
+    def rect(self, x, y, w, h, color, fill=False):
+        pass
+    def blit(self, fb, x, y):
+        pass
+    def show_region(self, x0, x1, page0, page1):
+        pass
+    def contrast(self, value):
+        pass
+    def poweroff(self):
+        pass
+    def poweron(self):
+        pass
+    def invert(self, invert):
+        pass
 
 def init_oled():
     """OLED ekranı başlatır ve global 'oled' değişkenini ayarlar."""
-    global oled
+    global oled, bitmap_cache
     try:
         from machine import Pin, I2C
         from ssd1306 import SSD1306_I2C
@@ -81,6 +133,24 @@ def init_oled():
         
         SSD1306_I2C.clear_line = _clear_line 
 
+        # Sadece verilen sütun ve sayfa (8 piksellik satır) aralığını panele gönderir
+        def _show_region(self, x0, x1, page0, page1):
+            self.write_cmd(0x21) # SET_COL_ADDR
+            self.write_cmd(x0)
+            self.write_cmd(x1)
+            self.write_cmd(0x22) # SET_PAGE_ADDR
+            self.write_cmd(page0)
+            self.write_cmd(page1)
+            buffer = memoryview(self.buffer)
+            for page in range(page0, page1 + 1):
+                start = page * self.width
+                self.write_data(buffer[start + x0:start + x1 + 1])
+
+        SSD1306_I2C.show_region = _show_region
+
+        from bitmap_cache import BitmapCache
+        bitmap_cache = BitmapCache(BITMAP_CACHE_BUDGET_BYTES)
+
     except ImportError as e:
         print("HATA: 'ssd1306' kütüphanesi bulunamadı veya içe aktarma hatası.")
         print("Lütfen https://github.com/micropython/micropython-lib/tree/master/micropython/drivers/display/ssd1306 adresinden indirin ve cihazınıza yükleyin.")
@@ -104,8 +174,23 @@ def init_oled():
         oled = FallbackMockOLED()
         print("OLED başlatma hatası nedeniyle geçici Mock OLED kullanılıyor.")
 
-# OLED'i global olarak başlat
-init_oled()
+def enable_double_buffer():
+    """Gerçek OLED'i çift tamponlu sarmalayıcıya alır; oled.show() çağrıları artık I2C aktarımını beklemez."""
+    global oled
+    if oled is None or isinstance(oled, FallbackMockOLED) or hasattr(oled, "back"):
+        return
+    try:
+        from display_buffer import DoubleBufferedDisplay
+        oled = DoubleBufferedDisplay(oled)
+        print("Çift tamponlu ekran etkin.")
+    except Exception as e:
+        print("Çift tamponlu ekran başlatılamadı: %s" % e)
+
+def release_modules(*names):
+    """Nadiren kullanılan modülleri sys.modules'tan çıkarıp belleklerini serbest bırakır; sonraki kullanımda yeniden yüklenir."""
+    for name in names:
+        sys.modules.pop(name, None)
+    memory.collect()
 
 def display_message(message, line, clear_screen=False, show_now=True):
     """
@@ -115,6 +200,8 @@ def display_message(message, line, clear_screen=False, show_now=True):
     """
     if oled is None:
         return
+    if clear_screen or line == COUNTDOWN_LINE:
+        invalidate_countdown()
     try:
         if clear_screen:
             oled.fill(0)
@@ -132,9 +219,34 @@ def display_message(message, line, clear_screen=False, show_now=True):
     except Exception as e:
         print("Ekran güncelleme hatası (display_message): %s (Mesaj: '%s', Satır: %d)" % (e, message, line))
 
+def display_cached_line(message, line, show_now=True):
+    """
+    Sabit metinleri (vakit satırları, etiketler) önbellekten blit ederek yazdırır.
+    Önbellek yoksa (Mock OLED) normal display_message yoluna düşer.
+    """
+    if bitmap_cache is None:
+        display_message(message, line, show_now=show_now)
+        return
+    try:
+        bitmap_cache.draw_line(oled, message, line, WIDTH)
+        if show_now:
+            oled.show()
+    except Exception as e:
+        print("Ekran güncelleme hatası (display_cached_line): %s (Mesaj: '%s', Satır: %d)" % (e, message, line))
+
+def silent_display(message, line, clear_screen=False, show_now=True):
+    """Ekrana dokunmayan display_message yerine geçer (ekran thread'i dışından çağrılar için)."""
+    pass
+
 def reset():
     print("Cihaz yeniden başlatılıyor...")
     display_message("Yeniden baslatiliyor...", 7, clear_screen=True)
+    # Bilinçli yeniden başlatmada (örn: yeni ayarlar) eski durum özeti kullanılmamalı
+    try:
+        from warm_start import clear_snapshot
+        clear_snapshot()
+    except Exception as e:
+        print("RTC durum özeti silinemedi: %s" % e)
     time.sleep(2)
     machine.reset()
 
@@ -168,13 +280,28 @@ def unquote_plus_custom(s):
             decoded_s += '%' + part
     return decoded_s
 
+# --- DNS Önbelleği (RSS, NTP ve diğer HTTP istemcileri ortak kullanır) ---
+dns_cache = None
+
+def get_dns_cache():
+    """Paylaşılan DNS önbelleğini ilk kullanımda oluşturur ve döndürür."""
+    global dns_cache
+    if dns_cache is None:
+        from dns_cache import DnsCache
+        dns_cache = DnsCache()
+    return dns_cache
+
 # --- NTP Zaman Senkronizasyonu ---
-def set_time_from_ntp(timezone_offset):
-    """NTP sunucusundan zamanı senkronize eder ve RTC'ye kaydeder."""
+def set_time_from_ntp(timezone_offset, notify=display_message):
+    """
+    NTP sunucusundan zamanı senkronize eder ve RTC'ye kaydeder.
+    notify: Ekran mesajları için kullanılan fonksiyon (ağ işçisinde silent_display verilir).
+    """
     try:
-        display_message("Zaman Ayarlaniyor...", 0, clear_screen=True, show_now=True)
+        import ntptime
+        notify("Zaman Ayarlaniyor...", 0, clear_screen=True, show_now=True)
         print("NTP sunucusundan zaman alınıyor: %s" % NTP_SERVER)
-        ntptime.host = NTP_SERVER
+        ntptime.host = get_dns_cache().resolve_ip(NTP_SERVER)
         ntptime.settime()
         
         rtc = machine.RTC()
@@ -190,25 +317,27 @@ def set_time_from_ntp(timezone_offset):
                       local_time_tuple[3], local_time_tuple[4], local_time_tuple[5], 0))
         
         print("NTP ile zaman ayarlandı. Mevcut zaman: %s" % str(time.localtime()))
-        display_message("Zaman: %02d:%02d" % (time.localtime()[3], time.localtime()[4]), 0, show_now=True)
+        notify("Zaman: %02d:%02d" % (time.localtime()[3], time.localtime()[4]), 0, show_now=True)
         return True
     except OSError as e:
         if e.args[0] == errno.ETIMEDOUT:
             print("NTP zaman aşımı hatası: %s" % e)
-            display_message("NTP Zamani Doldu!", 4, show_now=True)
+            notify("NTP Zamani Doldu!", 4, show_now=True)
         elif e.args[0] == -2: # Bu genellikle "address not available" veya "host not found" hatasıdır
             print("NTP sunucusuna bağlanılamadı/ulaşılamadı: %s" % e)
-            display_message("NTP Sunucu Hata!", 4, show_now=True)
+            notify("NTP Sunucu Hata!", 4, show_now=True)
         else:
             print("NTP senkronizasyon hatası: %s - %s" % (type(e).__name__, e.args[0]))
-            display_message("NTP Hatasi: %s" % e.args[0], 4, show_now=True)
+            notify("NTP Hatasi: %s" % e.args[0], 4, show_now=True)
         time.sleep(2)
         return False
     except Exception as e:
         print("NTP senkronizasyon hatası (genel): %s - %s" % (type(e).__name__, e))
-        display_message("NTP Hata! %s" % type(e).__name__, 4, show_now=True)
+        notify("NTP Hata! %s" % type(e).__name__, 4, show_now=True)
         time.sleep(2)
         return False
+    finally:
+        release_modules("ntptime") # 6 saatte bir kullanılır, arada RAM'de tutulmaz
 
 # --- RSS Verisi Çekme ve İşleme ile İlgili Fonksiyonlar ve Sabitler ---
 MONTH_ABBREVIATIONS = {
@@ -217,21 +346,14 @@ MONTH_ABBREVIATIONS = {
     "Eylül": "Eyl", "Ekim": "Eki", "Kasım": "Kas", "Aralık": "Ara"
 }
 
+MONTH_NAMES = ("Ocak", "Şubat", "Mart", "Nisan", "Mayıs", "Haziran",
+               "Temmuz", "Ağustos", "Eylül", "Ekim", "Kasım", "Aralık")
+
 DAY_ABBREVIATIONS = {
     "Pazartesi": "Pzt", "Salı": "Sal", "Çarşamba": "Car", "Perşembe": "Per", 
     "Cuma": "Cum", "Cumartesi": "Cmt", "Pazar": "Paz"
 }
 
-def unescape_html_entities(text):
-    """HTML varlıklarını (örn: &lt;) gerçek karakterlere dönüştürür."""
-    text = text.replace("&lt;", "<")
-    text = text.replace("&gt;", ">")
-    text = text.replace("&amp;", "&")
-    text = text.replace("&quot;", '"')
-    text = text.replace("&apos;", "'")
-    text = text.replace("&nbsp;", " ")
-    return text
-
 def format_date_for_display(date_string):
     """RSS'ten gelen tarih stringini OLED'e uygun kısaltılmış formata çevirir."""
     parts = date_string.replace(',', '').split(' ')
@@ -253,235 +375,252 @@ def format_date_for_display(date_string):
         return formatted[:WIDTH // 8]
     return convert_turkish_chars(date_string)[:WIDTH // 8]
 
-def get_namaz_vakitleri(rss_url):
-    """Belirtilen RSS URL'sinden namaz vakitlerini çeker ve ayrıştırır."""
-    display_message("Veri Cekiliyor...", 0, clear_screen=True, show_now=True)
+def display_schedule(schedule, large_countdown=False, title=None):
+    """
+    Vakit tablosunu ekrana çizer.
+    large_countdown: True ise alt iki satır büyük sayaca ayrılır, tarih satırı gösterilmez.
+    title: İlk satırda tarih yerine gösterilecek metin (örn: şehir adı ve tarih).
+    """
+    if large_countdown:
+        # Büyük sayaç 6. ve 7. satırları kullanır, vakitler 0. satırdan başlar
+        oled.fill(0)
+        target_line = 0
+        last_line = HEIGHT // 8 - 2
+    else:
+        display_message(title or schedule.title, 0, clear_screen=True, show_now=False)
+        target_line = 1
+        last_line = HEIGHT // 8
+
+    target_name_width = 7
+    for index in range(VAKIT_SAYISI):
+        if not schedule.is_set(index):
+            continue
+        if target_line >= last_line:
+            break
+        padded_name = VAKIT_ADLARI_ASCII[index]
+        padded_name += " " * (target_name_width - len(padded_name))
+        display_cached_line("%s: %s" % (padded_name, schedule.time_str(index)), target_line, show_now=False)
+        target_line += 1
+    oled.show()
+
+def parse_feed_date(date_string):
+    """
+    Kaynak başlığındaki tarihi date_key'e çevirir, çözülemezse 0 döndürür.
+    RSS: '19 Ekim 2026 Pazartesi'; JSON/CSV sağlayıcıları: '2026-10-19' veya '19.10.2026'.
+    """
+    parts = date_string.replace(',', '').split(' ')
+    if len(parts) >= 3 and parts[0].isdigit() and parts[2].isdigit() and parts[1] in MONTH_NAMES:
+        return date_key(int(parts[2]), MONTH_NAMES.index(parts[1]) + 1, int(parts[0]))
+    numbers = parts[0].replace('.', '-').split('-')
+    if len(numbers) == 3 and numbers[0].isdigit() and numbers[1].isdigit() and numbers[2].isdigit():
+        if len(numbers[0]) == 4:
+            return date_key(int(numbers[0]), int(numbers[1]), int(numbers[2]))
+        return date_key(int(numbers[2]), int(numbers[1]), int(numbers[0]))
+    return 0
+
+def local_date_info():
+    """RTC'deki yerel zamana göre (bugünün anahtarı, yarının anahtarı, günün dakikası) döndürür."""
+    rtc_datetime = machine.RTC().datetime()
+    year, month, day = rtc_datetime[0], rtc_datetime[1], rtc_datetime[2]
+    return date_key(year, month, day), next_date_key(year, month, day), rtc_datetime[4] * 60 + rtc_datetime[5]
+
+def get_namaz_vakitleri(rss_url, notify=display_message, client=None):
+    """
+    Belirtilen RSS URL'sinden namaz vakitlerini çeker ve ayrıştırır.
+    (başarı, PrayerSchedule veya None) döndürür. Tabloyu çizmek çağıranın işidir.
+    notify: Ekran mesajları için kullanılan fonksiyon (ağ işçisinde silent_display verilir).
+    client: Paylaşılan KeepAliveClient; verilmezse bu istek için geçici bir bağlantı açılır.
+    """
+    notify("Veri Cekiliyor...", 0, clear_screen=True, show_now=True)
     print("RSS verisi çekiliyor: %s" % rss_url)
     
     display_date_time = "Tarih Yok"
-    vakitler_map = {}
+    schedule = PrayerSchedule()
+    own_client = client is None
 
+    from feed_parsers import parse_auto
+    from http_client import KeepAliveClient
     try:
-        import urequests
-        response = urequests.get(rss_url, timeout=15)
-        if response.status_code == 200:
-            rss_content = response.text
-            response.close()
-            gc.collect()
-
-            item_and_title_and_description_match = re.search(r"<item>.*?<title>(.*?)</title>.*?<description>([\s\S]*?)</description>.*?</item>", rss_content)
-            
-            if item_and_title_and_description_match:
-                full_title_string = item_and_title_and_description_match.group(1).strip()
+        if own_client:
+            client = KeepAliveClient(timeout=RSS_TIMEOUT_SECONDS, resolver=get_dns_cache().resolve)
+        status_code, rss_content = client.get(rss_url)
+        if status_code == 200:
+            # Ayrıştırıcı içeriğe göre seçilir; RSS ham baytlar üzerinde taranır, yanıtın tamamı string'e çevrilmez
+            full_title_string = parse_auto(rss_content, schedule)
+            rss_content = None
+            if full_title_string is not None:
                 display_date_time = format_date_for_display(full_title_string)
-                raw_description_text = item_and_title_and_description_match.group(2)
-                
-                decoded_text = unescape_html_entities(raw_description_text)
-                cleaned_text = re.sub(r'<br\s*/?>|<p>|&lt;br\s*/?&gt;', '', decoded_text).strip()
-                cleaned_text = re.sub(r'\s+', ' ', cleaned_text).strip()
-                
-                print("Temizlenmiş Description: '%s'" % cleaned_text)
-
-                if not cleaned_text:
-                    print("Hata: Temizlenmiş description metni boş.")
-                    display_message("Bos Desc. Hatasi", 2, show_now=True)
-                    return False, []
-
-                # --- Padding (Boşluk Doldurma) Fonksiyonu ---
-                def custom_ljust(s, width, fillchar=' '):
-                    if len(s) >= width:
-                        return s
-                    return s + (fillchar * (width - len(s)))
-                # --- Padding Fonksiyonu Sonu ---
-
-                parts = cleaned_text.split(' ')
-                
-                # Olası vakit adları ve bunların eşleştirme için küçük harfli/dönüştürülmüş halleri
-                # ve ekranda gösterilecek orijinal halleri
-                namaz_vakitleri_mapping = {
-                    "imsak": "İmsâk",
-                    "gunes": "Güneş",
-                    "ogle": "Öğle",
-                    "ikindi": "İkindi",
-                    "aksam": "Akşam",
-                    "yatsi": "Yatsı"
-                }
-                
-                i = 0
-                while i < len(parts):
-                    # Kelimeyi küçük harfe çevir ve Türkçe karakterleri dönüştürerek kontrol et
-                    normalized_part = convert_turkish_chars(parts[i]).lower()
-                    
-                    found_original_vakit_name = None
-                    for key_name, display_name in namaz_vakitleri_mapping.items():
-                        if normalized_part == key_name:
-                            found_original_vakit_name = display_name
-                            break
-                    
-                    if found_original_vakit_name:
-                        # Vakit adı bulundu, şimdi saati bulmaya çalış
-                        # "İmsâk : 03:17" veya "Güneş 05:34" formatlarını desteklemek için
-                        saat = None
-                        if i + 1 < len(parts):
-                            if parts[i+1] == ":" and i + 2 < len(parts): # "Vakit : HH:MM"
-                                potential_saat = parts[i+2]
-                                if len(potential_saat) == 5 and potential_saat[2] == ':' and potential_saat[:2].isdigit() and potential_saat[3:].isdigit():
-                                    saat = potential_saat
-                                    i += 3 # Vakit, :, Saat geçti
-                                else:
-                                    i += 1 # : veya saat uygun değil, bir sonraki kelimeye geç
-                            else: # "Vakit HH:MM"
-                                potential_saat = parts[i+1]
-                                if len(potential_saat) == 5 and potential_saat[2] == ':' and potential_saat[:2].isdigit() and potential_saat[3:].isdigit():
-                                    saat = potential_saat
-                                    i += 2 # Vakit, Saat geçti
-                                else:
-                                    i += 1 # Saat uygun değil, bir sonraki kelimeye geç
-                        else: # Vakit adından sonra başka kelime yok
-                            i += 1
-
-                        if saat:
-                            vakitler_map[found_original_vakit_name] = saat
-                            continue # Saati bulduk, bir sonraki kelimeye devam et
-                    
-                    i += 1 # Eğer vakit adı veya saat bulunamazsa bir sonraki kelimeye geç
-
-                found_vakitler_display = []
-                found_vakitler_for_calc = []
-                ordered_vakit_names = ["İmsâk", "Güneş", "Öğle", "İkindi", "Akşam", "Yatsı"]
-                
-                target_name_width = 7
-                
-                for name in ordered_vakit_names:
-                    if name in vakitler_map:
-                        display_saat_str = vakitler_map[name]
-                        
-                        converted_name = convert_turkish_chars(name)
-                        padded_name = custom_ljust(converted_name, target_name_width)
-                        
-                        formatted_vakit = "%s: %s" % (padded_name, display_saat_str)
-                        found_vakitler_display.append(formatted_vakit)
-                        
-                        found_vakitler_for_calc.append((name, display_saat_str))
-                        
-                if found_vakitler_display:
-                    display_message(display_date_time, 0, clear_screen=True, show_now=False)
-                    
-                    y_start_line = 1 
-                    for i, vakit in enumerate(found_vakitler_display):
-                        target_line = y_start_line + i
-                        if target_line < HEIGHT // 8:
-                            display_message(vakit, target_line, clear_screen=False, show_now=False)
-                        else:
-                            break
-                    oled.show()
-                    return True, found_vakitler_for_calc
+
+                if schedule.count():
+                    schedule.title = display_date_time
+                    schedule.date = parse_feed_date(full_title_string)
+                    return True, schedule
                 else:
-                    print("Hata: Hiçbir namaz vakti bulunamadı (String işleme sonrası).")
-                    display_message("Vakitler bulunamadi.", 2, show_now=True)
-                    return False, []
+                    print("Hata: Hiçbir namaz vakti bulunamadı.")
+                    notify("Vakitler bulunamadi.", 2, show_now=True)
+                    return False, None
             else:
-                print("Hata: RSS 'item' etiketi veya içindeki 'title' ve 'description' bulunamadı.")
-                display_message("RSS Yapisi Hata.", 2, show_now=True)
-                return False, []
+                print("Hata: Yanıt biçimi tanınmadı (RSS 'item'/'title'/'description', JSON veya CSV).")
+                notify("RSS Yapisi Hata.", 2, show_now=True)
+                return False, None
         else:
-            print("HTTP Hatası: %d" % response.status_code)
-            display_message("HTTP Hata: %d" % response.status_code, 2, show_now=True)
-            return False, []
-    except ImportError:
-        print("urequests kütüphanesi bulunamadı. Lütfen yükleyin.")
-        display_message("Urequests Eksik!", 2, show_now=True)
-        return False, []
+            print("HTTP Hatası: %d" % status_code)
+            notify("HTTP Hata: %d" % status_code, 2, show_now=True)
+            return False, None
     except OSError as e:
         if e.args[0] == errno.ETIMEDOUT:
             print("Veri çekme sırasında zaman aşımı hatası: %s" % e)
-            display_message("Cekme Zaman Asti!", 2, show_now=True)
-        return False, []
+            notify("Cekme Zaman Asti!", 2, show_now=True)
+        return False, None
     except Exception as e:
         print("Veri çekme sırasında genel hata oluştu: %s - %s" % (type(e).__name__, e))
-        display_message("Cekme Hatasi: %s" % type(e).__name__, 2, show_now=True)
-        return False, []
+        notify("Cekme Hatasi: %s" % type(e).__name__, 2, show_now=True)
+        return False, None
+    finally:
+        if own_client and client is not None:
+            client.close()
+
+def get_namaz_vakitleri_from_sources(sources, notify=display_message):
+    """
+    Birincil RSS adresi ve yedek kaynaklara kademeli olarak paralel istek atar, ilk geçerli yanıtı kullanır.
+    sources: [(url, ayrıştırıcı türü), ...]. (başarı, PrayerSchedule veya None) döndürür.
+    """
+    from feed_race import race, SourceStats
+    notify("Veri Cekiliyor...", 0, clear_screen=True, show_now=True)
+    print("Vakitler %d kaynaktan yarıştırılarak çekiliyor." % len(sources))
+    try:
+        winner = race(sources, SourceStats(feed_source_stats), get_dns_cache().resolve, FEED_RACE_STAGGER_MS, RSS_TIMEOUT_SECONDS * 1000)
+    except Exception as e:
+        print("Kaynak yarışı sırasında genel hata oluştu: %s - %s" % (type(e).__name__, e))
+        winner = None
+    if winner is None:
+        print("Hata: Hiçbir kaynaktan geçerli vakit alınamadı.")
+        notify("Kaynak Yok!", 2, show_now=True)
+        return False, None
+    url, schedule, full_title_string = winner
+    print("Kazanan kaynak: %s" % url)
+    schedule.title = format_date_for_display(full_title_string)
+    schedule.date = parse_feed_date(full_title_string)
+    return True, schedule
+
+def get_city_schedules(rss_urls, notify=display_message, sources=None):
+    """
+    Tüm şehirlerin RSS beslemelerini tek bir yenileme turunda çeker.
+    Aynı sunucuya giden istekler tek bir keep-alive bağlantısını paylaşır.
+    sources verilirse ilk şehir, birincil adres ve yedek kaynaklar yarıştırılarak çekilir.
+    (ilk şehir başarılı mı, şehir sırasıyla PrayerSchedule veya None listesi) döndürür.
+    """
+    memory.before_large()
+    from http_client import KeepAliveClient
+    client = KeepAliveClient(timeout=RSS_TIMEOUT_SECONDS, resolver=get_dns_cache().resolve)
+    schedules = []
+    try:
+        for index, rss_url in enumerate(rss_urls):
+            feed_watchdog()
+            if index == 0 and sources:
+                success, schedule = get_namaz_vakitleri_from_sources([(rss_url, "auto")] + sources, notify)
+            else:
+                success, schedule = get_namaz_vakitleri(rss_url, notify, client)
+            schedules.append(schedule if success else None)
+    finally:
+        client.close()
+    print("%d şehir için %d bağlantı açıldı." % (len(rss_urls), client.connections_opened))
+    client = None
+    # Günde bir kez kullanılır. feed_race, PARSERS ve split_url ile diğerlerini tuttuğu için birlikte çıkarılır
+    release_modules("feed_race", "feed_parsers", "rss_scanner", "http_client")
+    return schedules[0] is not None, schedules
 
 # --- Kalan Süre Hesaplama ve Gösterme ---
-def calculate_and_display_next_prayer_time(vakitler_for_calc):
-    """Bir sonraki namaz vaktine kalan süreyi hesaplar ve ekranda gösterir."""
-    rtc_datetime = machine.RTC().datetime()
-    current_year, current_month, current_day, _, current_hour, current_minute, current_second, _ = rtc_datetime
-    
-    current_time_in_seconds = time.mktime((current_year, current_month, current_day, current_hour, current_minute, current_second, 0, 0))
+def display_large_countdown(prayer_name, hours, minutes):
+    """Kalan süreyi alt iki satıra (6-7) önbellekli büyük rakamlarla çizer."""
+    from bitmap_cache import big_text_width
+    y = (HEIGHT // 8 - 2) * 8
+    try:
+        oled.rect(0, y, WIDTH, 16, 0, True)
+        oled.text(convert_turkish_chars(prayer_name)[:6], 0, y)
+        oled.text("Kalan", 0, y + 8)
+        digits = "%02d:%02d" % (hours, minutes)
+        bitmap_cache.draw_big_text(oled, digits, WIDTH - big_text_width(digits), y)
+        oled.show()
+    except Exception as e:
+        print("Ekran güncelleme hatası (display_large_countdown): %s" % e)
 
-    prayer_times_today_in_seconds = []
-    for name, time_str in vakitler_for_calc:
-        try:
-            h, m = map(int, time_str.split(':'))
-            prayer_seconds = time.mktime((current_year, current_month, current_day, h, m, 0, 0, 0))
-            prayer_times_today_in_seconds.append((name, prayer_seconds))
-        except ValueError as e:
-            print("Vakit parse hatası '%s': %s" % (time_str, e))
-            continue
+COUNTDOWN_LINE = HEIGHT // 8 - 1
+countdown_text = None # Sayaç satırında en son çizilen metin; None ise satır tamamen yeniden çizilir
 
-    if not prayer_times_today_in_seconds:
-        display_message("Vakitler gecersiz!", 7, show_now=True)
-        return
+def invalidate_countdown():
+    """Sayaç satırının üzerine başka bir şey çizildiğinde çağrılır."""
+    global countdown_text
+    countdown_text = None
 
-    next_prayer_info = None
-    min_time_diff = float('inf')
-
-    for name, prayer_sec in prayer_times_today_in_seconds:
-        time_diff = prayer_sec - current_time_in_seconds
-        if time_diff > 0:
-            if time_diff < min_time_diff:
-                min_time_diff = time_diff
-                next_prayer_info = (name, min_time_diff)
-
-    if next_prayer_info is None:
-        # Eğer bu gün için bir sonraki vakit yoksa, yarınki ilk vakti (İmsak'ı) hedefle
-        if prayer_times_today_in_seconds:
-            # Bugünden 24 saat sonrası için zaman tuple'ını hesapla
-            next_day_time_tuple = time.localtime(current_time_in_seconds + 24 * 3600)
-            next_day_year, next_day_month, next_day_day = next_day_time_tuple[0], next_day_time_tuple[1], next_day_time_tuple[2]
-            
-            # İlk vakit (İmsak) genellikle dizinin ilk elemanıdır
-            if vakitler_for_calc:
-                imsak_name, imsak_time_str = vakitler_for_calc[0]
-                try:
-                    imsak_hour, imsak_minute = map(int, imsak_time_str.split(':'))
-                    # Yarınki İmsak vaktinin epoch saniye cinsinden değeri
-                    next_day_imsak_seconds = time.mktime((next_day_year, next_day_month, next_day_day, imsak_hour, imsak_minute, 0, 0, 0))
-                    
-                    # Şimdiki zaman ile yarınki İmsak arasındaki fark
-                    time_diff_seconds = next_day_imsak_seconds - current_time_in_seconds
-                    next_prayer_info = (imsak_name, time_diff_seconds)
-                except ValueError as e:
-                    print("Yarınki İmsâk vakti parse hatası: %s" % e)
-                    display_message("Yarin Imsak Hatasi", 7, show_now=True)
-                    return
-
-    if next_prayer_info:
-        next_prayer_name, time_diff_seconds = next_prayer_info
-        
-        # Eğer hesaplanan süre negatifse (geçmiş bir vakitse), 0 yap
-        if time_diff_seconds < 0:
-            time_diff_seconds = 0
+def draw_countdown_line(text):
+    """
+    Sayaç satırında sadece değişen karakter hücrelerini çizer ve panele sadece o sütun aralığını gönderir.
+    Saniyeli sayaçta her saniye genellikle tek bir hücre (8 bayt) gönderilir, tüm ekran (1024 bayt) değil.
+    """
+    global countdown_text
+    columns = WIDTH // 8
+    text = text[:columns]
+    text += " " * (columns - len(text))
+    previous = countdown_text
+    y = COUNTDOWN_LINE * 8
+    first = -1
+    last = -1
+    try:
+        for i in range(columns):
+            if previous is not None and previous[i] == text[i]:
+                continue
+            oled.rect(i * 8, y, 8, 8, 0, True)
+            oled.text(text[i], i * 8, y)
+            if first < 0:
+                first = i
+            last = i
+        countdown_text = text
+        if first >= 0:
+            oled.show_region(first * 8, last * 8 + 7, COUNTDOWN_LINE, COUNTDOWN_LINE)
+            instrumentation.count("oled_countdown_bytes", (last - first + 1) * 8)
+    except Exception as e:
+        countdown_text = None
+        print("Ekran güncelleme hatası (draw_countdown_line): %s" % e)
 
-        days = time_diff_seconds // (24 * 3600)
-        remaining_seconds_after_days = time_diff_seconds % (24 * 3600)
-        hours = remaining_seconds_after_days // 3600
-        minutes = (remaining_seconds_after_days % 3600) // 60
+def calculate_and_display_next_prayer_time(schedule, large_countdown=False, tomorrow_schedule=None, seconds_countdown=False):
+    """
+    Bir sonraki namaz vaktine kalan süreyi hesaplar ve ekranda gösterir.
+    Yatsı'dan sonra yarının vakitleri önceden çekildiyse yarınki İmsâk onlardan hesaplanır.
+    seconds_countdown: True ise kalan süre saniyesiyle birlikte gösterilir.
+    """
+    rtc_datetime = machine.RTC().datetime()
+    current_hour, current_minute, current_second = rtc_datetime[4], rtc_datetime[5], rtc_datetime[6]
+    
+    current_minute_of_day = current_hour * 60 + current_minute
+    current_second_of_day = current_minute_of_day * 60 + current_second
+
+    next_index = schedule.next_index(current_minute_of_day)
+    if next_index < 0:
+        # Bu gün için bir sonraki vakit yoksa, yarınki ilk vakti (İmsak'ı) hedefle
+        if tomorrow_schedule is not None and tomorrow_schedule.first_index() >= 0:
+            schedule = tomorrow_schedule
+        next_index = schedule.first_index()
+        if next_index < 0:
+            display_message("Vakitler gecersiz!", COUNTDOWN_LINE, show_now=True)
+            return
+
+    time_diff_seconds = schedule.seconds_until(next_index, current_second_of_day)
+    hours = time_diff_seconds // 3600
+    minutes = (time_diff_seconds % 3600) // 60
+    next_prayer_name = VAKIT_ADLARI[next_index]
+
+    if large_countdown and bitmap_cache is not None:
+        display_large_countdown(next_prayer_name, hours, minutes)
+        return
 
-        display_str = "S:%s" % convert_turkish_chars(next_prayer_name)
-        
-        if days > 0:
-            remaining_time_format = "%dg %02d:%02d" % (days, hours, minutes)
-        else:
-            # Sadece saat:dakika formatı
-            remaining_time_format = "%02d:%02d" % (hours, minutes)
-            
-        display_str += " K:%s" % remaining_time_format # "K:" den önce boşluk eklendi
-        
-        display_message(display_str, 7, clear_screen=False, show_now=True)
+    if seconds_countdown:
+        # 16 karaktere sığması için "S:" ve "K:" etiketleri kullanılmaz
+        display_str = "%-8s%02d:%02d:%02d" % (VAKIT_ADLARI_ASCII[next_index], hours, minutes, time_diff_seconds % 60)
     else:
-        display_message("Sonraki Vakit Bulunamadi", 7, clear_screen=False, show_now=True)
+        display_str = "S:%s" % VAKIT_ADLARI_ASCII[next_index]
+        display_str += " K:%02d:%02d" % (hours, minutes) # "K:" den önce boşluk eklendi
+    draw_countdown_line(display_str)
 
 # --- Yapılandırma Yükleme/Kaydetme Fonksiyonları ---
 def load_config():
@@ -550,13 +689,187 @@ def save_config(config):
         return False
 
 # --- Web Sunucusu Fonksiyonları (AP Modu) ---
-def start_ap_mode_and_web_server(ap_mode_duration_seconds=300):
+def parse_form(data):
+    """'a=1&b=2' biçimindeki form verisini sözlüğe çevirir."""
+    params = {}
+    for param in data.split("&"):
+        key_val = param.split("=")
+        if len(key_val) == 2:
+            params[key_val[0]] = unquote_plus_custom(key_val[1])
+    return params
+
+def setup_form_html():
+    """Kurulum formunu mevcut ayarlarla doldurulmuş olarak döndürür."""
+    current_config, _ = load_config()
+    current_ssid_val = current_config.get("ssid", "")
+    current_password_val = current_config.get("password", "")
+    current_rss_url_val = current_config.get("rss_url", "")
+    current_timezone_offset_val = str(current_config.get("timezone_offset", DEFAULT_CONFIG["timezone_offset"]))
+
+    html = """
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Namaz Vakitleri Ayarları</title>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1">
+        <style>
+            body {{ font-family: Arial, sans-serif; margin: 20px; background-color: #f4f4f4; color: #333; }}
+            div {{ background-color: #fff; padding: 20px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); max-width: 500px; margin: auto; }}
+            h2 {{ color: #333; text-align: center; margin-bottom: 20px; }}
+            label {{ display: block; margin-bottom: 5px; color: #555; font-weight: bold; }}
+            input[type="text"], input[type="password"], input[type="number"] {{
+                width: calc(100% - 22px); padding: 10px; margin: 8px 0 15px 0; display: inline-block;
+                border: 1px solid #ccc; border-radius: 4px; box-sizing: border-box; font-size: 16px;
+            }}
+            input[type="submit"] {{
+                background-color: #4CAF50; color: white; padding: 14px 20px; margin: 8px 0;
+                border: none; border-radius: 4px; cursor: pointer; width: 100%; font-size: 18px;
+                transition: background-color 0.3s ease;
+            }}
+            input[type="submit"]:hover {{ background-color: #45a049; }}
+            p.message {{ text-align: center; font-size: 1.1em; margin-top: 20px; }}
+        </style>
+    </head>
+    <body>
+        <div>
+            <h2>Namaz Vakitleri Ayarları</h2>
+            <form action="/" method="post">
+                <label for="ssid">WiFi SSID:</label>
+                <input type="text" id="ssid" name="ssid" value="{}"/><br>
+                <label for="password">WiFi Şifresi:</label>
+                <input type="password" id="password" name="password" value="{}"/><br>
+                <label for="rss_url">RSS URL:</label>
+                <input type="text" id="rss_url" name="rss_url" value="{}"/><br>
+                <label for="timezone_offset">Zaman Dilimi Ofseti (GMT+-):</label>
+                <input type="number" id="timezone_offset" name="timezone_offset" value="{}"/><br>
+                <input type="submit" value="Kaydet ve Yeniden Başlat">
+            </form>
+        </div>
+    </body>
+    </html>
+    """.format(
+        current_ssid_val,
+        current_password_val,
+        current_rss_url_val,
+        current_timezone_offset_val
+    )
+    return html
+
+def save_setup_form(conn, params):
+    """Formdan gelen ayarları kaydeder ve yanıtlar. Başarılıysa cihaz yeniden başlatılır."""
+    from setup_server import send_response
+    new_ssid = params.get("ssid", "").strip()
+    new_password = params.get("password", "").strip()
+    new_rss_url = params.get("rss_url", "").strip()
+    new_timezone_offset_str = params.get("timezone_offset", "").strip()
+    
+    new_timezone_offset = DEFAULT_CONFIG["timezone_offset"]
+    if new_timezone_offset_str:
+        try:
+            new_timezone_offset = int(new_timezone_offset_str)
+        except ValueError:
+            print("Hata: Geçersiz zaman dilimi ofseti değeri. Varsayılan kullanılıyor.")
+
+    if not (new_ssid and new_password and new_rss_url):
+        print("Gerekli Wi-Fi veya RSS URL parametreleri eksik.")
+        response_html = """
+        <!DOCTYPE html>
+        <html>
+        <head><meta charset="UTF-8"><title>Eksik Bilgi</title></head>
+        <body>
+        <p class="message" style="color: orange;">Hata! Tüm alanları doldurun.</p>
+        <a href='/' style="display: block; text-align: center; margin-top: 20px;">Geri Dön</a>
+        </body></html>
+        """
+        send_response(conn, 400, response_html)
+        return 400
+
+    current_config, _ = load_config()
+    current_config["ssid"] = new_ssid
+    current_config["password"] = new_password
+    current_config["rss_url"] = new_rss_url
+    current_config["timezone_offset"] = new_timezone_offset
+    if not save_config(current_config):
+        response_html = """
+        <!DOCTYPE html>
+        <html>
+        <head><meta charset="UTF-8"><title>Hata Oluştu</title></head>
+        <body>
+        <p class="message" style="color: red;">Hata! Ayarlar kaydedilemedi. Tekrar deneyin.</p>
+        <a href='/' style="display: block; text-align: center; margin-top: 20px;">Geri Dön</a>
+        </body></html>
+        """
+        send_response(conn, 500, response_html)
+        return 500
+
+    response_html = """
+    <!DOCTYPE html>
+    <html>
+    <head><meta charset="UTF-8"><title>Ayarlar Kaydedildi</title></head>
+    <body>
+    <p class="message" style="color: green;">Ayarlar Kaydedildi! Cihaz yeniden başlatılıyor...</p>
+    <script>setTimeout(function(){{ window.location.href = '/'; }}, 3000);</script>
+    </body></html>
+    """
+    send_response(conn, 200, response_html)
+    conn.close()
+    print("Yeni ayarlar kaydedildi, yeniden başlatılıyor...")
+    time.sleep(2)
+    reset()
+    return 200
+
+def handle_setup_request(conn, ap_ip=None):
+    """
+    Kurulum sunucusuna gelen tek bir isteği okur ve yanıtlar. Gönderilen HTTP durum kodunu döndürür.
+    ap_ip verilirse captive-portal kontrol istekleri kurulum sayfasına yönlendirilir.
+    """
+    from setup_server import read_request, send_response, send_bytes, portal_redirect, is_portal_probe, RequestError
+    try:
+        request = read_request(conn)
+    except RequestError as e:
+        # Yavaş, yarım kalan veya aşırı büyük istek: sunucu beklemeden sonraki istemciye geçer
+        print("Geçersiz veya tamamlanmayan istek, durum: %d" % e.status)
+        try:
+            send_response(conn, e.status)
+        except OSError:
+            pass
+        return e.status
+    print("Gelen İstek: %s %s" % (request.method, request.path))
+
+    if ap_ip is not None and request.method == "GET" and is_portal_probe(request, ap_ip):
+        # Telefon portal kontrolünde 302 alınca kurulum sayfasını kendiliğinden açar
+        send_bytes(conn, portal_redirect(ap_ip))
+        return 302
+
+    if request.method == "POST":
+        content_type = request.headers.get("content-type", "").lower()
+        if "application/x-www-form-urlencoded" not in content_type or "content-length" not in request.headers:
+            print("Hata: POST isteğinde Content-Type veya Content-Length eksik.")
+            send_response(conn, 400, "Missing Content-Type or Content-Length for POST.\r\n", "text/plain")
+            return 400
+        return save_setup_form(conn, parse_form(request.body.decode("utf-8", "ignore")))
+
+    if request.method == "GET" and (request.path == "/" or request.path.startswith("/?")):
+        memory.before_large()
+        send_response(conn, 200, setup_form_html())
+        return 200
+
+    # Bilinmeyen veya alakasız istekleri ele al (favicon.ico vs.)
+    send_response(conn, 204)
+    return 204
+
+def start_ap_mode_and_web_server(ap_mode_duration_seconds=300, server_socket=None):
     """
     AP modunu başlatır ve yapılandırma için basit bir web sunucusu çalıştırır.
     ap_mode_duration_seconds: AP modunun açık kalacağı süre (saniye).
+    server_socket: Port 80 yerine kullanılacak dinleyen soket (bilgisayarda yük testi için); None ise açılır.
     """
+    import select
+    from setup_server import record_request, polled
     ap = network.WLAN(network.AP_IF)
-    ap_start_time = time.time()
+    ap_deadline = Deadline(ap_mode_duration_seconds * 1000)
+    wake_display() # Kurulum bilgileri (SSID, IP) gece de okunabilmeli
     
     display_message("Kurulum Modu!", 0, clear_screen=True, show_now=False)
     display_message("SSID: %s" % AP_MODE_SSID, 1, show_now=False)
@@ -585,12 +898,13 @@ def start_ap_mode_and_web_server(ap_mode_duration_seconds=300):
     display_message("Tarayici ile baglanin", 5, show_now=False)
     oled.show()
 
-    s = None # Soket değişkenini başlangıçta None olarak ayarla
+    s = server_socket # Verilmediyse aşağıda port 80 için açılır
     try:
-        s = usocket.socket(usocket.AF_INET, usocket.SOCK_STREAM)
-        s.setsockopt(usocket.SOL_SOCKET, usocket.SO_REUSEADDR, 1)
-        s.bind(('', 80))
-        s.listen(5)
+        if s is None:
+            s = usocket.socket(usocket.AF_INET, usocket.SOCK_STREAM)
+            s.setsockopt(usocket.SOL_SOCKET, usocket.SO_REUSEADDR, 1)
+            s.bind(('', 80))
+            s.listen(5)
         print("Web sunucusu dinlemede...")
     except OSError as e:
         print("KRİTİK HATA: Soket başlatma, bağlanma veya dinleme hatası: %s. Port meşgul veya kaynak sorunu." % e)
@@ -598,213 +912,57 @@ def start_ap_mode_and_web_server(ap_mode_duration_seconds=300):
         if s: # Hata oluşursa soketi kapat
             s.close()
         ap.active(False) # AP modunu devre dışı bırak
-        gc.collect()
+        memory.collect()
         return # Fonksiyondan çık, web sunucusu başlayamadı
 
+    # Tüm alan adlarını AP adresine çözen DNS sunucusu; HTTP ile aynı poll döngüsünü kullanır
+    dns = None
+    try:
+        from captive_dns import CaptiveDns
+        dns = CaptiveDns(ap_ip)
+        print("Captive-portal DNS sunucusu dinlemede.")
+    except Exception as e:
+        print("DNS sunucusu başlatılamadı, sadece IP ile erişilebilir: %s" % e)
+    poller = select.poll()
+    poller.register(s, select.POLLIN)
+    if dns is not None:
+        poller.register(dns.sock, select.POLLIN)
+    ap_started_ms = instrumentation.ticks_ms()
+    portal_recorded = False
+    shown_remaining = -1
+
     while True:
+        feed_watchdog()
         conn = None
         addr = None
-        request_str = ""
-        first_line = ""
         try:
-            remaining_time = max(0, int(ap_mode_duration_seconds - (time.time() - ap_start_time)))
-            display_message("Kalan: %ds" % remaining_time, 6, show_now=True)
+            remaining_time = (ap_deadline.remaining_ms() + 999) // 1000
+            if remaining_time != shown_remaining:
+                # DNS trafiği döngüyü sık uyandırır; ekran sadece saniye değişince güncellenir
+                display_message("Kalan: %ds" % remaining_time, 6, show_now=True)
+                shown_remaining = remaining_time
 
             if remaining_time <= 0:
                 print("AP modu süresi doldu. Web sunucusu kapatılıyor.")
                 break # Döngüden çık
 
-            s.settimeout(1) # Accept için kısa bir zaman aşımı
+            ready = [entry[0] for entry in poller.poll(min(1000, ap_deadline.remaining_ms()))]
+            if dns is not None and polled(ready, dns.sock):
+                dns.handle()
+            if not polled(ready, s):
+                continue
             conn, addr = s.accept()
-            s.settimeout(None) # Bağlantı kurulduktan sonra zaman aşımını kaldır
-            
+            request_started = instrumentation.ticks_ms()
             print("Bağlantı alındı: %s" % str(addr))
-            
-            request_bytes = conn.recv(2048)
-            request_str = request_bytes.decode('utf-8', 'ignore') # UTF-8 ve hataları yoksay
-            
-            if request_str:
-                lines = request_str.split('\r\n')
-                if lines and lines[0]:
-                    first_line = lines[0]
-            print("Gelen İstek:\n%s" % first_line)
-
-            show_form = True
-            parsed_params = {}
-
-            if "GET /?" in first_line:
-                params_str = first_line.split("GET /?")[1].split(" HTTP/1.1")[0]
-                for param in params_str.split("&"):
-                    key_val = param.split("=")
-                    if len(key_val) == 2:
-                        parsed_params[key_val[0]] = unquote_plus_custom(key_val[1])
-            elif "POST /" in first_line:
-                show_form = False
-                content_type_match = re.search(r"Content-Type: application/x-www-form-urlencoded", request_str, re.IGNORECASE)
-                content_length_match = re.search(r"Content-Length: (\d+)", request_str)
-                
-                if content_type_match and content_length_match:
-                    content_length = int(content_length_match.group(1))
-                    post_data_start = request_str.find("\r\n\r\n") + 4
-                    post_data = request_str[post_data_start : post_data_start + content_length]
-                    
-                    for param in post_data.split("&"):
-                        key_val = param.split("=")
-                        if len(key_val) == 2:
-                            parsed_params[key_val[0]] = unquote_plus_custom(key_val[1])
-                else:
-                    print("Hata: POST isteğinde Content-Type veya Content-Length eksik.")
-                    conn.sendall(b'HTTP/1.1 400 Bad Request\r\nContent-Type: text/plain\r\nConnection: close\r\n\r\nMissing Content-Type or Content-Length for POST.\r\n')
-                    conn.close()
-                    gc.collect()
-                    continue
-
-            elif "GET / HTTP" in first_line:
-                show_form = True
-            else:
-                # Bilinmeyen veya alakasız istekleri ele al (favicon.ico vs.)
-                conn.sendall(b'HTTP/1.1 204 No Content\r\n\r\n') # 204 No Content
-                conn.close()
-                gc.collect()
-                continue
-
-            if show_form:
-                current_config, _ = load_config()
-                current_ssid_val = current_config.get("ssid", "")
-                current_password_val = current_config.get("password", "")
-                current_rss_url_val = current_config.get("rss_url", "")
-                current_timezone_offset_val = str(current_config.get("timezone_offset", DEFAULT_CONFIG["timezone_offset"]))
-
-                html = """
-                <!DOCTYPE html>
-                <html>
-                <head>
-                    <title>Namaz Vakitleri Ayarları</title>
-                    <meta charset="UTF-8">
-                    <meta name="viewport" content="width=device-width, initial-scale=1">
-                    <style>
-                        body {{ font-family: Arial, sans-serif; margin: 20px; background-color: #f4f4f4; color: #333; }}
-                        div {{ background-color: #fff; padding: 20px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); max-width: 500px; margin: auto; }}
-                        h2 {{ color: #333; text-align: center; margin-bottom: 20px; }}
-                        label {{ display: block; margin-bottom: 5px; color: #555; font-weight: bold; }}
-                        input[type="text"], input[type="password"], input[type="number"] {{
-                            width: calc(100% - 22px); padding: 10px; margin: 8px 0 15px 0; display: inline-block;
-                            border: 1px solid #ccc; border-radius: 4px; box-sizing: border-box; font-size: 16px;
-                        }}
-                        input[type="submit"] {{
-                            background-color: #4CAF50; color: white; padding: 14px 20px; margin: 8px 0;
-                            border: none; border-radius: 4px; cursor: pointer; width: 100%; font-size: 18px;
-                            transition: background-color 0.3s ease;
-                        }}
-                        input[type="submit"]:hover {{ background-color: #45a049; }}
-                        p.message {{ text-align: center; font-size: 1.1em; margin-top: 20px; }}
-                    </style>
-                </head>
-                <body>
-                    <div>
-                        <h2>Namaz Vakitleri Ayarları</h2>
-                        <form action="/" method="post">
-                            <label for="ssid">WiFi SSID:</label>
-                            <input type="text" id="ssid" name="ssid" value="{}"/><br>
-                            <label for="password">WiFi Şifresi:</label>
-                            <input type="password" id="password" name="password" value="{}"/><br>
-                            <label for="rss_url">RSS URL:</label>
-                            <input type="text" id="rss_url" name="rss_url" value="{}"/><br>
-                            <label for="timezone_offset">Zaman Dilimi Ofseti (GMT+-):</label>
-                            <input type="number" id="timezone_offset" name="timezone_offset" value="{}"/><br>
-                            <input type="submit" value="Kaydet ve Yeniden Başlat">
-                        </form>
-                    </div>
-                </body>
-                </html>
-                """.format(
-                    current_ssid_val,
-                    current_password_val,
-                    current_rss_url_val,
-                    current_timezone_offset_val
-                )
-
-                conn.sendall(b'HTTP/1.1 200 OK\r\n')
-                conn.sendall(b'Content-Type: text/html; charset=UTF-8\r\n') # <-- UTF-8 eklendi
-                conn.sendall(b'Connection: close\r\n')
-                conn.sendall('Content-Length: %d\r\n\r\n' % len(html))
-                conn.sendall(html.encode('utf-8')) # <-- UTF-8 olarak kodlandı
-                conn.close()
-
-            else:
-                new_ssid = parsed_params.get("ssid", "").strip()
-                new_password = parsed_params.get("password", "").strip()
-                new_rss_url = parsed_params.get("rss_url", "").strip()
-                new_timezone_offset_str = parsed_params.get("timezone_offset", "").strip()
-                
-                new_timezone_offset = DEFAULT_CONFIG["timezone_offset"]
-                if new_timezone_offset_str:
-                    try:
-                        new_timezone_offset = int(new_timezone_offset_str)
-                    except ValueError:
-                        print("Hata: Geçersiz zaman dilimi ofseti değeri. Varsayılan kullanılıyor.")
-
-                if new_ssid and new_password and new_rss_url:
-                    current_config, _ = load_config()
-                    current_config["ssid"] = new_ssid
-                    current_config["password"] = new_password
-                    current_config["rss_url"] = new_rss_url
-                    current_config["timezone_offset"] = new_timezone_offset
-                    
-                    if save_config(current_config):
-                        response_html = """
-                        <!DOCTYPE html>
-                        <html>
-                        <head><meta charset="UTF-8"><title>Ayarlar Kaydedildi</title></head>
-                        <body>
-                        <p class="message" style="color: green;">Ayarlar Kaydedildi! Cihaz yeniden başlatılıyor...</p>
-                        <script>setTimeout(function(){{ window.location.href = '/'; }}, 3000);</script>
-                        </body></html>
-                        """
-                        conn.sendall(b'HTTP/1.1 200 OK\r\n')
-                        conn.sendall(b'Content-Type: text/html; charset=UTF-8\r\n') # <-- UTF-8 eklendi
-                        conn.sendall(b'Connection: close\r\n')
-                        conn.sendall('Content-Length: %d\r\n\r\n' % len(response_html))
-                        conn.sendall(response_html.encode('utf-8')) # <-- UTF-8 olarak kodlandı
-                        conn.close()
-                        print("Yeni ayarlar kaydedildi, yeniden başlatılıyor...")
-                        time.sleep(2)
-                        reset()
-                    else:
-                        response_html = """
-                        <!DOCTYPE html>
-                        <html>
-                        <head><meta charset="UTF-8"><title>Hata Oluştu</title></head>
-                        <body>
-                        <p class="message" style="color: red;">Hata! Ayarlar kaydedilemedi. Tekrar deneyin.</p>
-                        <a href='/' style="display: block; text-align: center; margin-top: 20px;">Geri Dön</a>
-                        </body></html>
-                        """
-                        conn.sendall(b'HTTP/1.1 500 Internal Server Error\r\n')
-                        conn.sendall(b'Content-Type: text/html; charset=UTF-8\r\n') # <-- UTF-8 eklendi
-                        conn.sendall(b'Connection: close\r\n')
-                        conn.sendall('Content-Length: %d\r\n\r\n' % len(response_html))
-                        conn.sendall(response_html.encode('utf-8')) # <-- UTF-8 olarak kodlandı
-                        conn.close()
-                else:
-                    print("Gerekli Wi-Fi veya RSS URL parametreleri eksik.")
-                    response_html = """
-                    <!DOCTYPE html>
-                    <html>
-                    <head><meta charset="UTF-8"><title>Eksik Bilgi</title></head>
-                    <body>
-                    <p class="message" style="color: orange;">Hata! Tüm alanları doldurun.</p>
-                    <a href='/' style="display: block; text-align: center; margin-top: 20px;">Geri Dön</a>
-                    </body></html>
-                    """
-                    conn.sendall(b'HTTP/1.1 400 Bad Request\r\n')
-                    conn.sendall(b'Content-Type: text/html; charset=UTF-8\r\n') # <-- UTF-8 eklendi
-                    conn.sendall(b'Connection: close\r\n')
-                    conn.sendall('Content-Length: %d\r\n\r\n' % len(response_html))
-                    conn.sendall(response_html.encode('utf-8')) # <-- UTF-8 olarak kodlandı
-                    conn.close()
-
+            status = handle_setup_request(conn, ap_ip)
+            record_request(request_started, status)
+            if status == 200 and not portal_recorded:
+                # Kurulum modunun başlamasından formun ilk kez sunulmasına kadar geçen süre
+                instrumentation.record("time_to_portal_ms", instrumentation.ticks_diff(instrumentation.ticks_ms(), ap_started_ms))
+                portal_recorded = True
         except OSError as e:
+            if conn is not None:
+                instrumentation.count("web_dropped") # Yanıt gönderilemeden bağlantı koptu
             if e.args[0] == errno.ETIMEDOUT:
                 pass 
             elif e.args[0] == errno.ECONNRESET:
@@ -816,7 +974,7 @@ def start_ap_mode_and_web_server(ap_mode_duration_seconds=300):
                 display_message("Web Hata: %s" % e.args[0], 6, show_now=True)
                 time.sleep(1)
         except Exception as e:
-            print("Genel web sunucusu istisnası: %s - %s - Gelen İstek İlk Satırı: '%s'" % (type(e).__name__, e, first_line))
+            print("Genel web sunucusu istisnası: %s - %s - Bağlantı adresi: %s" % (type(e).__name__, e, addr))
             display_message("Web Sunucu Hata!", 6, show_now=True)
             time.sleep(1)
         finally:
@@ -825,9 +983,11 @@ def start_ap_mode_and_web_server(ap_mode_duration_seconds=300):
                     conn.close()
                 except OSError as e:
                     print(f"Bağlantı kapatılırken hata: {e}")
-            gc.collect()
+            memory.sample()
     
-    # Döngü bittiğinde (süre dolduğunda) soketi kapat
+    # Döngü bittiğinde (süre dolduğunda) soketleri kapat
+    if dns is not None:
+        dns.close()
     if s: # Eğer soket başarıyla oluşturulduysa kapat
         try:
             s.close()
@@ -835,8 +995,240 @@ def start_ap_mode_and_web_server(ap_mode_duration_seconds=300):
             print(f"Ana soket kapatılırken hata: {e}")
     
     ap.active(False) # AP modunu devre dışı bırak
-    gc.collect()
+    release_modules("setup_server", "captive_dns")
+
+
+# --- Ağ İşçisi (isteğe bağlı, "net_worker" ayarı ile) ---
+net_worker = None # main_loop yeniden çağrıldığında aynı işçi kullanılır
+
+def start_net_worker():
+    """Ağ işçisi thread'ini bir kez başlatır ve döndürür."""
+    global net_worker
+    if net_worker is None:
+        from net_worker import NetWorker
+        net_worker = NetWorker()
+        net_worker.start()
+        print("Ağ işçisi thread'i başlatıldı.")
+    return net_worker
+
+# --- Enerji Yönetimi (isteğe bağlı, "power_save" ayarı ile) ---
+power_manager = None # main_loop dışındaki durum ekranları (kurulum modu) da ekranı uyandırabilsin diye global
+
+def wake_display():
+    """Durum veya kurulum mesajı çizilmeden önce, enerji tasarrufunda kısılmış/kapatılmış ekranı açar."""
+    if power_manager is not None and oled is not None:
+        power_manager.wake_panel(oled)
+
+# --- Vakit Olayları (isteğe bağlı, "prayer_pin" / "prayer_invert_seconds" ayarları ile) ---
+prayer_events = None # main_loop yeniden çağrıldığında aynı dağıtıcı ve zamanlayıcı kullanılır
+
+def start_prayer_events(config):
+    """Vakit girdiği anda çalışacak işleyicileri kurar. Hiçbiri açık değilse None döndürür."""
+    global prayer_events
+    pin = config.get("prayer_pin", -1)
+    invert_seconds = config.get("prayer_invert_seconds", 0)
+    if prayer_events is None and (pin >= 0 or invert_seconds > 0):
+        from prayer_events import PrayerEventDispatcher, gpio_pulse, display_invert
+        try:
+            dispatcher = PrayerEventDispatcher()
+            if pin >= 0:
+                dispatcher.add_handler(gpio_pulse(pin, config.get("prayer_pulse_ms", 500)))
+            if invert_seconds > 0:
+                invert = display_invert(dispatcher, oled, invert_seconds * 1000)
+                def wake_and_invert(index):
+                    wake_display() # Ekran gece kapalı veya kısık olabilir
+                    invert(index)
+                dispatcher.add_handler(wake_and_invert, deferred=True)
+            prayer_events = dispatcher
+            print("Vakit olayları etkin (GPIO: %d, ters çevirme: %d sn)." % (pin, invert_seconds))
+        except Exception as e:
+            print("Vakit olayları başlatılamadı: %s" % e)
+    return prayer_events
+
+# --- Toplu Yapılandırma (isteğe bağlı, "fleet_key" ayarı ile) ---
+fleet_agent = None # UDP soketi bir kez açılır; main_loop yeniden çağrıldığında güncel yapılandırmaya bağlanır
+FLEET_LIVE_KEYS = ("timezone_offset", "rss_url", "cities", "sources", "city_rotate_seconds", "large_countdown", "seconds_countdown")
+
+def start_fleet_agent(config):
+    """Ağdan gelen imzalı yapılandırma paketlerini dinleyen ajanı başlatır. fleet_key boşsa None döndürür."""
+    global fleet_agent
+    if not config.get("fleet_key"):
+        return None
+    if fleet_agent is None:
+        try:
+            from fleet import FleetAgent
+            device_id = (machine.unique_id() + bytes(6))[:6]
+            fleet_agent = FleetAgent(config["fleet_key"].encode(), device_id, FIRMWARE_VERSION, config, DEFAULT_CONFIG, save_config)
+            print("Toplu yapılandırma dinleniyor (UDP).")
+        except Exception as e:
+            print("Toplu yapılandırma başlatılamadı: %s" % e)
+            return None
+    fleet_agent.config = config
+    return fleet_agent
+
+def reconnect_wifi(wlan, ssid, password, timeout_seconds):
+    """Ağ işçisinde çalışır: ekrana dokunmadan Wi-Fi'ye yeniden bağlanır."""
+    if not wlan.active():
+        wlan.active(True)
+    wlan.connect(ssid, password)
+    deadline = Deadline(timeout_seconds * 1000)
+    while not wlan.isconnected() and not deadline.expired():
+        time.sleep_ms(200)
+    print("Ağ işçisi Wi-Fi yeniden bağlantı sonucu: %s" % wlan.isconnected())
+    return wlan.isconnected()
+
+# --- Sıcak Başlangıç ve Watchdog ---
+supervisor = None # Donanım watchdog'u (main_loop ilk çağrıldığında kurulur)
+warm_snapshot = None # Watchdog/yazılımsal reset sonrası RTC belleğinden okunan durum
+wifi_static_ip = False # Sıcak başlangıçtaki sabit IP ayarları hâlâ etkin (DHCP'ye dönülmedi)
+
+def feed_watchdog():
+    """Watchdog etkinse besler. Uzun süren döngülerde düzenli çağrılmalıdır."""
+    if supervisor is not None:
+        supervisor.feed()
+
+def use_static_ip(wlan, ifconfig):
+    """Sıcak başlangıçta önceki IP ayarlarını verir; bağlantı DHCP beklemeden kurulur."""
+    global wifi_static_ip
+    wlan.ifconfig(ifconfig)
+    wifi_static_ip = True
+
+def restore_dhcp(wlan):
+    """
+    Sabit IP ayarlarından DHCP'ye döner. Bağlandıktan hemen sonra çağrılır: DHCP istemcisi kirayı yeniler,
+    yoksa kira süresi dolduğunda adres başka bir cihaza verilebilir. Başarısızsa bir sonraki bağlantıda tekrar denenir.
+    """
+    global wifi_static_ip
+    if not wifi_static_ip:
+        return
+    try:
+        wlan.ifconfig("dhcp")
+        wifi_static_ip = False
+    except Exception as e:
+        print("DHCP'ye dönülemedi: %s" % e)
 
+def start_supervisor(config):
+    """Watchdog'u bir kez başlatır ve sıcak reset ise RTC belleğindeki durumu okur."""
+    global supervisor, warm_snapshot
+    if supervisor is not None:
+        return
+    from warm_start import Supervisor, is_warm_reset, load_snapshot
+    if is_warm_reset():
+        warm_snapshot = load_snapshot(today_key=local_date_info()[0]) # Başka güne ait vakitler gösterilmez
+        if warm_snapshot is not None:
+            print("Sıcak başlangıç: RTC belleğinden %d şehir vakti yüklendi." % len(warm_snapshot["schedules"]))
+    try:
+        supervisor = Supervisor(config.get("watchdog_seconds", 90))
+    except Exception as e:
+        print("Watchdog başlatılamadı: %s" % e)
+        supervisor = Supervisor(0)
+
+def save_warm_snapshot(schedule_cache, city_count, today_key, last_ntp_time, last_rss_time, wlan):
+    """Güncel vakitleri, son senkron zamanlarını ve IP ayarlarını RTC belleğine yazar."""
+    try:
+        from warm_start import encode_snapshot, save_snapshot
+        schedules = [schedule_cache.get(i, today_key) or schedule_cache.latest(i) for i in range(city_count)]
+        ifconfig = wlan.ifconfig() if wlan.isconnected() else None
+        save_snapshot(encode_snapshot(schedules, int(last_ntp_time), int(last_rss_time), ifconfig))
+    except Exception as e:
+        print("RTC durum özeti yazılamadı: %s" % e)
+
+# --- Kalıcı Depo (flash) ---
+DATA_STORE_FILE = "nv_store.log"
+DATA_STORE_MAX_BYTES = 8192
+EVENT_WIFI_LOST = 1
+EVENT_NTP_FAIL = 2
+EVENT_RSS_FAIL = 3
+EVENT_CRASH = 4
+data_store = None
+event_log = None
+
+def get_data_store():
+    """Vakit önbelleği, senkron zamanları ve olay günlüğü için log tabanlı depoyu bir kez açar."""
+    global data_store, event_log
+    if data_store is None:
+        from logstore import LogStore, EventLog
+        data_store = LogStore(DATA_STORE_FILE, DATA_STORE_MAX_BYTES)
+        event_log = EventLog(data_store)
+    return data_store
+
+def log_event(code, message=""):
+    """Hata/olay günlüğüne kayıt ekler. Flash hatası cihazın çalışmasını durdurmaz."""
+    try:
+        get_data_store()
+        event_log.log(time.time(), code, message)
+    except Exception as e:
+        print("Olay günlüğüne yazılamadı: %s" % e)
+
+def persist_state(schedule_cache, city_count, today_key, tomorrow_key, last_ntp_time, last_rss_time):
+    """Şehir vakitlerini ve son senkron zamanlarını depoya yazar. Değişmeyen kayıtlar yeniden yazılmaz."""
+    try:
+        store = get_data_store()
+        for index in range(city_count):
+            schedule = schedule_cache.get(index, today_key) or schedule_cache.latest(index)
+            if schedule is not None:
+                store.put("s%d" % index, pack_schedule(schedule))
+            tomorrow = schedule_cache.get(index, tomorrow_key)
+            if tomorrow is not None and tomorrow is not schedule:
+                store.put("t%d" % index, pack_schedule(tomorrow))
+        store.put("sync", struct.pack("<II", int(last_ntp_time), int(last_rss_time)))
+    except Exception as e:
+        print("Kalıcı depoya yazılamadı: %s" % e)
+
+def load_persisted_state(schedule_cache, city_count):
+    """Depodaki vakitleri önbelleğe yükler. (son NTP zamanı, son RSS zamanı) döndürür."""
+    try:
+        store = get_data_store()
+        for index in range(city_count):
+            for prefix in ("s", "t"):
+                data = store.get("%s%d" % (prefix, index))
+                schedule = unpack_schedule(data) if data else None
+                if schedule is not None and schedule.date:
+                    schedule_cache.put(index, schedule)
+        sync = store.get("sync")
+        if sync:
+            return struct.unpack("<II", sync)
+    except Exception as e:
+        print("Kalıcı depo okunamadı: %s" % e)
+    return 0, 0
+
+# --- Çoklu Şehir Yardımcıları ---
+def city_list(config):
+    """Yapılandırmadaki şehirleri (ad, rss_url) listesi olarak döndürür."""
+    cities = []
+    for city in config.get("cities") or []:
+        if city.get("rss_url"):
+            cities.append((city.get("name", ""), city["rss_url"]))
+    if not cities:
+        cities.append(("", config["rss_url"]))
+    return cities
+
+def city_title(name, schedule):
+    """Tablonun ilk satırı: çoklu şehirde şehir adı ve tarih, tek şehirde sadece tarih."""
+    if not name:
+        return schedule.title
+    return ("%s %s" % (convert_turkish_chars(name), schedule.title))[:WIDTH // 8]
+
+RSS_PREFETCH_MINUTE = 23 * 60 + 30
+
+def new_rss_scheduler(config):
+    """Yenileme zamanlayıcısı; yarının ön çekimi sadece "rss_prefetch" açıksa yapılır."""
+    return RefreshScheduler(prefetch_minute=RSS_PREFETCH_MINUTE if config.get("rss_prefetch", False) else None)
+
+def apply_rss_result(rss_scheduler, schedule_cache, fetch_kind, schedules, today_key, tomorrow_key):
+    """Bir yenileme turunun sonuçlarını zamanlayıcıya ve şehir önbelleğine işler. İlk şehir başarılıysa True."""
+    primary = schedules[0] if schedules else None
+    rss_scheduler.on_result(fetch_kind, primary, today_key, tomorrow_key)
+    for index, schedule in enumerate(schedules):
+        if schedule is None:
+            continue
+        if schedule.date == 0:
+            if fetch_kind != FETCH_TODAY:
+                continue # Hangi güne ait olduğu bilinmeyen ön çekim saklanmaz
+            schedule.date = today_key
+        schedule_cache.put(index, schedule)
+    schedule_cache.prune(today_key)
+    return primary is not None
 
 # --- Ana Döngü ---
 def main_loop():
@@ -845,13 +1237,38 @@ def main_loop():
     MAX_WIFI_RECONNECT_ATTEMPTS = 3 
 
     failed_wifi_attempts = 0
-    
+
+    if oled is None:
+        # Ekran ilk çağrıda başlatılır (başka bir modülden main_loop çağrıldığında da)
+        init_oled()
+        boot_profile.mark("oled")
+
     config, config_exists = load_config()
+    boot_profile.mark("config")
 
     if not config_exists:
         print("config.json bulunamadığı için varsayılan ayarlar kaydediliyor...")
         save_config(config)
 
+    start_supervisor(config)
+    if config.get("double_buffer", False):
+        enable_double_buffer()
+    large_countdown = config.get("large_countdown", False)
+    seconds_countdown = config.get("seconds_countdown", False)
+    cities = city_list(config)
+
+    # Sıcak başlangıçta vakitler ağa çıkmadan hemen gösterilir, Wi-Fi sessizce arka planda bağlanır
+    global warm_snapshot
+    warm = warm_snapshot
+    warm_snapshot = None # Sadece ilk main_loop çağrısında kullanılır
+    warm_schedule = None
+    if warm is not None and warm["schedules"] and warm["schedules"][0] is not None:
+        warm_schedule = warm["schedules"][0]
+        display_schedule(warm_schedule, large_countdown, city_title(cities[0][0], warm_schedule))
+        calculate_and_display_next_prayer_time(warm_schedule, large_countdown, None, seconds_countdown)
+        boot_profile.mark("first_frame")
+    status_display = silent_display if warm_schedule is not None else display_message
+
     wlan = network.WLAN(network.STA_IF)
     ap = network.WLAN(network.AP_IF)
 
@@ -869,33 +1286,46 @@ def main_loop():
             wlan.active(True)
             time.sleep_ms(100)
             
-            display_message("WiFi Baglaniliyor", 0, clear_screen=True, show_now=False)
-            display_message(ssid, 1, show_now=False)
-            oled.show()
+            status_display("WiFi Baglaniliyor", 0, clear_screen=True, show_now=False)
+            status_display(ssid, 1, show_now=False)
             print("Wi-Fi ağına bağlanılıyor: %s..." % ssid)
             
+            if warm_schedule is not None and warm["ifconfig"] and failed_wifi_attempts == 0:
+                # Sıcak başlangıçta önceki IP ayarları kullanılır, DHCP beklenmez
+                use_static_ip(wlan, warm["ifconfig"])
+            else:
+                restore_dhcp(wlan) # Sabit IP ile bağlanılamadı veya önceki main_loop'ta DHCP'ye dönülemedi
+
             wlan.connect(ssid, password)
             
-            start_connect_time = time.time()
-            while not wlan.isconnected() and (time.time() - start_connect_time) < WIFI_CONNECT_TIMEOUT:
-                current_dots = "." * (int(time.time() - start_connect_time) % 4 + 1)
-                display_message("Baglaniyor%s" % current_dots, 4, show_now=True)
+            connect_deadline = Deadline(WIFI_CONNECT_TIMEOUT * 1000)
+            while not wlan.isconnected() and not connect_deadline.expired():
+                feed_watchdog()
+                if warm_schedule is not None:
+                    # Bağlanırken geri sayım çalışmaya devam eder
+                    calculate_and_display_next_prayer_time(warm_schedule, large_countdown, None, seconds_countdown)
+                else:
+                    waited_seconds = WIFI_CONNECT_TIMEOUT - connect_deadline.remaining_ms() // 1000
+                    current_dots = "." * (waited_seconds % 4 + 1)
+                    status_display("Baglaniyor%s" % current_dots, 4, show_now=True)
                 time.sleep(1)
             
             if wlan.isconnected():
                 failed_wifi_attempts = 0
                 print("Wi-Fi'ye bağlandı: %s" % wlan.ifconfig()[0])
-                display_message("Baglandi: %s" % wlan.ifconfig()[0], 4, show_now=True)
-                time.sleep(1)
+                status_display("Baglandi: %s" % wlan.ifconfig()[0], 4, show_now=True)
+                restore_dhcp(wlan)
+                if warm_schedule is None:
+                    time.sleep(1)
                 return True
             else:
                 failed_wifi_attempts += 1
                 print("Wi-Fi bağlantısı başarısız. Deneme %d/%d" % (failed_wifi_attempts, MAX_WIFI_RECONNECT_ATTEMPTS))
-                display_message("Baglanti Hatasi!", 4, show_now=True)
+                status_display("Baglanti Hatasi!", 4, show_now=True)
                 return False
         except Exception as e:
             print("Wi-Fi bağlantı girişimi sırasında beklenmeyen hata: %s - %s" % (type(e).__name__, e))
-            display_message("WiFi Hata: %s" % type(e).__name__, 4, show_now=True)
+            status_display("WiFi Hata: %s" % type(e).__name__, 4, show_now=True)
             failed_wifi_attempts += 1
             return False
 
@@ -908,11 +1338,13 @@ def main_loop():
         else:
             if failed_wifi_attempts < MAX_WIFI_RECONNECT_ATTEMPTS:
                 print("AP moduna geçiş eşiğine ulaşılmadı. %d saniye sonra tekrar denenecek." % WIFI_RETRY_DELAY_SECONDS)
-                display_message("Tekrar %ds" % WIFI_RETRY_DELAY_SECONDS, 4, show_now=True)
+                status_display("Tekrar %ds" % WIFI_RETRY_DELAY_SECONDS, 4, show_now=True)
+                feed_watchdog()
                 time.sleep(WIFI_RETRY_DELAY_SECONDS)
     
     if not wifi_connected:
         print("%d ardışık Wi-Fi denemesi başarısız oldu. AP moduna geçiliyor." % MAX_WIFI_RECONNECT_ATTEMPTS)
+        wake_display()
         display_message("WiFi Baglanamadi!", 0, clear_screen=True, show_now=False)
         display_message("Kurulum Baslatiliyor", 2, show_now=True)
         time.sleep(2)
@@ -931,69 +1363,262 @@ def main_loop():
         return main_loop() # Ana döngüye geri dön ve tekrar bağlanmayı dene
 
     print("Normal çalışma moduna geçiliyor.")
+    boot_profile.mark("wifi")
     
-    last_rss_update_time = 0
     last_ntp_update_time = 0
-    vakitler_for_calc = []
-    
-    # NTP senkronizasyonunda timezone_offset kullanılıyor
-    ntp_success = set_time_from_ntp(config["timezone_offset"]) 
-    if ntp_success:
-        last_ntp_update_time = time.time()
+    last_rss_update_time = 0
+    rss_scheduler = new_rss_scheduler(config)
+    schedule_cache = ScheduleCache()
+    rss_urls = [unquote_plus_custom(url) for _, url in cities]
+    feed_sources = [(unquote_plus_custom(source["url"]), source.get("parser", "auto"))
+                    for source in config.get("sources") or [] if source.get("url")]
+    city_index = 0
+    city_interval = Interval(config.get("city_rotate_seconds", 10) * 1000)
+    # Aralıklar ticks_ms ile ölçülür; last_*_update_time değerleri sadece kayıt amaçlı duvar saati damgalarıdır
+    ntp_interval = Interval(NTP_UPDATE_INTERVAL_SECONDS * 1000, "ntp", expired=True)
+    fragmentation_interval = Interval(FRAGMENTATION_CHECK_SECONDS * 1000)
+    displayed_schedule = None
+    worker = start_net_worker() if config.get("net_worker", False) else None
+    worker_wifi_failures = 0
+    global power_manager
+    power = None
+    if config.get("power_save", False):
+        from power_manager import PowerManager
+        # Ağ işçisi radyoyu kendi yönetir, toplu yapılandırma paketleri için radyo açık kalmalı;
+        # çift tamponda aktarım thread'i lightsleep ile yarıda kesilmemeli
+        power = PowerManager(radio_off=worker is None and not config.get("fleet_key"), lightsleep=not config.get("double_buffer", False))
+    power_manager = power
+    events = start_prayer_events(config)
+    fleet = start_fleet_agent(config)
     
-    rss_success, temp_vakitler = get_namaz_vakitleri(unquote_plus_custom(config["rss_url"]))
-    if rss_success:
-        vakitler_for_calc = temp_vakitler
-        last_rss_update_time = time.time()
+    if warm_schedule is not None:
+        # RTC saati ve vakitler reset sonrası korundu: ilk NTP ve RSS çekimi atlanır
+        for index, schedule in enumerate(warm["schedules"][:len(cities)]):
+            if schedule is not None:
+                schedule_cache.put(index, schedule)
+        rss_scheduler.current = warm_schedule
+        last_ntp_update_time = warm["last_ntp_time"]
+        last_rss_update_time = warm["last_rss_time"]
+        if last_ntp_update_time:
+            # Reset sonrası ticks sıfırlanır, RTC ise korunur: geçen süre bir kez duvar saatinden hesaplanır
+            ntp_interval.restart((time.time() - last_ntp_update_time) * 1000)
     else:
-        print("İlk RSS veri çekimi başarısız. Boş vakitlerle başlanıyor.")
-        display_message("RSS Yuklenemedi.", 6, show_now=True)
-
+        # NTP senkronizasyonunda timezone_offset kullanılıyor
+        ntp_success = set_time_from_ntp(config["timezone_offset"]) 
+        if ntp_success:
+            last_ntp_update_time = time.time()
+            ntp_interval.restart()
+        else:
+            log_event(EVENT_NTP_FAIL, "ilk senkron")
+        # Soğuk başlangıçta flash'taki vakitler bugüne aitse ilk RSS çekimi atlanır
+        _, stored_rss_time = load_persisted_state(schedule_cache, len(cities))
+        today_key, tomorrow_key, _ = local_date_info()
+        rss_scheduler.current = schedule_cache.get(0, today_key)
+        rss_scheduler.tomorrow = schedule_cache.get(0, tomorrow_key)
+        if rss_scheduler.current is not None:
+            print("Bugünün vakitleri kalıcı depodan yüklendi.")
+            last_rss_update_time = stored_rss_time
+    
+    # İlk RSS çekimi zamanlayıcı tarafından döngünün ilk turunda yapılır
     while True:
         current_time = time.time()
+        today_key, tomorrow_key, minute_of_day = local_date_info()
+        redraw_table = False
+        rss_failed = False
+        snapshot_dirty = False
+        feed_watchdog()
+        rss_scheduler.rollover(today_key) # Gün dönümü: elde yarının vakitleri varsa ağa çıkmadan devreye alınır
+
+        # Ağ işçisinden gelen sonuçları işle (bloklamaz)
+        result = worker.poll() if worker is not None else None
+        while result is not None:
+            tag, ok, value = result
+            if tag == "ntp":
+                if ok and value:
+                    last_ntp_update_time = current_time
+                    snapshot_dirty = True
+                else:
+                    print("NTP senkronizasyonu başarısız, bir sonraki döngüde tekrar denenecek.")
+                    ntp_interval.expire()
+                    log_event(EVENT_NTP_FAIL)
+            elif tag == "wifi":
+                if ok and value:
+                    worker_wifi_failures = 0
+                    display_message("WiFi Baglandi", 6, show_now=True)
+                else:
+                    worker_wifi_failures += 1
+            elif tag[0] == "rss":
+                _, fetch_kind, fetch_today_key, fetch_tomorrow_key = tag
+                success, schedules = value if ok else (False, [])
+                rss_failed = not apply_rss_result(rss_scheduler, schedule_cache, fetch_kind, schedules, fetch_today_key, fetch_tomorrow_key)
+                if not rss_failed:
+                    last_rss_update_time = current_time
+                    snapshot_dirty = True
+            result = worker.poll()
+
+        changed = fleet.handle() if fleet is not None and wlan.isconnected() else None
+        if changed:
+            # Ayarlar save_config ile kaydedildi ve config sözlüğüne işlendi; yeniden başlatmadan uygulanır
+            display_message("Ayarlar Guncellendi", 6, show_now=True)
+            for key in changed:
+                if key not in FLEET_LIVE_KEYS:
+                    # Wi-Fi bilgileri veya başlangıçta kurulan özellikler: ana döngü baştan kurulur (reset yok)
+                    print("Toplu yapılandırma '%s' değiştirdi, ana döngü yeniden kuruluyor." % key)
+                    if wlan.active():
+                        wlan.disconnect()
+                        wlan.active(False)
+                    memory.collect()
+                    return main_loop()
+            if "timezone_offset" in changed:
+                ntp_interval.expire()
+            large_countdown = config.get("large_countdown", False)
+            seconds_countdown = config.get("seconds_countdown", False)
+            if "rss_url" in changed or "cities" in changed or "sources" in changed or "city_rotate_seconds" in changed:
+                # Şehirler değişti: eski vakitler atılır, zamanlayıcı ilk turda yeniden çeker
+                cities = city_list(config)
+                rss_urls = [unquote_plus_custom(url) for _, url in cities]
+                feed_sources = [(unquote_plus_custom(source["url"]), source.get("parser", "auto"))
+                                for source in config.get("sources") or [] if source.get("url")]
+                schedule_cache = ScheduleCache()
+                rss_scheduler = new_rss_scheduler(config)
+                city_index = 0
+                city_interval = Interval(config.get("city_rotate_seconds", 10) * 1000)
+            displayed_schedule = None # Tablo yeni ayarlarla yeniden çizilir
+
+        if power is not None and power.radio_sleeping:
+            # Radyo senkronlar arasında kapalı: NTP veya RSS zamanı geldiğinde açılır
+            if ntp_interval.remaining_ms() == 0 or rss_scheduler.due(today_key, minute_of_day) is not None:
+                print("Senkron zamanı geldi, radyo açılıyor.")
+                power.wake_radio(wlan, lambda: reconnect_wifi(wlan, config["ssid"], config["password"], WIFI_CONNECT_TIMEOUT))
+        radio_sleeping = power is not None and power.radio_sleeping
         
-        if not wlan.isconnected():
-            print("Wi-Fi bağlantısı koptu! Yeniden bağlanma denemesi için main_loop'a dönülüyor.")
-            display_message("WiFi Koptu!", 0, clear_screen=True, show_now=False)
-            display_message("Tekrar Deniyor...", 2, show_now=True)
-            # Wi-Fi bağlantısı koptuğunda, her iki arayüzü de kapatıp temiz bir başlangıç yapalım
-            if wlan.active():
-                wlan.disconnect()
-                wlan.active(False)
-            if ap.active():
-                ap.active(False)
-            time.sleep(2)
-            gc.collect()
-            return main_loop()
-
-        if (current_time - last_ntp_update_time >= NTP_UPDATE_INTERVAL_SECONDS) or (last_ntp_update_time == 0):
-            print("NTP zamanı güncelleniyor...")
-            if set_time_from_ntp(config["timezone_offset"]):
-                last_ntp_update_time = current_time
-            else:
-                print("NTP senkronizasyonu başarısız, bir sonraki döngüde tekrar denenecek.")
-        
-        if (current_time - last_rss_update_time >= RSS_UPDATE_INTERVAL_SECONDS) or not vakitler_for_calc:
-            print("RSS verileri güncelleniyor...")
-            decoded_rss_url = unquote_plus_custom(config["rss_url"])
-            success, temp_vakitler = get_namaz_vakitleri(decoded_rss_url)
-            if success:
-                vakitler_for_calc = temp_vakitler
-                last_rss_update_time = current_time
+        if not wlan.isconnected() and not radio_sleeping:
+            if worker is not None and worker_wifi_failures < MAX_WIFI_RECONNECT_ATTEMPTS:
+                # Yeniden bağlanmayı işçi yapar, ekran ve sayaç çalışmaya devam eder
+                if worker.submit("wifi", reconnect_wifi, wlan, config["ssid"], config["password"], WIFI_CONNECT_TIMEOUT):
+                    print("Wi-Fi bağlantısı koptu! Ağ işçisi yeniden bağlanıyor.")
+                    log_event(EVENT_WIFI_LOST)
+                    wake_display()
+                    display_message("WiFi Koptu!", 6, show_now=True)
             else:
-                print("RSS veri çekme başarısız. Mevcut vakitlerle devam ediliyor (varsa) veya bekleniyor.")
-                display_message("RSS Cekilemedi.", 6, show_now=True)
-                time.sleep(5)
-
-        if not vakitler_for_calc:
+                print("Wi-Fi bağlantısı koptu! Yeniden bağlanma denemesi için main_loop'a dönülüyor.")
+                log_event(EVENT_WIFI_LOST)
+                wake_display() # Yeniden bağlanma ve kurulum ekranları gece de okunabilsin
+                display_message("WiFi Koptu!", 0, clear_screen=True, show_now=False)
+                display_message("Tekrar Deniyor...", 2, show_now=True)
+                # Wi-Fi bağlantısı koptuğunda, her iki arayüzü de kapatıp temiz bir başlangıç yapalım
+                if wlan.active():
+                    wlan.disconnect()
+                    wlan.active(False)
+                if ap.active():
+                    ap.active(False)
+                time.sleep(2)
+                memory.collect()
+                return main_loop()
+        elif not radio_sleeping:
+            if ntp_interval.due():
+                if power is not None:
+                    power.active()
+                if worker is not None:
+                    worker.submit("ntp", set_time_from_ntp, config["timezone_offset"], silent_display)
+                else:
+                    print("NTP zamanı güncelleniyor...")
+                    if set_time_from_ntp(config["timezone_offset"]):
+                        last_ntp_update_time = time.time()
+                        snapshot_dirty = True
+                    else:
+                        print("NTP senkronizasyonu başarısız, bir sonraki döngüde tekrar denenecek.")
+                        ntp_interval.expire()
+                        log_event(EVENT_NTP_FAIL)
+            
+            if worker is not None and get_dns_cache().needs_refresh():
+                # Süresi dolmak üzere olan DNS kayıtları arka planda yenilenir
+                worker.submit("dns", get_dns_cache().refresh_expiring)
+
+            if worker is None or not worker.is_pending("rss"):
+                fetch_kind = rss_scheduler.due(today_key, minute_of_day)
+                if fetch_kind is not None:
+                    print("RSS verileri güncelleniyor (%s)..." % ("bugün" if fetch_kind == FETCH_TODAY else "yarın"))
+                    if power is not None:
+                        power.active()
+                    if worker is not None:
+                        worker.submit(("rss", fetch_kind, today_key, tomorrow_key), get_city_schedules, rss_urls, silent_display, feed_sources)
+                    else:
+                        _, schedules = get_city_schedules(rss_urls, display_message, feed_sources)
+                        redraw_table = True # Çekme sırasında ekran temizlendi
+                        rss_failed = not apply_rss_result(rss_scheduler, schedule_cache, fetch_kind, schedules, today_key, tomorrow_key)
+                        if not rss_failed:
+                            last_rss_update_time = current_time
+                            snapshot_dirty = True
+
+        # Çoklu şehirde sayfalar ağa çıkmadan önbellekteki vakitlerle döndürülür
+        if len(cities) > 1 and city_interval.due():
+            city_index = (city_index + 1) % len(cities)
+
+        page_schedule = schedule_cache.get(city_index, today_key) or schedule_cache.latest(city_index)
+        if page_schedule is not None and (redraw_table or page_schedule is not displayed_schedule):
+            # Yeni vakitler geldi, şehir değişti veya gün dönümünde önceden çekilmiş vakitler devreye alındı
+            memory.before_large()
+            display_schedule(page_schedule, large_countdown, city_title(cities[city_index][0], page_schedule))
+        displayed_schedule = page_schedule
+        if events is not None:
+            # Vakitler, gün veya saat (NTP) değiştiğinde zamanlayıcı ana şehrin vakitlerine göre yeniden kurulur
+            events_schedule = schedule_cache.get(0, today_key)
+            if events_schedule is not None and (snapshot_dirty or events_schedule is not events.schedule):
+                events.arm(events_schedule, schedule_cache.get(0, tomorrow_key))
+            events.service()
+        if snapshot_dirty:
+            save_warm_snapshot(schedule_cache, len(cities), today_key, last_ntp_update_time, last_rss_update_time, wlan)
+            persist_state(schedule_cache, len(cities), today_key, tomorrow_key, last_ntp_update_time, last_rss_update_time)
+        if rss_failed:
+            print("RSS veri çekme başarısız. Mevcut vakitlerle devam ediliyor (varsa) veya bekleniyor.")
+            log_event(EVENT_RSS_FAIL, "hata %d" % rss_scheduler.failures)
+            display_message("RSS Cekilemedi.", 6, show_now=True)
+        if power is not None and not radio_sleeping and wlan.isconnected() and ntp_interval.remaining_ms() > 0:
+            # Senkron bitti (NTP başarısızsa radyo açık kalır ve her döngüde tekrar denenir)
+            # RSS tekrar denemesi zamanlayıcının bekleme süresi dolunca radyo açılarak yapılır
+            if rss_scheduler.due(today_key, minute_of_day) is None:
+                power.sleep_radio(wlan)
+
+        if page_schedule is None:
             display_message("Vakit Bulunamiyor.", 6, show_now=True)
-            time.sleep(10)
+            time.sleep(1 if worker is not None else 10)
             continue
 
-        calculate_and_display_next_prayer_time(vakitler_for_calc)
+        calculate_and_display_next_prayer_time(page_schedule, large_countdown, schedule_cache.get(city_index, tomorrow_key), seconds_countdown)
+        boot_profile.mark("first_frame")
+        if power is not None:
+            power.apply_panel(oled, page_schedule, minute_of_day)
         
-        gc.collect()
-        time.sleep(1)
+        memory.sample()
+        if not boot_profile.marked("idle"):
+            # İlk tam döngü sonrası: ilk ekrana kadar geçen süre ve çöp toplandıktan sonra boştaki bellek
+            memory.collect()
+            boot_profile.mark("idle")
+            boot_profile.report()
+        if (worker is None or worker.is_idle()) and fragmentation_interval.due():
+            memory.report(memory.measure_fragmentation()) # Ölçüm sırasında işçi thread'i bellek ayırmamalı
+        # Saniye atlanmasın diye RTC'nin bir sonraki saniyesine kadar beklenir (8. alan: mikrosaniye)
+        wait_ms = 1000 - machine.RTC().datetime()[7] // 1000 % 1000 if seconds_countdown else 1000
+        if power is not None:
+            power.idle()
+            event_ms = events.remaining_ms() if events is not None else None
+            if event_ms is not None and event_ms <= 2 * wait_ms:
+                # lightsleep'te vakit zamanlayıcısı durur: vakitten hemen önce RTC'ye göre kurulup normal beklenir
+                events.rearm()
+                time.sleep_ms(wait_ms)
+            else:
+                power.sleep_ms(wait_ms)
+        else:
+            time.sleep_ms(wait_ms)
 
 if __name__ == "__main__":
-    main_loop()
+    try:
+        main_loop()
+    except Exception as e:
+        # Beklenmeyen hatada REPL'e düşmek yerine yeniden başla; RTC'deki durum özeti
+        # korunduğu için cihaz ağa çıkmadan vakitleri göstermeye devam eder
+        print("Beklenmeyen hata, sıcak yeniden başlatılıyor: %s - %s" % (type(e).__name__, e))
+        log_event(EVENT_CRASH, type(e).__name__)
+        time.sleep(1)
+        machine.reset()
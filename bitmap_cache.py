@@ -0,0 +1,140 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# Önceden çizilmiş satır/glif bitmap önbelleği ve büyük rakam (7 segment) fontu.
+import framebuf
+from collections import OrderedDict
+
+LINE_HEIGHT = 8
+
+# Büyük rakam fontu ölçüleri (piksel)
+BIG_DIGIT_WIDTH = 12
+BIG_DIGIT_HEIGHT = 16
+BIG_DIGIT_CELL = 16  # Rakam + boşluk
+BIG_COLON_CELL = 8
+BIG_SEGMENT = 2      # Segment kalınlığı
+
+# 7 segment tablosu: bit sırası a, b, c, d, e, f, g
+#   aaa
+#  f   b
+#   ggg
+#  e   c
+#   ddd
+_SEGMENTS = {
+    "0": 0b0111111, "1": 0b0000110, "2": 0b1011011, "3": 0b1001111,
+    "4": 0b1100110, "5": 0b1101101, "6": 0b1111101, "7": 0b0000111,
+    "8": 0b1111111, "9": 0b1101111, "-": 0b1000000,
+}
+
+def _buffer_size(width, height):
+    """MONO_VLSB formatında bir FrameBuffer için gereken bayt sayısı."""
+    return width * ((height + 7) // 8)
+
+def big_text_width(text):
+    """Büyük fontla yazılacak metnin piksel genişliğini döndürür."""
+    width = 0
+    for ch in text:
+        width += BIG_COLON_CELL if ch == ":" else BIG_DIGIT_CELL
+    return width
+
+class BitmapCache:
+    """
+    Sabit metinleri (vakit satırları, etiketler) ve büyük rakam gliflerini bir kez
+    küçük FrameBuffer'lara çizer, sonraki çizimlerde sadece blit yapılır.
+    Toplam bayt bütçesi aşılınca en uzun süre kullanılmayan kayıt atılır (LRU).
+    """
+    def __init__(self, budget_bytes=2048):
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict() # anahtar -> (FrameBuffer, bayt sayısı)
+
+    def _lookup(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries[key] = entry # En sona taşı (en yeni kullanılan)
+        self.hits += 1
+        return entry[0]
+
+    def _store(self, key, fb, size):
+        if size > self.budget_bytes:
+            return # Bütçeden büyük kayıt saklanmaz, sadece bu seferlik kullanılır
+        while self._entries and self.used_bytes + size > self.budget_bytes:
+            oldest_key = next(iter(self._entries))
+            _, old_size = self._entries.pop(oldest_key)
+            self.used_bytes -= old_size
+            self.evictions += 1
+        self._entries[key] = (fb, size)
+        self.used_bytes += size
+
+    def line(self, text, width):
+        """'text' satırının width x 8 piksellik önbellekli bitmap'ini döndürür."""
+        key = ("L", width, text)
+        fb = self._lookup(key)
+        if fb is None:
+            size = _buffer_size(width, LINE_HEIGHT)
+            fb = framebuf.FrameBuffer(bytearray(size), width, LINE_HEIGHT, framebuf.MONO_VLSB)
+            fb.text(text[:width // 8], 0, 0, 1)
+            self._store(key, fb, size)
+        return fb
+
+    def big_glyph(self, ch):
+        """Büyük font için tek bir karakterin (0-9, ':' veya '-') bitmap'ini döndürür."""
+        key = ("B", ch)
+        fb = self._lookup(key)
+        if fb is None:
+            width = BIG_COLON_CELL if ch == ":" else BIG_DIGIT_CELL
+            size = _buffer_size(width, BIG_DIGIT_HEIGHT)
+            fb = framebuf.FrameBuffer(bytearray(size), width, BIG_DIGIT_HEIGHT, framebuf.MONO_VLSB)
+            _render_big_glyph(fb, ch)
+            self._store(key, fb, size)
+        return fb
+
+    def draw_line(self, display, text, line, width):
+        """Önbellekteki satırı ekranın ilgili satırına blit eder."""
+        display.blit(self.line(text, width), 0, line * LINE_HEIGHT)
+
+    def draw_big_text(self, display, text, x, y):
+        """Metni büyük fontla (x, y) konumundan başlayarak çizer. Bitiş x'ini döndürür."""
+        for ch in text:
+            glyph = self.big_glyph(ch)
+            display.blit(glyph, x, y)
+            x += BIG_COLON_CELL if ch == ":" else BIG_DIGIT_CELL
+        return x
+
+    def clear(self):
+        self._entries = OrderedDict()
+        self.used_bytes = 0
+
+def _render_big_glyph(fb, ch):
+    """Bir karakteri 7 segment tarzında FrameBuffer'a çizer."""
+    fb.fill(0)
+    t = BIG_SEGMENT
+    w = BIG_DIGIT_WIDTH
+    h = BIG_DIGIT_HEIGHT
+    if ch == ":":
+        fb.fill_rect(3, 4, t, t, 1)
+        fb.fill_rect(3, h - 6, t, t, 1)
+        return
+    segments = _SEGMENTS.get(ch, 0)
+    half = h // 2
+    if segments & 0b0000001: # a
+        fb.fill_rect(t, 0, w - 2 * t, t, 1)
+    if segments & 0b0000010: # b
+        fb.fill_rect(w - t, t, t, half - t, 1)
+    if segments & 0b0000100: # c
+        fb.fill_rect(w - t, half, t, half - t, 1)
+    if segments & 0b0001000: # d
+        fb.fill_rect(t, h - t, w - 2 * t, t, 1)
+    if segments & 0b0010000: # e
+        fb.fill_rect(0, half, t, half - t, 1)
+    if segments & 0b0100000: # f
+        fb.fill_rect(0, t, t, half - t, 1)
+    if segments & 0b1000000: # g
+        fb.fill_rect(t, half - t // 2, w - 2 * t, t, 1)
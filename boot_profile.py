@@ -0,0 +1,41 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# Açılış aşamalarının (importlar, OLED, ayarlar, Wi-Fi, ilk ekran) zamanını ve boş belleği kaydeder.
+import gc
+import instrumentation
+
+_marks = [] # (aşama, reset'ten beri ms, boş bellek)
+
+def _mem_free():
+    try:
+        return gc.mem_free()
+    except AttributeError:
+        return 0 # CPython'da gc.mem_free yok
+
+def mark(stage):
+    """Aşamayı ilk kez görüldüğünde kaydeder (main_loop tekrar çağrılsa da değişmez). Yeni ise True."""
+    if marked(stage):
+        return False
+    now = instrumentation.ticks_ms() # ESP32'de ticks_ms reset anından itibaren sayar
+    _marks.append((stage, now, _mem_free()))
+    instrumentation.record("boot_%s_ms" % stage, now)
+    return True
+
+def marked(stage):
+    for entry in _marks:
+        if entry[0] == stage:
+            return True
+    return False
+
+def marks():
+    return list(_marks)
+
+def report():
+    """Aşamaları, bir öncekine göre geçen süre ve boş bellekle birlikte konsola yazdırır."""
+    previous = 0
+    for stage, at_ms, free in _marks:
+        print("Açılış %-12s %6d ms (+%d ms) boş bellek: %d" % (stage, at_ms, at_ms - previous, free))
+        previous = at_ms
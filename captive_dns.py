@@ -0,0 +1,80 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# Kurulum (AP) modunda tüm DNS sorgularını cihazın IP adresiyle yanıtlayan küçük, bloklamayan DNS sunucusu.
+# Telefonlar captive-portal kontrolünü bu sayede cihaza yapar ve kurulum sayfası kendiliğinden açılır.
+import usocket
+import errno
+import instrumentation
+
+DNS_PORT = 53
+ANSWER_TTL_SECONDS = 60
+_TYPE_A = 1
+_CLASS_IN = 1
+
+class CaptiveDns:
+    """
+    UDP 53'ü dinler. handle() bekleyen bir sorguyu okur ve yanıtlar, sorgu yoksa hemen döner.
+    sock, HTTP sunucusuyla aynı select.poll döngüsüne kaydedilir. port ve bind_ip bilgisayardaki testler içindir.
+    """
+    def __init__(self, ip, port=DNS_PORT, bind_ip="0.0.0.0"):
+        self.sock = usocket.socket(usocket.AF_INET, usocket.SOCK_DGRAM)
+        try:
+            self.sock.setsockopt(usocket.SOL_SOCKET, usocket.SO_REUSEADDR, 1)
+            self.sock.bind((bind_ip, port))
+            self.sock.setblocking(False)
+        except Exception:
+            self.sock.close()
+            raise
+        # Cevap kaydı her sorgu için aynıdır, bir kez hazırlanır:
+        # soru adına işaretçi (0xC00C), tür A, sınıf IN, TTL, veri uzunluğu 4, IPv4 adresi
+        self._answer = (b"\xc0\x0c\x00\x01\x00\x01" + ANSWER_TTL_SECONDS.to_bytes(4, "big") +
+                        b"\x00\x04" + bytes(int(part) for part in ip.split(".")))
+        self.queries = 0
+
+    def handle(self):
+        """Bekleyen sorguyu yanıtlar. Yanıt gönderildiyse True."""
+        try:
+            query, addr = self.sock.recvfrom(512)
+        except OSError as e:
+            if e.args[0] in (errno.EAGAIN, errno.ETIMEDOUT):
+                return False
+            raise
+        response = self.build_response(query)
+        if response is None:
+            return False
+        try:
+            self.sock.sendto(response, addr)
+        except OSError as e:
+            print("DNS yanıtı gönderilemedi: %s" % e)
+            return False
+        self.queries += 1
+        instrumentation.count("captive_dns_queries")
+        return True
+
+    def build_response(self, query):
+        """Tek sorulu standart sorguya yanıt üretir; A sorgusuna AP adresini verir, diğer türlere boş cevap döner."""
+        if len(query) < 12 or query[2] & 0x80 or query[2] & 0x78 or query[4:6] != b"\x00\x01":
+            return None # Yanıt paketi, standart dışı sorgu veya birden fazla soru
+        end = 12
+        while end < len(query) and query[end] != 0:
+            end += query[end] + 1 # Etiket uzunluğu + etiket
+        end += 5 # Sondaki sıfır bayt, soru türü ve sınıfı
+        if end > len(query):
+            return None
+        qtype = (query[end - 4] << 8) | query[end - 3]
+        qclass = (query[end - 2] << 8) | query[end - 1]
+        answer = qtype == _TYPE_A and qclass == _CLASS_IN
+        # Başlık: aynı kimlik, QR=1 ve RD kopyalanır, RA=1; soru sayısı 1, cevap sayısı 0 veya 1
+        header = query[0:2] + bytes((0x80 | (query[2] & 0x01), 0x80)) + b"\x00\x01\x00" + (b"\x01" if answer else b"\x00") + b"\x00\x00\x00\x00"
+        if answer:
+            return header + query[12:end] + self._answer
+        return header + query[12:end]
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
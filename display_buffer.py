@@ -0,0 +1,146 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# Çift tamponlu ekran: çizim arka tampona yapılır, show() sadece kareyi teslim eder,
+# I2C aktarımı ayrı bir thread'de yapılır. Art arda teslim edilen kareler birleştirilir.
+import _thread
+import framebuf
+import instrumentation
+
+class DoubleBufferedDisplay:
+    """
+    SSD1306 sürücüsünü sarar. Çizim metotları (fill, text, rect, blit, ...) arka tampona çizer.
+    show() arka tamponu "teslim edilen kare" tamponuna kopyalar ve flush thread'ini uyandırır;
+    flush thread'i kareyi sürücünün tamponuna alıp panele gönderir. Panel her zaman eksiksiz bir kare gösterir.
+    Aktarım sürerken teslim edilen yeni kare öncekinin yerini alır (atlanan kare olarak sayılır).
+    Diğer sürücü komutları (contrast, poweroff, ...) aktarımla çakışmasın diye aynı bus kilidiyle çalıştırılır.
+    """
+    def __init__(self, device, stack_size=4 * 1024):
+        self.device = device
+        self.width = device.width
+        self.height = device.height
+        size = len(device.buffer)
+        self.back = bytearray(size)
+        self._back_fb = framebuf.FrameBuffer(self.back, self.width, self.height, framebuf.MONO_VLSB)
+        self._pending = bytearray(size)
+        self._region = None # Bekleyen karenin gönderilecek bölgesi (x0, x1, sayfa0, sayfa1)
+        self._dirty = False
+        self._committed_ms = 0
+        self._lock = _thread.allocate_lock() # _pending, _region ve _dirty'yi korur
+        self._bus_lock = _thread.allocate_lock() # I2C aktarımları
+        self._wake = _thread.allocate_lock()
+        self._wake.acquire() # Kare gelene kadar flush thread'i bu kilitte bekler
+        self.frames = 0
+        self.dropped_frames = 0
+        self.running = True
+        try:
+            _thread.stack_size(stack_size)
+        except (AttributeError, ValueError):
+            pass
+        _thread.start_new_thread(self._run, ())
+
+    # --- Çizim (arka tampon) ---
+    def fill(self, color):
+        self._back_fb.fill(color)
+
+    def text(self, text, x, y, color=1):
+        self._back_fb.text(text, x, y, color)
+
+    def rect(self, x, y, w, h, color, fill=False):
+        if fill:
+            self._back_fb.fill_rect(x, y, w, h, color)
+        else:
+            self._back_fb.rect(x, y, w, h, color)
+
+    def fill_rect(self, x, y, w, h, color):
+        self._back_fb.fill_rect(x, y, w, h, color)
+
+    def blit(self, fb, x, y, key=-1):
+        self._back_fb.blit(fb, x, y, key)
+
+    def pixel(self, x, y, color=None):
+        if color is None:
+            return self._back_fb.pixel(x, y)
+        self._back_fb.pixel(x, y, color)
+
+    def hline(self, x, y, w, color):
+        self._back_fb.hline(x, y, w, color)
+
+    def vline(self, x, y, h, color):
+        self._back_fb.vline(x, y, h, color)
+
+    def line(self, x1, y1, x2, y2, color):
+        self._back_fb.line(x1, y1, x2, y2, color)
+
+    def clear_line(self, line):
+        self._back_fb.fill_rect(0, line * 8, self.width, 8, 0)
+
+    # --- Teslim ---
+    def show(self):
+        self._commit(None)
+
+    def show_region(self, x0, x1, page0, page1):
+        self._commit((x0, x1, page0, page1))
+
+    def _commit(self, region):
+        with self._lock:
+            if self._dirty:
+                self.dropped_frames += 1
+                instrumentation.count("display_dropped_frames")
+                # Bekleyen kare gönderilmeden üzerine yazılıyor: iki bölgenin birleşimi gönderilmeli
+                if region is not None and self._region is not None:
+                    region = (min(region[0], self._region[0]), max(region[1], self._region[1]),
+                              min(region[2], self._region[2]), max(region[3], self._region[3]))
+                else:
+                    region = None
+            self._pending[:] = self.back
+            self._region = region
+            self._dirty = True
+            self._committed_ms = instrumentation.ticks_ms()
+        self._signal()
+
+    def _signal(self):
+        try:
+            if self._wake.locked():
+                self._wake.release()
+        except RuntimeError:
+            pass # Flush thread'i kilidi zaten bıraktı
+
+    def _run(self):
+        while self.running:
+            self._wake.acquire()
+            while True:
+                with self._lock:
+                    if not self._dirty:
+                        break
+                    self.device.buffer[:] = self._pending
+                    region = self._region
+                    committed_ms = self._committed_ms
+                    self._dirty = False
+                with self._bus_lock:
+                    try:
+                        if region is None:
+                            self.device.show()
+                        else:
+                            self.device.show_region(*region)
+                    except Exception as e:
+                        print("Ekran aktarım hatası: %s" % e)
+                self.frames += 1
+                # Teslimden panelde görünmeye kadar geçen süre (kuyrukta bekleme + I2C aktarımı)
+                instrumentation.record("display_flush_ms", instrumentation.ticks_diff(instrumentation.ticks_ms(), committed_ms))
+
+    def stop(self):
+        self.running = False
+        self._signal()
+
+    # --- Diğer sürücü komutları ---
+    def __getattr__(self, name):
+        attr = getattr(self.device, name)
+        if not callable(attr):
+            return attr
+        def locked_call(*args):
+            with self._bus_lock:
+                return attr(*args)
+        return locked_call
@@ -0,0 +1,123 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# RSS ve NTP sunucuları için TTL'li, flash'a kaydedilen DNS önbelleği.
+# Kayıtların yaşı ticks_ms ile ölçülür: açılışta NTP'den önce RTC 2000 yılını gösterebilir, duvar saatine güvenilmez.
+import ujson
+import usocket
+import instrumentation
+from timing import Deadline
+
+DNS_CACHE_FILE = "dns_cache.json"
+
+class DnsCache:
+    """
+    Çözülen adresleri RAM'de TTL ile tutar ve flash'a kaydeder.
+    Süresi dolan kayıt yeniden çözülemezse (DNS'e ulaşılamıyorsa) eski adres kullanılır.
+    Flash'tan yüklenen kayıtların yaşı bilinmez: ilk başarılı çözümlemeye kadar süresi dolmuş sayılır,
+    sadece DNS'e ulaşılamazsa yedek olarak kullanılır.
+    """
+    def __init__(self, path=DNS_CACHE_FILE, ttl_seconds=6 * 3600, refresh_margin_seconds=600):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self._entries = {} # host -> [ip, geçerlilik (Deadline; None ise doğrulanmamış), arka plan yenileme beklemesi]
+        self._dirty = False
+        self.stale_hits = 0
+        self.load()
+
+    def load(self):
+        """Dosyadaki adresleri doğrulanmamış kayıt olarak yükler. Eski biçim ({host: [ip, zaman]}) de okunur."""
+        self._entries = {}
+        try:
+            with open(self.path, "r") as f:
+                entries = ujson.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(entries, dict):
+            return
+        for host, value in entries.items():
+            ip = value[0] if isinstance(value, list) and value else value
+            if isinstance(ip, str):
+                self._entries[host] = [ip, None, None]
+
+    def save(self):
+        """Sadece değişiklik varsa dosyaya yazar (flash yıpranmasını azaltmak için). Sadece adresler saklanır."""
+        if not self._dirty:
+            return
+        try:
+            # Kopya (dict.copy tek adımda alınır): ağ işçisi yazarken kayıt eklenebilir
+            addresses = dict((host, entry[0]) for host, entry in self._entries.copy().items())
+            with open(self.path, "w") as f:
+                ujson.dump(addresses, f)
+            self._dirty = False
+        except OSError as e:
+            print("DNS önbelleği kaydedilemedi: %s" % e)
+
+    def _lookup(self, host):
+        start = instrumentation.ticks_ms()
+        try:
+            ip = usocket.getaddrinfo(host, 80)[0][-1][0]
+        except Exception:
+            instrumentation.count("dns_fail")
+            raise
+        instrumentation.record("dns_lookup_ms", instrumentation.ticks_diff(instrumentation.ticks_ms(), start))
+        entry = self._entries.get(host)
+        if entry is None or entry[0] != ip:
+            self._dirty = True
+        self._entries[host] = [ip, Deadline(self.ttl_seconds * 1000), None]
+        return ip
+
+    def resolve_ip(self, host):
+        """Host'un IP adresini döndürür. Süresi dolmuşsa yeniden çözer, başarısızsa eski adresi kullanır."""
+        entry = self._entries.get(host)
+        if entry is not None and entry[1] is not None and not entry[1].expired():
+            instrumentation.count("dns_hit")
+            return entry[0]
+        try:
+            ip = self._lookup(host)
+            self.save()
+            return ip
+        except Exception as e:
+            if entry is None:
+                raise
+            self.stale_hits += 1
+            instrumentation.count("dns_stale")
+            print("DNS çözülemedi (%s), eski adres kullanılıyor: %s -> %s" % (e, host, entry[0]))
+            return entry[0]
+
+    def resolve(self, host, port):
+        """socket.connect için (ip, port) adresi döndürür."""
+        return usocket.getaddrinfo(self.resolve_ip(host), port)[0][-1]
+
+    def needs_refresh(self):
+        """Süresi dolmak üzere olan veya doğrulanmamış kayıt varsa True (arka planda yenilemek için)."""
+        for entry in self._entries.copy().values():
+            if self._expiring(entry):
+                return True
+        return False
+
+    def _expiring(self, entry):
+        if entry[2] is not None and not entry[2].expired():
+            return False # Son arka plan yenilemesi başarısız oldu, bir süre beklenir
+        return entry[1] is None or entry[1].remaining_ms() < self.refresh_margin_seconds * 1000
+
+    def refresh_expiring(self):
+        """
+        Süresi dolmak üzere olan kayıtları yeniden çözer. Ağ işçisinde çağrılabilir; ana thread aynı anda
+        kayıt ekleyebildiği için sözlüğün kopyası dolaşılır.
+        """
+        refreshed = 0
+        for host, entry in self._entries.copy().items():
+            if self._expiring(entry):
+                try:
+                    self._lookup(host)
+                    refreshed += 1
+                except Exception as e:
+                    # Eski adres yedek olarak kullanılmaya devam eder (geçerli sayılmaz), bir süre sonra tekrar denenir
+                    entry[2] = Deadline(2 * self.refresh_margin_seconds * 1000)
+                    print("DNS arka plan yenileme hatası (%s): %s" % (host, e))
+        self.save()
+        return refreshed
@@ -0,0 +1,148 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# Ayrıştırıcıları örnek ve bozulmuş beslemeler üzerinde karşılaştıran teşhis aracı (cihazda veya bilgisayarda).
+# Her ayrıştırıcı için hız (KB/sn), çağrı başına bellek ayırma ve diğerleriyle/beklenen sonuçla uyum raporlanır.
+#   import feed_bench; feed_bench.compare_backends()
+import gc
+import os
+import instrumentation
+from prayer_schedule import PrayerSchedule
+from feed_parsers import PARSERS, sniff
+
+# namazvakti.com DailyRSS düzeni (açıklama HTML kaçışlı)
+SAMPLE_RSS = (b'<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0"><channel>\n'
+              b'<title>NamazVakti.com</title>\n<item>\n<title>19 Ekim 2026 Pazartesi</title>\n'
+              b'<description>\xc4\xb0ms\xc3\xa2k : 05:41&lt;br /&gt;G\xc3\xbcne\xc5\x9f : 07:04&lt;br /&gt;'
+              b'\xc3\x96\xc4\x9fle : 12:44&lt;br /&gt;\xc4\xb0kindi : 15:52&lt;br /&gt;'
+              b'Ak\xc5\x9fam : 18:14&lt;br /&gt;Yats\xc4\xb1 : 19:32&lt;br /&gt;</description>\n'
+              b'</item>\n</channel></rss>\n')
+SAMPLE_JSON = (b'{"code": 200, "data": {"timings": {"Fajr": "05:41", "Sunrise": "07:04", "Dhuhr": "12:44",'
+               b' "Asr": "15:52", "Maghrib": "18:14", "Isha": "19:32"}, "date": {"readable": "19 Ekim 2026"}}}')
+SAMPLE_CSV = b"tarih;imsak;gunes;ogle;ikindi;aksam;yatsi\r\n19 Ekim 2026;05:41;07:04;12:44;15:52;18:14;19:32\r\n"
+SAMPLE_EXPECTED = (341, 424, 764, 952, 1094, 1172)
+
+def mutations(body):
+    """Sahada görülebilecek düzen değişiklikleri: (ad, bozulmuş gövde) listesi."""
+    return [
+        ("crlf", body.replace(b"\n", b"\r\n")),
+        ("ascii_adlar", body.replace(b"\xc4\xb0ms\xc3\xa2k", b"Imsak").replace(b"Yats\xc4\xb1", b"Yatsi")),
+        ("nbsp", body.replace(b" : ", b"&nbsp;:&nbsp;")),
+        ("cdata", body.replace(b"<description>", b"<description><![CDATA[").replace(b"</description>", b"]]></description>")
+                      .replace(b"&lt;", b"<").replace(b"&gt;", b">")),
+        ("genis_bosluk", body.replace(b" : ", b" :" + b" " * 32)),
+        ("iki_nokta_yok", body.replace(b" : ", b" ")),
+        ("etiketli_saat", body.replace(b" : ", b" : &lt;b&gt;")),
+    ]
+
+def corpus():
+    """(ad, gövde, beklenen dakikalar veya None) listesi. Beklenen None ise uyum çoğunluğa göre ölçülür."""
+    samples = [("rss", SAMPLE_RSS, SAMPLE_EXPECTED), ("json", SAMPLE_JSON, SAMPLE_EXPECTED), ("csv", SAMPLE_CSV, SAMPLE_EXPECTED)]
+    for name, body in mutations(SAMPLE_RSS):
+        samples.append(("rss_" + name, body, SAMPLE_EXPECTED))
+    return samples
+
+def load_recorded(directory="feeds", expected=None):
+    """
+    Dosyalardaki yanıt gövdelerini (dosya başına bir gövde) okur.
+    expected: {dosya adı: beklenen dakikalar}; verilmeyen dosyalarda sonuç çoğunluğa göre ölçülür.
+    """
+    samples = []
+    try:
+        names = sorted(os.listdir(directory))
+    except OSError:
+        return samples
+    for name in names:
+        with open(directory + "/" + name, "rb") as f:
+            minutes = expected.get(name) if expected else None
+            samples.append((name, f.read(), tuple(minutes) if minutes else None))
+    return samples
+
+def _alloc_start():
+    try:
+        gc.collect()
+        gc.disable() # Ölçüm sırasında toplama olursa ayrılan miktar eksik görünür
+        return gc.mem_alloc()
+    except AttributeError:
+        import tracemalloc # CPython: bellek ayırma tepe değeri
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        return tracemalloc.get_traced_memory()[0]
+
+def _alloc_end(start):
+    try:
+        used = gc.mem_alloc() - start
+        gc.enable()
+        return used
+    except AttributeError:
+        import tracemalloc
+        return tracemalloc.get_traced_memory()[1] - start
+
+def _run(parser, body):
+    schedule = PrayerSchedule()
+    try:
+        title = parser(body, schedule)
+    except Exception as e:
+        print("Ayrıştırıcı hatası: %s - %s" % (type(e).__name__, e))
+        return None
+    if title is None or not schedule.count():
+        return None
+    return tuple(schedule.minutes)
+
+def compare_backends(samples=None, backends=None, repeat=20):
+    """
+    Her örneği, içerik türüne uyan ayrıştırıcılarla ("auto" hepsiyle) çalıştırır.
+    Sonuç: {ayrıştırıcı: [KB/sn, bayt/çağrı, uyan, örnek sayısı]}.
+    Beklenen sonucu olmayan örneklerde en çok ayrıştırıcının verdiği sonuç doğru kabul edilir.
+    """
+    if samples is None:
+        samples = corpus() + load_recorded()
+    if backends is None:
+        backends = sorted(PARSERS)
+    results = {}
+    for name in backends:
+        results[name] = [0, 0, 0, 0, 0] # toplam bayt, toplam ms, toplam ayrılan bayt, uyan, örnek sayısı
+    disagreements = []
+    for sample_name, body, expected in samples:
+        kind = sniff(body)
+        outputs = {}
+        for name in backends:
+            if name != "auto" and name.split("_")[0] != kind:
+                continue
+            parser = PARSERS[name]
+            outputs[name] = _run(parser, body)
+            alloc = _alloc_start()
+            _run(parser, body)
+            results[name][2] += _alloc_end(alloc)
+            start = instrumentation.ticks_ms()
+            for _ in range(repeat):
+                _run(parser, body)
+            results[name][1] += instrumentation.ticks_diff(instrumentation.ticks_ms(), start)
+            results[name][0] += len(body) * repeat
+        if expected is None:
+            votes = {}
+            for output in outputs.values():
+                if output is not None:
+                    votes[output] = votes.get(output, 0) + 1
+            expected = max(votes, key=votes.get) if votes else None
+        for name in outputs:
+            results[name][4] += 1
+            if outputs[name] == expected:
+                results[name][3] += 1
+            else:
+                disagreements.append((sample_name, name))
+    report = {}
+    print("%-10s %9s %9s %7s" % ("ayristir.", "KB/sn", "bayt/cgr", "uyum"))
+    for name in backends:
+        total_bytes, total_ms, allocated, agreed, count = results[name]
+        if not count:
+            continue
+        kb_per_s = total_bytes * 1000 // max(1, total_ms) // 1024
+        report[name] = [kb_per_s, allocated // count, agreed, count]
+        print("%-10s %9d %9d %3d/%-3d" % (name, kb_per_s, allocated // count, agreed, count))
+    for sample_name, name in disagreements:
+        print("Uyuşmazlık: %s -> %s" % (sample_name, name))
+    return report
@@ -0,0 +1,227 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# Vakit kaynakları için değiştirilebilir ayrıştırıcılar ve içeriğe bakarak ayrıştırıcı seçimi.
+# Her ayrıştırıcı: parser(gövde baytları, PrayerSchedule) -> başlık (tarih metni) veya yapı bulunamazsa None.
+import instrumentation
+from prayer_schedule import PrayerSchedule, VAKIT_SAYISI, UNSET
+from rss_scanner import scan_rss
+
+# Diğer sağlayıcılardaki anahtar adları (VAKIT_ANAHTARLARI sırasıyla); karşılaştırma küçük harf ve ASCII ile yapılır.
+# Aynı vakit için birden fazla anahtar varsa önce yazılan tercih edilir: aladhan'daki "Imsak", Fajr'dan
+# 10 dk önceki ihtiyat vaktidir; Diyanet'in İmsâk vakti Fajr'a karşılık gelir.
+VAKIT_ESANLAMLILARI = (
+    ("fajr", "imsak", "sabah"),
+    ("gunes", "sunrise"),
+    ("ogle", "dhuhr", "zuhr"),
+    ("ikindi", "asr"),
+    ("aksam", "maghrib"),
+    ("yatsi", "isha"),
+)
+TARIH_ANAHTARLARI = ("title", "date", "tarih", "readable")
+
+_ASCII = (("İ", "i"), ("I", "i"), ("ı", "i"), ("â", "a"), ("Â", "a"), ("Ç", "c"), ("ç", "c"), ("Ğ", "g"), ("ğ", "g"),
+          ("Ö", "o"), ("ö", "o"), ("Ş", "s"), ("ş", "s"), ("Ü", "u"), ("ü", "u"))
+_ENTITIES = (("&lt;", "<"), ("&gt;", ">"), ("&quot;", '"'), ("&#39;", "'"), ("&nbsp;", " "), ("&amp;", "&"))
+
+def vakit_rank(name):
+    """(vakit indeksi, eşanlamlılar içindeki sırası); tanınmazsa (-1, 0)."""
+    for old, new in _ASCII:
+        name = name.replace(old, new)
+    name = name.lower()
+    for index in range(VAKIT_SAYISI):
+        synonyms = VAKIT_ESANLAMLILARI[index]
+        for rank in range(len(synonyms)):
+            if name == synonyms[rank]:
+                return index, rank
+    return -1, 0
+
+def vakit_index(name):
+    """Vakit adının (Türkçe veya diğer sağlayıcılardaki) indeksi, tanınmazsa -1."""
+    return vakit_rank(name)[0]
+
+def parse_time(text):
+    """"HH:MM" (sonunda saniye veya saat dilimi olabilir) metnini gün içindeki dakikaya çevirir, geçersizse -1."""
+    text = text.strip()
+    if len(text) < 5 or text[2] != ":" or not (text[:2].isdigit() and text[3:5].isdigit()):
+        return -1
+    hour, minute = int(text[:2]), int(text[3:5])
+    if hour > 23 or minute > 59:
+        return -1
+    return hour * 60 + minute
+
+# --- RSS: bayt tarayıcı ---
+def parse_rss(body, schedule):
+    """namazvakti.com RSS'i ham baytlar üzerinde tarar (varsayılan, bellek ayırmayan yol)."""
+    title_view = scan_rss(body, schedule)
+    if title_view is None:
+        return None
+    return str(title_view, 'utf-8')
+
+# --- RSS: düzenli ifade ve kelime yürüyüşü ---
+def parse_rss_regex(body, schedule):
+    """
+    Açıklama metnini çözüp etiketleri atar ve kelimeler üzerinde vakit adı + saat arar.
+    Bayt tarayıcıdan yavaştır ve daha çok bellek ayırır; ancak ad ile saat arasındaki ayraçlara takılmaz.
+    """
+    import re
+    text = str(body, 'utf-8')
+    item = text.find("<item>")
+    if item < 0:
+        return None
+    title = re.search("<title>([^<]*)</title>", text[item:])
+    desc_start = text.find("<description>", item)
+    desc_end = text.find("</description>", desc_start)
+    if title is None or desc_start < 0 or desc_end < 0:
+        return None
+    desc = text[desc_start + len("<description>"):desc_end]
+    text = None
+    if desc.startswith("<![CDATA["):
+        desc = desc[9:-3]
+    for entity, char in _ENTITIES:
+        desc = desc.replace(entity, char)
+    words = re.sub("<[^>]*>|:", " ", desc).split()
+    # "İmsâk : 03:17" ayraçlarla "İmsâk 03 17" olur; saat, addan sonraki iki sayıdır
+    for i in range(len(words) - 2):
+        index = vakit_index(words[i])
+        if index >= 0:
+            minutes = parse_time(words[i + 1] + ":" + words[i + 2])
+            if minutes >= 0:
+                schedule.minutes[index] = minutes
+    return title.group(1).strip()
+
+# --- JSON ---
+def _find_times(value, depth=0):
+    """Vakit anahtarlarından en az birini içeren ilk sözlüğü bulur (listelerde ilk eleman, en fazla 4 seviye)."""
+    if depth > 4:
+        return None
+    if isinstance(value, list):
+        return _find_times(value[0], depth + 1) if value else None
+    if not isinstance(value, dict):
+        return None
+    for key in value:
+        if vakit_index(key) >= 0:
+            return value
+    for key in value:
+        found = _find_times(value[key], depth + 1)
+        if found is not None:
+            return found
+    return None
+
+def _find_title(value, depth=0):
+    if depth > 4:
+        return None
+    if isinstance(value, list):
+        return _find_title(value[0], depth + 1) if value else None
+    if not isinstance(value, dict):
+        return None
+    for key in TARIH_ANAHTARLARI:
+        if isinstance(value.get(key), str):
+            return value[key]
+    for key in value:
+        found = _find_title(value[key], depth + 1)
+        if found is not None:
+            return found
+    return None
+
+def parse_json(body, schedule):
+    """
+    JSON sağlayıcılar: {"imsak": "05:30", ...}, [{"date": ..., "times": {...}}] veya
+    {"data": {"timings": {"Fajr": ...}, "date": {"readable": ...}}} gibi yapılar.
+    """
+    import ujson
+    try:
+        data = ujson.loads(body)
+    except ValueError:
+        return None
+    times = _find_times(data)
+    if times is None:
+        return None
+    ranks = [len(synonyms) for synonyms in VAKIT_ESANLAMLILARI] # Vakti dolduran anahtarın sırası
+    for key in times:
+        index, rank = vakit_rank(key)
+        if index >= 0 and rank < ranks[index] and isinstance(times[key], str):
+            minutes = parse_time(times[key])
+            if minutes >= 0:
+                schedule.minutes[index] = minutes
+                ranks[index] = rank
+    return _find_title(data) or ""
+
+# --- CSV ---
+def parse_csv(body, schedule):
+    """Başlık satırı vakit adları, ikinci satırı saatler olan CSV (ayraç ',' veya ';')."""
+    lines = str(body, 'utf-8').strip().split("\n")
+    if len(lines) < 2:
+        return None
+    sep = ";" if lines[0].count(";") > lines[0].count(",") else ","
+    names = lines[0].strip().split(sep)
+    values = lines[1].strip().split(sep)
+    title = ""
+    found = False
+    for column in range(min(len(names), len(values))):
+        name = names[column].strip().strip('"')
+        value = values[column].strip().strip('"')
+        index = vakit_index(name)
+        if index >= 0:
+            found = True
+            minutes = parse_time(value)
+            if minutes >= 0:
+                schedule.minutes[index] = minutes
+        elif name.lower() in TARIH_ANAHTARLARI:
+            title = value
+    return title if found else None
+
+# --- Seçim ---
+def sniff(body):
+    """İçeriğe bakarak ayrıştırıcı türünü tahmin eder: "json", "rss", "csv" veya bilinmiyorsa None."""
+    i = 0
+    if body[:3] == b"\xef\xbb\xbf": # UTF-8 BOM
+        i = 3
+    while i < len(body) and body[i] in (32, 9, 10, 13):
+        i += 1
+    if i == len(body):
+        return None
+    first = body[i]
+    if first in (123, 91): # '{', '['
+        return "json"
+    if first == 60: # '<'
+        return "rss"
+    line_end = body.find(b"\n", i)
+    header = body[i:line_end if line_end >= 0 else len(body)]
+    if b"," in header or b";" in header:
+        return "csv"
+    return None
+
+def parse_auto(body, schedule):
+    """
+    İçeriğe göre ayrıştırıcı seçer. RSS'te bayt tarayıcı vakitlerin hepsini bulamazsa (düzen değişmişse)
+    düzenli ifade yolu yedek olarak denenir; yedek sadece boş (UNSET) kalan vakitleri doldurur.
+    """
+    kind = sniff(body)
+    if kind is None:
+        return None
+    title = PARSERS[kind](body, schedule)
+    if kind == "rss" and schedule.count() < VAKIT_SAYISI:
+        extra = PrayerSchedule()
+        fallback = parse_rss_regex(body, extra)
+        filled = 0
+        for index in range(VAKIT_SAYISI):
+            if schedule.minutes[index] == UNSET and extra.minutes[index] != UNSET:
+                schedule.minutes[index] = extra.minutes[index]
+                filled += 1
+        if filled:
+            instrumentation.count("feed_parser_fallbacks") # Düzen değişmiş olabilir
+        if title is None:
+            title = fallback
+    return title
+
+# Kaynak türü -> ayrıştırıcı ("sources" ayarındaki "parser" alanı)
+PARSERS = {
+    "auto": parse_auto,
+    "rss": parse_rss,
+    "rss_regex": parse_rss_regex,
+    "json": parse_json,
+    "csv": parse_csv,
+}
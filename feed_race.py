@@ -0,0 +1,214 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# Birden fazla vakit kaynağına kademeli başlatılan paralel istekler: ilk geçerli yanıt kazanır.
+import usocket
+import select
+import errno
+import instrumentation
+from http_client import split_url
+from prayer_schedule import PrayerSchedule, VAKIT_SAYISI
+from feed_parsers import PARSERS # Kaynak türü -> ayrıştırıcı(gövde baytları, PrayerSchedule) -> başlık veya None
+
+_EINPROGRESS = (errno.EINPROGRESS, 119) # 119: bazı MicroPython portlarında EINPROGRESS
+_WAITING, _CONNECTING, _RECEIVING, _DONE = 0, 1, 2, 3
+
+class SourceStats:
+    """
+    Kaynak başına başarı/hata sayısı ve ortalama gecikme. Sıralama için kullanılır.
+    stats: çağıranın sakladığı sözlük; böylece istatistikler bu modül bellekten çıkarılsa da korunur.
+    """
+    def __init__(self, stats=None):
+        self._stats = {} if stats is None else stats # url -> [başarı, hata, ortalama ms]
+
+    def record(self, url, ok, elapsed_ms=0):
+        stat = self._stats.get(url)
+        if stat is None:
+            stat = self._stats[url] = [0, 0, 0]
+        if ok:
+            # Üstel hareketli ortalama (yeni ölçüm %25 ağırlıklı)
+            stat[2] = elapsed_ms if stat[0] == 0 else (stat[2] * 3 + elapsed_ms) // 4
+            stat[0] += 1
+        else:
+            stat[1] += 1
+
+    def record_cancelled(self, url, elapsed_ms):
+        """Yarışı kaybedip iptal edilen kaynak: geçen süre gecikmenin alt sınırı olarak işlenir."""
+        stat = self._stats.get(url)
+        if stat is None:
+            self._stats[url] = [0, 0, elapsed_ms]
+        elif elapsed_ms > stat[2]:
+            stat[2] = (stat[2] * 3 + elapsed_ms) // 4
+
+    def score(self, url):
+        """Küçük olan önce denenir: hata oranıyla cezalandırılmış ortalama gecikme."""
+        stat = self._stats.get(url)
+        if stat is None:
+            return 0 # Hiç denenmemiş kaynaklar yapılandırma sırasıyla öne alınır
+        successes, failures, avg_ms = stat
+        return (avg_ms + 1000) * (failures + 1) // (successes + 1)
+
+    def order(self, sources):
+        """Kaynakları en hızlı sağlıklı kaynak önce gelecek şekilde sıralar (eşitlikte yapılandırma sırası korunur)."""
+        indexed = [(self.score(source[0]), i, source) for i, source in enumerate(sources)]
+        indexed.sort()
+        return [item[2] for item in indexed]
+
+    def get(self, url):
+        return self._stats.get(url)
+
+class _Attempt:
+    __slots__ = ("url", "parser", "start_at", "started_ms", "sock", "state", "chunks", "host", "path")
+
+    def __init__(self, url, parser, start_at):
+        self.url = url
+        self.parser = parser
+        self.start_at = start_at
+        self.started_ms = 0
+        self.sock = None
+        self.state = _WAITING
+        self.chunks = []
+        self.host = None
+        self.path = None
+
+    def close(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+            self.sock = None
+        self.state = _DONE
+        self.chunks = []
+
+def _parse_response(attempt):
+    """Yanıtı ayrıştırır; altı vaktin tamamı geçerliyse (PrayerSchedule, başlık), yoksa None."""
+    data = b"".join(attempt.chunks)
+    attempt.chunks = []
+    header_end = data.find(b"\r\n\r\n")
+    if header_end < 0:
+        return None
+    status_line_end = data.find(b"\r\n")
+    status_parts = data[:status_line_end].split(b" ")
+    if len(status_parts) < 2 or status_parts[1] != b"200":
+        return None
+    parser = PARSERS.get(attempt.parser)
+    if parser is None:
+        print("Bilinmeyen kaynak ayrıştırıcısı: %s" % attempt.parser)
+        return None
+    schedule = PrayerSchedule()
+    title = parser(data[header_end + 4:], schedule)
+    if title is None or schedule.count() != VAKIT_SAYISI: # Eksik vakitli yanıt yarışı kazanamaz
+        return None
+    return schedule, title
+
+def race(sources, stats, resolver, stagger_ms=1500, timeout_ms=15000):
+    """
+    sources: [(url, ayrıştırıcı türü), ...]. İstekler stats sırasına göre stagger_ms aralıklarla başlatılır.
+    İlk geçerli vakitleri döndüren kaynak kazanır, diğer istekler iptal edilir.
+    (url, PrayerSchedule, başlık) veya hiçbiri başarılı olmazsa None döndürür.
+    """
+    ordered = stats.order(sources)
+    now = instrumentation.ticks_ms()
+    attempts = [_Attempt(url, parser, i * stagger_ms) for i, (url, parser) in enumerate(ordered)]
+    poller = select.poll()
+    by_key = {}
+    race_start = now
+    winner = None
+    try:
+        while winner is None:
+            elapsed = instrumentation.ticks_diff(instrumentation.ticks_ms(), race_start)
+            if elapsed >= timeout_ms:
+                break
+            in_flight = 0
+            next_waiting = None
+            for attempt in attempts:
+                if attempt.state == _WAITING and elapsed >= attempt.start_at:
+                    _start(attempt, resolver, poller, by_key, stats)
+                if attempt.state in (_CONNECTING, _RECEIVING):
+                    in_flight += 1
+                elif attempt.state == _WAITING and next_waiting is None:
+                    next_waiting = attempt
+            if not in_flight:
+                if next_waiting is None:
+                    break
+                # Devam eden istek kalmadı, sıradaki kaynak beklemeden başlatılır
+                _start(next_waiting, resolver, poller, by_key, stats)
+                continue
+
+            for entry in poller.poll(50):
+                attempt = by_key.get(entry[0])
+                if attempt is None or attempt.state == _DONE:
+                    continue
+                event = entry[1]
+                try:
+                    if attempt.state == _CONNECTING and event & select.POLLOUT:
+                        attempt.sock.send(b"GET " + attempt.path.encode() + b" HTTP/1.0\r\nHost: " +
+                                          attempt.host.encode() + b"\r\nConnection: close\r\n\r\n")
+                        attempt.state = _RECEIVING
+                        poller.modify(attempt.sock, select.POLLIN)
+                    elif attempt.state == _RECEIVING and event & (select.POLLIN | select.POLLHUP):
+                        chunk = attempt.sock.recv(1024)
+                        if chunk:
+                            attempt.chunks.append(chunk)
+                            continue
+                        # Bağlantı kapandı: yanıt tamam
+                        poller.unregister(attempt.sock)
+                        result = _parse_response(attempt)
+                        spent = instrumentation.ticks_diff(instrumentation.ticks_ms(), attempt.started_ms)
+                        attempt.close()
+                        stats.record(attempt.url, result is not None, spent)
+                        if result is not None:
+                            instrumentation.record("feed_race_ms", spent)
+                            winner = (attempt.url, result[0], result[1])
+                            break
+                        print("Kaynak geçersiz yanıt verdi: %s" % attempt.url)
+                    elif event & (select.POLLERR | select.POLLHUP):
+                        raise OSError(errno.ECONNRESET)
+                except OSError as e:
+                    print("Kaynak hatası (%s): %s" % (attempt.url, e))
+                    try:
+                        poller.unregister(attempt.sock)
+                    except Exception:
+                        pass
+                    attempt.close()
+                    stats.record(attempt.url, False)
+    finally:
+        # Kaybeden (veya zaman aşımına uğrayan) istekleri iptal et
+        for attempt in attempts:
+            if attempt.state in (_CONNECTING, _RECEIVING):
+                if winner is None:
+                    stats.record(attempt.url, False)
+                else:
+                    stats.record_cancelled(attempt.url, instrumentation.ticks_diff(instrumentation.ticks_ms(), attempt.started_ms))
+                attempt.close()
+    return winner
+
+def _start(attempt, resolver, poller, by_key, stats):
+    try:
+        host, port, path = split_url(attempt.url)
+        addr = resolver(host, port)
+        sock = usocket.socket(usocket.AF_INET, usocket.SOCK_STREAM)
+        sock.setblocking(False)
+        attempt.sock = sock
+        attempt.host = host
+        attempt.path = path
+        attempt.started_ms = instrumentation.ticks_ms()
+        try:
+            sock.connect(addr)
+        except OSError as e:
+            if e.args[0] not in _EINPROGRESS:
+                raise
+        attempt.state = _CONNECTING
+        poller.register(sock, select.POLLOUT)
+        by_key[sock] = attempt
+        try:
+            by_key[sock.fileno()] = attempt # CPython poll() dosya numarası döndürür
+        except AttributeError:
+            pass
+    except Exception as e:
+        print("Kaynak başlatılamadı (%s): %s" % (attempt.url, e))
+        attempt.close()
+        stats.record(attempt.url, False)
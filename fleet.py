@@ -0,0 +1,288 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# Normal (STA) modda UDP üzerinden toplu yapılandırma: "kim var" yayınına cihazlar kimlik, sürüm ve
+# yapılandırma özetiyle cevap verir; HMAC-SHA256 ile imzalanmış tek bir yayın tüm cihazların ayarlarını değiştirir.
+#
+# Paketler (büyük endian, başlık: "NV", protokol sürümü, tür):
+#   KEŞİF   : başlık + nonce(I)
+#   DUYURU  : başlık + nonce(I) + kimlik(6s) + yazılım sürümü(H) + yapılandırma özeti(4s) + son sayaç(I)
+#   GÖNDER  : başlık + sayaç(I) + hedef sayısı(B) + kimlikler(6s * n) + uzunluk(H) + JSON + HMAC(32s)
+#             hedef sayısı 0 ise tüm cihazlar; sayaç, tekrar gönderimi (replay) önlemek için her gönderimde artar
+#   ONAY    : başlık + sayaç(I) + kimlik(6s) + durum(B) + yeni yapılandırma özeti(4s)
+import struct
+import hashlib
+import ujson
+import instrumentation
+from timing import Deadline
+
+try:
+    import usocket
+except ImportError:
+    import socket as usocket # Bilgisayarda (Provisioner ve benzetilmiş cihazlar)
+
+FLEET_PORT = 47474
+PROTOCOL_VERSION = 1
+MAGIC = b"NV"
+MSG_DISCOVER, MSG_ANNOUNCE, MSG_PUSH, MSG_ACK = 1, 2, 3, 4
+STATUS_OK, STATUS_REPLAY, STATUS_INVALID, STATUS_SAVE_FAILED = 0, 1, 2, 3
+BROADCAST_ID = b"\xff" * 6
+
+_HEADER = "!2sBB"
+_HEADER_SIZE = struct.calcsize(_HEADER)
+_ANNOUNCE = "!I6sH4sI"
+_ACK = "!I6sB4s"
+_MAC_SIZE = 32
+MAX_PACKET = 1024
+
+LOCKED_KEYS = ("fleet_key", "fleet_counter") # Uzaktan değiştirilemez
+SECRET_KEYS = ("password",) + LOCKED_KEYS # Yapılandırma özetine katılmaz (yayında şifre özeti dolaşmasın)
+# Liste ayarlarının elemanları: {anahtar: ((alan, zorunlu), ...)}. Alanlar metin olmalıdır; hatalı bir eleman
+# kaydedilirse açılışta city_list çöker ve cihaz yeniden başlatma döngüsüne girer.
+LIST_FIELDS = {
+    "cities": (("name", True), ("rss_url", True)),
+    "sources": (("url", True), ("parser", False)),
+}
+
+def hmac_sha256(key, message):
+    """RFC 2104 HMAC-SHA256 (MicroPython'da hmac modülü yok)."""
+    if len(key) > 64:
+        key = hashlib.sha256(key).digest()
+    key = key + b"\x00" * (64 - len(key))
+    inner = hashlib.sha256(bytes(b ^ 0x36 for b in key))
+    inner.update(message)
+    outer = hashlib.sha256(bytes(b ^ 0x5C for b in key))
+    outer.update(inner.digest())
+    return outer.digest()
+
+def _equal(a, b):
+    """Süresi içeriğe bağlı olmayan karşılaştırma."""
+    if len(a) != len(b):
+        return False
+    diff = 0
+    for i in range(len(a)):
+        diff |= a[i] ^ b[i]
+    return diff == 0
+
+def _canonical(value):
+    """Cihazlar arasında aynı çıkan JSON (sözlük anahtarları sıralı)."""
+    if isinstance(value, dict):
+        return "{" + ",".join(ujson.dumps(k) + ":" + _canonical(value[k]) for k in sorted(value)) + "}"
+    if isinstance(value, list):
+        return "[" + ",".join(_canonical(v) for v in value) + "]"
+    return ujson.dumps(value)
+
+def config_hash(config):
+    """Gizli anahtarlar hariç yapılandırmanın 4 baytlık özeti; aynı ayarlı cihazlarda aynıdır."""
+    public = {}
+    for key in config:
+        if key not in SECRET_KEYS:
+            public[key] = config[key]
+    return hashlib.sha256(_canonical(public).encode()).digest()[:4]
+
+def _valid_items(items, fields):
+    """Listedeki her eleman sözlük mü, zorunlu alanlar var mı ve bütün alanlar metin mi."""
+    for item in items:
+        if not isinstance(item, dict):
+            return False
+        for name, required in fields:
+            if name in item:
+                if not isinstance(item[name], str):
+                    return False
+            elif required:
+                return False
+    return True
+
+def _header(msg_type):
+    return struct.pack(_HEADER, MAGIC, PROTOCOL_VERSION, msg_type)
+
+def _parse_header(packet):
+    if len(packet) < _HEADER_SIZE:
+        return None
+    magic, version, msg_type = struct.unpack_from(_HEADER, packet)
+    if magic != MAGIC or version != PROTOCOL_VERSION:
+        return None
+    return msg_type
+
+def encode_push(key, counter, changes, targets=()):
+    """İmzalı GÖNDER paketi. changes: değiştirilecek ayarlar, targets: cihaz kimlikleri (boşsa hepsi)."""
+    payload = ujson.dumps(changes).encode()
+    body = (_header(MSG_PUSH) + struct.pack("!IB", counter, len(targets)) + b"".join(targets) +
+            struct.pack("!H", len(payload)) + payload)
+    return body + hmac_sha256(key, body)
+
+class FleetAgent:
+    """
+    Cihaz tarafı. sock ana döngüde bloklamadan okunur (handle). Yalnızca defaults'ta bulunan, LOCKED_KEYS
+    dışındaki ve varsayılanla aynı türdeki ayarlar kabul edilir; değişiklik save(config) ile kaydedilir.
+    LIST_FIELDS'teki liste ayarlarının her elemanı, alanları metin olan bir sözlük olmalıdır.
+    Kabul edilen son sayaç yapılandırmada ("fleet_counter") saklanır, daha küçük veya eşit sayaçlı paketler reddedilir.
+    """
+    def __init__(self, key, device_id, version, config, defaults, save, port=FLEET_PORT, bind_ip="0.0.0.0"):
+        self.key = key
+        self.device_id = device_id
+        self.version = version
+        self.config = config
+        self.defaults = defaults
+        self.save = save
+        self.sock = usocket.socket(usocket.AF_INET, usocket.SOCK_DGRAM)
+        try:
+            self.sock.setsockopt(usocket.SOL_SOCKET, usocket.SO_REUSEADDR, 1)
+            self.sock.bind((bind_ip, port))
+            self.sock.setblocking(False)
+        except Exception:
+            self.sock.close()
+            raise
+
+    def handle(self, max_packets=4):
+        """Bekleyen paketleri işler. Yapılandırma değiştiyse değişen anahtarların listesini, yoksa None döndürür."""
+        changed = None
+        for _ in range(max_packets):
+            try:
+                packet, addr = self.sock.recvfrom(MAX_PACKET)
+            except OSError:
+                break # Bekleyen paket yok (EAGAIN)
+            msg_type = _parse_header(packet)
+            try:
+                if msg_type == MSG_DISCOVER and len(packet) >= _HEADER_SIZE + 4:
+                    self._announce(packet, addr)
+                elif msg_type == MSG_PUSH:
+                    keys = self._push(packet, addr)
+                    if keys:
+                        changed = (changed or []) + keys
+            except Exception as e:
+                print("Filo paketi işlenemedi: %s - %s" % (type(e).__name__, e))
+        return changed
+
+    def _announce(self, packet, addr):
+        nonce = struct.unpack_from("!I", packet, _HEADER_SIZE)[0]
+        self.sock.sendto(_header(MSG_ANNOUNCE) + struct.pack(_ANNOUNCE, nonce, self.device_id, self.version,
+                         config_hash(self.config), self.config.get("fleet_counter", 0)), addr)
+        instrumentation.count("fleet_discover")
+
+    def _push(self, packet, addr):
+        if len(packet) < _HEADER_SIZE + 5 + 2 + _MAC_SIZE:
+            return None
+        body, mac = packet[:-_MAC_SIZE], packet[-_MAC_SIZE:]
+        if not _equal(hmac_sha256(self.key, body), mac):
+            # İmzasız paketlere cevap verilmez (anahtar denemesine geri bildirim olmasın)
+            instrumentation.count("fleet_auth_failures")
+            return None
+        counter, target_count = struct.unpack_from("!IB", body, _HEADER_SIZE)
+        offset = _HEADER_SIZE + 5
+        targets = [body[offset + i * 6:offset + i * 6 + 6] for i in range(target_count)]
+        offset += target_count * 6
+        if target_count and self.device_id not in targets and BROADCAST_ID not in targets:
+            return None # Başka cihazlara gönderilmiş
+        if counter <= self.config.get("fleet_counter", 0):
+            instrumentation.count("fleet_replays")
+            self._ack(addr, counter, STATUS_REPLAY)
+            return None
+        length = struct.unpack_from("!H", body, offset)[0]
+        try:
+            changes = ujson.loads(body[offset + 2:offset + 2 + length])
+        except ValueError:
+            changes = None
+        keys = self._validate(changes)
+        if keys is None:
+            self._ack(addr, counter, STATUS_INVALID)
+            return None
+        new_config = dict(self.config)
+        for key in keys:
+            new_config[key] = changes[key]
+        new_config["fleet_counter"] = counter
+        if not self.save(new_config):
+            self._ack(addr, counter, STATUS_SAVE_FAILED)
+            return None
+        self.config.update(new_config) # Ana döngü aynı sözlüğü kullanır
+        instrumentation.count("fleet_pushes")
+        self._ack(addr, counter, STATUS_OK)
+        print("Filo yapılandırması uygulandı: %s" % ", ".join(keys))
+        return keys
+
+    def _validate(self, changes):
+        """Değişecek anahtarların listesini döndürür; geçersiz bir ayar varsa None (hiçbiri uygulanmaz)."""
+        if not isinstance(changes, dict):
+            return None
+        keys = []
+        for key in changes:
+            if key in LOCKED_KEYS or key not in self.defaults or type(changes[key]) is not type(self.defaults[key]):
+                return None
+            if key in LIST_FIELDS and not _valid_items(changes[key], LIST_FIELDS[key]):
+                return None
+            if self.config.get(key) != changes[key]:
+                keys.append(key)
+        return keys
+
+    def _ack(self, addr, counter, status):
+        self.sock.sendto(_header(MSG_ACK) + struct.pack(_ACK, counter, self.device_id, status, config_hash(self.config)), addr)
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+class Provisioner:
+    """
+    Yönetici tarafı (bilgisayarda veya başka bir cihazda). addresses: paketlerin gönderileceği adresler;
+    varsayılan yerel ağ yayını. Bilgisayarda benzetilmiş cihazlar için 127.0.0.1 ve farklı portlar verilebilir.
+    """
+    def __init__(self, key, addresses=(("255.255.255.255", FLEET_PORT),)):
+        self.key = key
+        self.addresses = addresses
+        self.sock = usocket.socket(usocket.AF_INET, usocket.SOCK_DGRAM)
+        try:
+            self.sock.setsockopt(usocket.SOL_SOCKET, usocket.SO_BROADCAST, 1)
+        except (AttributeError, OSError):
+            pass
+        self.sock.bind(("0.0.0.0", 0))
+        self.sock.settimeout(0.1)
+        self.counter = 0
+
+    def _send(self, packet):
+        for address in self.addresses:
+            self.sock.sendto(packet, address)
+
+    def _collect(self, msg_type, timeout_ms):
+        replies = []
+        deadline = Deadline(timeout_ms)
+        while not deadline.expired():
+            try:
+                packet, addr = self.sock.recvfrom(MAX_PACKET)
+            except OSError:
+                continue # Zaman aşımı
+            if _parse_header(packet) == msg_type:
+                replies.append((packet[_HEADER_SIZE:], addr))
+        return replies
+
+    def discover(self, timeout_ms=1000):
+        """{kimlik: (adres, sürüm, yapılandırma özeti, son sayaç)} döndürür."""
+        nonce = instrumentation.ticks_ms() & 0xFFFFFFFF
+        self._send(_header(MSG_DISCOVER) + struct.pack("!I", nonce))
+        devices = {}
+        for payload, addr in self._collect(MSG_ANNOUNCE, timeout_ms):
+            reply_nonce, device_id, version, digest, counter = struct.unpack(_ANNOUNCE, payload)
+            if reply_nonce == nonce:
+                devices[device_id] = (addr, version, digest, counter)
+                self.counter = max(self.counter, counter)
+        return devices
+
+    def push(self, changes, targets=(), timeout_ms=1000):
+        """
+        Tek bir yayınla ayarları gönderir; {kimlik: (durum, yeni özet)} döndürür.
+        Sayaç, keşifte görülen en büyük sayaçtan büyük seçilir; bu yüzden önce discover() çağrılmalıdır.
+        """
+        self.counter += 1
+        self._send(encode_push(self.key, self.counter, changes, targets))
+        results = {}
+        for payload, addr in self._collect(MSG_ACK, timeout_ms):
+            counter, device_id, status, digest = struct.unpack(_ACK, payload)
+            if counter == self.counter:
+                results[device_id] = (status, digest)
+        return results
+
+    def close(self):
+        self.sock.close()
@@ -0,0 +1,167 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# Aynı sunucuya yapılan ardışık GET isteklerinde soketi yeniden kullanan (HTTP/1.1 keep-alive) istemci.
+import usocket
+
+def split_url(url):
+    """'http://host:port/yol' adresini (host, port, yol) olarak ayırır. Sadece http desteklenir."""
+    if url.startswith("http://"):
+        url = url[7:]
+    elif url.startswith("https://"):
+        raise ValueError("https desteklenmiyor: %s" % url)
+    slash = url.find("/")
+    if slash < 0:
+        host, path = url, "/"
+    else:
+        host, path = url[:slash], url[slash:]
+    port = 80
+    colon = host.find(":")
+    if colon >= 0:
+        port = int(host[colon + 1:])
+        host = host[:colon]
+    return host, port, path
+
+class KeepAliveClient:
+    """
+    Tek bir bağlantıyı aynı host'a giden istekler arasında açık tutar.
+    Farklı bir host istendiğinde eski bağlantı kapatılıp yenisi açılır.
+    """
+    def __init__(self, timeout=15, resolver=None):
+        self.timeout = timeout
+        self.resolver = resolver # host -> adres döndüren fonksiyon (None ise getaddrinfo)
+        self._sock = None
+        self._stream = None
+        self._host = None
+        self._port = None
+        self.connections_opened = 0
+        self.requests_sent = 0
+
+    def _connect(self, host, port):
+        self.close()
+        if self.resolver is not None:
+            addr = self.resolver(host, port)
+        else:
+            addr = usocket.getaddrinfo(host, port)[0][-1]
+        sock = usocket.socket(usocket.AF_INET, usocket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.timeout)
+            sock.connect(addr)
+        except Exception:
+            sock.close()
+            raise
+        self._sock = sock
+        # MicroPython'da makefile soketin kendisini döndürür, CPython'da akış nesnesi
+        self._stream = sock.makefile("rwb", 0)
+        self._host = host
+        self._port = port
+        self.connections_opened += 1
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._stream = None
+        self._host = None
+        self._port = None
+
+    def get(self, url):
+        """GET isteği yapar, (durum kodu, gövde baytları) döndürür."""
+        host, port, path = split_url(url)
+        reused = self._sock is not None and self._host == host and self._port == port
+        if not reused:
+            self._connect(host, port)
+        try:
+            return self._request(host, path)
+        except OSError:
+            self.close()
+            if not reused:
+                raise
+        # Sunucu boşta kalan bağlantıyı kapatmış olabilir, yeni bağlantıyla bir kez daha dene
+        self._connect(host, port)
+        try:
+            return self._request(host, path)
+        except OSError:
+            self.close()
+            raise
+
+    def _request(self, host, path):
+        stream = self._stream
+        stream.write(b"GET " + path.encode() + b" HTTP/1.1\r\nHost: " + host.encode() + b"\r\nConnection: keep-alive\r\n\r\n")
+        self.requests_sent += 1
+
+        status_line = stream.readline()
+        if not status_line:
+            raise OSError(104) # ECONNRESET: sunucu bağlantıyı kapattı
+        status = int(status_line.split(b" ", 2)[1])
+
+        content_length = -1
+        chunked = False
+        keep_alive = status_line.startswith(b"HTTP/1.1")
+        while True:
+            line = stream.readline()
+            if not line or line == b"\r\n":
+                break
+            parts = line.split(b":", 1)
+            if len(parts) != 2:
+                continue
+            name = parts[0].strip().lower()
+            value = parts[1].strip()
+            if name == b"content-length":
+                content_length = int(value)
+            elif name == b"transfer-encoding" and value.lower() == b"chunked":
+                chunked = True
+            elif name == b"connection":
+                keep_alive = value.lower() == b"keep-alive"
+
+        if chunked:
+            body = self._read_chunked()
+        elif content_length >= 0:
+            body = self._read_exact(content_length)
+        else:
+            # Uzunluk yok: gövde bağlantı kapanana kadar sürer
+            body = stream.read()
+            keep_alive = False
+
+        if not keep_alive:
+            self.close()
+        return status, body
+
+    def _read_exact(self, n):
+        data = self._stream.read(n)
+        if data is None or len(data) == n:
+            return data or b""
+        parts = [data]
+        remaining = n - len(data)
+        while remaining > 0:
+            part = self._stream.read(remaining)
+            if not part:
+                raise OSError(104)
+            parts.append(part)
+            remaining -= len(part)
+        return b"".join(parts)
+
+    def _read_chunked(self):
+        parts = []
+        while True:
+            size_line = self._stream.readline()
+            if not size_line:
+                raise OSError(104)
+            size = int(size_line.split(b";")[0].strip(), 16)
+            if size == 0:
+                # Sondaki (boş) başlıkları atla
+                while True:
+                    line = self._stream.readline()
+                    if not line or line == b"\r\n":
+                        break
+                break
+            parts.append(self._read_exact(size))
+            self._stream.readline() # Parçadan sonraki CRLF
+        if len(parts) == 1:
+            return parts[0]
+        return b"".join(parts)
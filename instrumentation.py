@@ -0,0 +1,60 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# Basit ölçüm kaydı: sayaçlar ve süre/değer istatistikleri (adet, toplam, en büyük, son).
+import time
+
+try:
+    ticks_ms = time.ticks_ms
+    ticks_diff = time.ticks_diff
+except AttributeError:
+    # Bilgisayarda (CPython) çalışırken
+    def ticks_ms():
+        return int(time.monotonic() * 1000)
+
+    def ticks_diff(new, old):
+        return new - old
+
+_metrics = {} # ad -> [adet, toplam, en büyük, son]
+
+def record(name, value):
+    """Bir ölçüm değeri (örn: milisaniye) ekler."""
+    metric = _metrics.get(name)
+    if metric is None:
+        _metrics[name] = [1, value, value, value]
+        return
+    metric[0] += 1
+    metric[1] += value
+    if value > metric[2]:
+        metric[2] = value
+    metric[3] = value
+
+def count(name, n=1):
+    """Sayaç artırır (değer istatistiği tutulmaz)."""
+    metric = _metrics.get(name)
+    if metric is None:
+        _metrics[name] = [n, 0, 0, 0]
+    else:
+        metric[0] += n
+
+def get(name):
+    """(adet, toplam, en büyük, son) döndürür; kayıt yoksa None."""
+    metric = _metrics.get(name)
+    return tuple(metric) if metric is not None else None
+
+def reset(name=None):
+    if name is None:
+        _metrics.clear()
+    else:
+        _metrics.pop(name, None)
+
+def report():
+    """Tüm ölçümleri konsola yazdırır."""
+    for name in sorted(_metrics):
+        n, total, peak, last = _metrics[name]
+        if total or peak:
+            print("%s: adet=%d ort=%d max=%d son=%d" % (name, n, total // n if n else 0, peak, last))
+        else:
+            print("%s: adet=%d" % (name, n))
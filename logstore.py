@@ -0,0 +1,219 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# Flash yıpranmasını azaltan, sadece sona ekleme yapan (log-structured) anahtar-değer deposu.
+# Sabit boyutlu kayıtlar, periyodik sıkıştırma, sınırlı toplam boyut ve çökme sonrası kurtarma.
+import os
+import struct
+import instrumentation
+
+try:
+    from binascii import crc32
+except ImportError:
+    from ubinascii import crc32
+
+RECORD_SIZE = 64
+MAX_KEY_BYTES = 16
+MAX_VALUE_BYTES = 36
+_MAGIC = 0xA5
+_OP_PUT = 0
+_OP_DELETE = 1
+# Kayıt: sihirli bayt, işlem, anahtar uzunluğu, değer uzunluğu, sıra no, anahtar, değer, CRC32
+_RECORD = "<BBBBI%ds%dsI" % (MAX_KEY_BYTES, MAX_VALUE_BYTES)
+
+class LogStore:
+    """
+    Her yazma dosyanın sonuna tek bir sabit boyutlu kayıt ekler; dosya asla yerinde değiştirilmez.
+    Açılışta kayıtlar sırayla okunur, son geçerli kayıt kazanır. CRC'si tutmayan (yarım yazılmış)
+    kuyruk atılır. Dosya max_bytes'a ulaşınca canlı kayıtlar yeni dosyaya yazılıp atomik rename yapılır.
+    Canlı kayıtlar en fazla max_bytes - compact_margin yer kaplayabilir: her sıkıştırmadan sonra en az
+    compact_margin baytlık ekleme yapılabilir, dolu bir depo her yazmada kendini yeniden yazmaz.
+    """
+    def __init__(self, path, max_bytes=8192, compact_margin=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        # Varsayılan pay: max_bytes'ın %25'i (en az bir kayıt)
+        self.compact_margin = max(RECORD_SIZE, max_bytes // 4 if compact_margin is None else compact_margin)
+        self._index = {} # anahtar (bytes) -> değer (bytes)
+        self._seq = 0
+        self._size = 0
+        self.bytes_written = 0
+        self.records_written = 0
+        self.compactions = 0
+        self.mount()
+
+    def mount(self):
+        """Dosyayı okuyup dizini kurar; yarım kalmış sıkıştırma veya bozuk kuyruk varsa onarır."""
+        tmp_path = self.path + ".tmp"
+        if _exists(tmp_path):
+            if _exists(self.path):
+                os.remove(tmp_path) # Sıkıştırma bitmeden kesilmiş, asıl dosya sağlam
+            else:
+                os.rename(tmp_path, self.path) # Rename'den hemen önce kesilmiş
+        self._index = {}
+        self._seq = 0
+        valid_size = 0
+        torn = False
+        try:
+            with open(self.path, "rb") as f:
+                while True:
+                    raw = f.read(RECORD_SIZE)
+                    if not raw:
+                        break
+                    record = _decode(raw)
+                    if record is None:
+                        torn = True
+                        break
+                    op, seq, key, value = record
+                    if op == _OP_PUT:
+                        self._index[key] = value
+                    else:
+                        self._index.pop(key, None)
+                    if seq > self._seq:
+                        self._seq = seq
+                    valid_size += RECORD_SIZE
+        except OSError:
+            pass # Dosya yok: boş depo
+        self._size = valid_size
+        if torn:
+            print("Kayıt deposunda bozuk kuyruk bulundu, onarılıyor: %s" % self.path)
+            self.compact()
+
+    def get(self, key, default=None):
+        return self._index.get(_key_bytes(key), default)
+
+    def keys(self):
+        return list(self._index)
+
+    def put(self, key, value):
+        """Değeri yazar. Değer değişmemişse flash'a hiçbir şey yazılmaz."""
+        key = _key_bytes(key)
+        value = bytes(value)
+        if len(value) > MAX_VALUE_BYTES:
+            raise ValueError("Değer çok uzun: %d bayt" % len(value))
+        if self._index.get(key) == value:
+            return False
+        if key not in self._index and (len(self._index) + 1) * RECORD_SIZE > self.max_bytes - self.compact_margin:
+            raise OSError(28) # ENOSPC: yeni anahtar sıkıştırma payına girerdi
+        self._append(_OP_PUT, key, value)
+        self._index[key] = value
+        return True
+
+    def delete(self, key):
+        key = _key_bytes(key)
+        if key not in self._index:
+            return False
+        self._append(_OP_DELETE, key, b"")
+        del self._index[key]
+        return True
+
+    def _append(self, op, key, value):
+        if self._size + RECORD_SIZE > self.max_bytes:
+            self.compact()
+        self._seq += 1
+        start = instrumentation.ticks_ms()
+        with open(self.path, "ab") as f:
+            f.write(_encode(op, self._seq, key, value))
+        self._size += RECORD_SIZE
+        self._account(start, RECORD_SIZE)
+
+    def compact(self):
+        """Sadece canlı kayıtları yeni bir dosyaya yazar ve atomik olarak eskisinin yerine koyar."""
+        live_bytes = len(self._index) * RECORD_SIZE
+        if live_bytes > self.max_bytes:
+            raise OSError(28) # ENOSPC: canlı veri bile sınırı aşıyor (max_bytes küçültülmüş olabilir)
+        start = instrumentation.ticks_ms()
+        tmp_path = self.path + ".tmp"
+        seq = 0
+        with open(tmp_path, "wb") as f:
+            for key, value in self._index.items():
+                seq += 1
+                f.write(_encode(_OP_PUT, seq, key, value))
+        if _exists(self.path):
+            os.remove(self.path)
+        os.rename(tmp_path, self.path)
+        self._seq = seq
+        self._size = live_bytes
+        self.compactions += 1
+        self._account(start, live_bytes)
+        instrumentation.count("logstore_compactions")
+
+    def _account(self, start, nbytes):
+        self.bytes_written += nbytes
+        self.records_written += nbytes // RECORD_SIZE
+        instrumentation.record("logstore_write_ms", instrumentation.ticks_diff(instrumentation.ticks_ms(), start))
+        instrumentation.count("logstore_bytes", nbytes)
+
+class EventLog:
+    """Depo üzerinde sabit kapasiteli, halka şeklinde hata/olay günlüğü."""
+    def __init__(self, store, capacity=16):
+        self.store = store
+        self.capacity = capacity
+        head = store.get("ev_head")
+        self._next = struct.unpack("<H", head)[0] if head else 0
+
+    def log(self, timestamp, code, message=""):
+        value = struct.pack("<IH", int(timestamp) & 0xFFFFFFFF, code) + _utf8_prefix(message.encode(), MAX_VALUE_BYTES - 6)
+        self.store.put("ev%02d" % (self._next % self.capacity), value)
+        self._next = (self._next + 1) % 0x10000
+        self.store.put("ev_head", struct.pack("<H", self._next))
+
+    def events(self):
+        """Olayları eskiden yeniye (zaman, kod, mesaj) olarak döndürür."""
+        result = []
+        count = min(self._next, self.capacity)
+        for i in range(self._next - count, self._next):
+            value = self.store.get("ev%02d" % (i % self.capacity))
+            if value is None:
+                continue
+            timestamp, code = struct.unpack("<IH", value[:6])
+            # Düzeltmeden önce yazılmış, karakter ortasından kesilmiş kayıtlar da okunabilsin
+            result.append((timestamp, code, _utf8_prefix(value[6:], MAX_VALUE_BYTES).decode()))
+        return result
+
+def _utf8_prefix(data, limit):
+    """
+    En fazla limit baytlık önek; çok baytlı bir UTF-8 karakteri (ş, ğ, ...) ortadan bölünmez
+    (prayer_schedule.encode_title gibi). Sonu yarım kalmış bir karakter de atılır.
+    """
+    data = data[:limit]
+    start = len(data)
+    while start > 0 and data[start - 1] & 0xC0 == 0x80: # Devam baytları
+        start -= 1
+    if start > 0 and data[start - 1] >= 0xC0:
+        lead = data[start - 1]
+        needed = 4 if lead >= 0xF0 else 3 if lead >= 0xE0 else 2
+        if len(data) - start + 1 < needed:
+            return data[:start - 1]
+    return data
+
+def _key_bytes(key):
+    if isinstance(key, str):
+        key = key.encode()
+    if len(key) > MAX_KEY_BYTES:
+        raise ValueError("Anahtar çok uzun: %s" % key)
+    return key
+
+def _encode(op, seq, key, value):
+    data = struct.pack(_RECORD, _MAGIC, op, len(key), len(value), seq, key, value, 0)
+    crc = crc32(data[:-4]) & 0xFFFFFFFF
+    return data[:-4] + struct.pack("<I", crc)
+
+def _decode(raw):
+    if len(raw) != RECORD_SIZE:
+        return None
+    magic, op, key_len, value_len, seq, key, value, crc = struct.unpack(_RECORD, raw)
+    if magic != _MAGIC or key_len > MAX_KEY_BYTES or value_len > MAX_VALUE_BYTES:
+        return None
+    if crc != crc32(raw[:-4]) & 0xFFFFFFFF:
+        return None
+    return op, seq, key[:key_len], value[:value_len]
+
+def _exists(path):
+    try:
+        os.stat(path)
+        return True
+    except OSError:
+        return False
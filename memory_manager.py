@@ -0,0 +1,124 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# Ölçülen bellek ayırma hızına göre gc.threshold ayarlayan, sadece büyük işlerden önce toplama yapan bellek yöneticisi.
+import gc
+import instrumentation
+
+class MemoryManager:
+    """
+    Her döngüde sample() çağrılır: ayrılan bellek miktarından ayırma hızı (bayt/sn) hesaplanır ve
+    gc.threshold, otomatik toplama yaklaşık target_interval_seconds'ta bir olacak şekilde ayarlanır.
+    RSS çekme veya sayfa çizimi gibi büyük işlerden önce before_large() ile toplama yapılır.
+    Toplama süreleri "gc_pause_ms", parçalanma oranı "heap_fragmentation_pct", saatlik toplama sayısı
+    "gc_collections_per_hour" olarak kaydedilir.
+    """
+    def __init__(self, target_interval_seconds=60, min_threshold=2048, max_threshold=32768):
+        self.target_interval_seconds = target_interval_seconds
+        self.min_threshold = min_threshold
+        self.max_threshold = max_threshold
+        self.alloc_rate = 0 # bayt/sn, üstel hareketli ortalama
+        self.threshold = 0
+        self.collections = 0 # Bizim yaptığımız toplamalar
+        self.auto_collections = 0 # gc.threshold ile tetiklenenler (ayrılan bellek azaldığında tespit edilir)
+        self.started_ms = instrumentation.ticks_ms()
+        try:
+            self._last_alloc = gc.mem_alloc()
+            self.enabled = True
+        except AttributeError:
+            self._last_alloc = 0
+            self.enabled = False # CPython'da gc.mem_alloc/mem_free yok
+        self._last_sample_ms = self.started_ms
+        self._allocated_since_collect = 0
+
+    def sample(self):
+        """Döngü başına bir kez çağrılır; toplama yapmaz, sadece ölçer ve eşiği günceller."""
+        if not self.enabled:
+            return
+        now = instrumentation.ticks_ms()
+        alloc = gc.mem_alloc()
+        delta = alloc - self._last_alloc
+        if delta < 0:
+            # Arada otomatik bir toplama olmuş; bu aralığın ayırma miktarı bilinmiyor
+            self.auto_collections += 1
+            instrumentation.count("gc_auto_collections")
+            self._allocated_since_collect = 0
+            delta = 0
+        else:
+            self._allocated_since_collect += delta
+        elapsed = instrumentation.ticks_diff(now, self._last_sample_ms)
+        if elapsed > 0:
+            rate = delta * 1000 // elapsed
+            self.alloc_rate = rate if self.alloc_rate == 0 else (self.alloc_rate * 7 + rate) // 8
+        self._last_alloc = alloc
+        self._last_sample_ms = now
+        self._tune()
+
+    def _tune(self):
+        threshold = self.alloc_rate * self.target_interval_seconds
+        threshold = max(self.min_threshold, min(threshold, self.max_threshold, gc.mem_free() // 2))
+        # Küçük değişiklikler için eşik yeniden ayarlanmaz
+        if abs(threshold - self.threshold) > self.threshold // 4:
+            self.threshold = threshold
+            gc.threshold(threshold)
+
+    def collect(self):
+        """Süresi ölçülen tam toplama."""
+        start = instrumentation.ticks_ms()
+        gc.collect()
+        instrumentation.record("gc_pause_ms", instrumentation.ticks_diff(instrumentation.ticks_ms(), start))
+        instrumentation.count("gc_collections")
+        self.collections += 1
+        self._allocated_since_collect = 0
+        if self.enabled:
+            self._last_alloc = gc.mem_alloc()
+
+    def before_large(self, min_garbage_bytes=1024):
+        """Büyük bir işten önce çağrılır. Son toplamadan beri anlamlı miktarda ayırma olduysa toplar."""
+        if not self.enabled or self._allocated_since_collect >= min_garbage_bytes:
+            self.collect()
+
+    def measure_fragmentation(self):
+        """
+        Boş bellek ile ayrılabilen en büyük blok arasındaki farkı yüzde olarak kaydeder ve döndürür.
+        Ölçüm boş belleğin tamamını kısa süreliğine ayırır; başka bir thread bellek ayırırken çağrılmamalıdır.
+        """
+        if not self.enabled:
+            return 0
+        self.collect()
+        free = gc.mem_free()
+        if free <= 0:
+            return 0
+        largest = largest_free_block(free)
+        fragmentation = 100 - largest * 100 // free
+        instrumentation.record("heap_fragmentation_pct", fragmentation)
+        return fragmentation
+
+    def collections_per_hour(self):
+        elapsed = instrumentation.ticks_diff(instrumentation.ticks_ms(), self.started_ms)
+        if elapsed <= 0:
+            return 0
+        return (self.collections + self.auto_collections) * 3600000 // elapsed
+
+    def report(self, fragmentation):
+        """Periyodik bellek raporu: saatlik toplama sayısı "gc_collections_per_hour" olarak kaydedilir ve konsola yazılır."""
+        if not self.enabled:
+            return
+        per_hour = self.collections_per_hour()
+        instrumentation.record("gc_collections_per_hour", per_hour)
+        print("Bellek: boş %d, parçalanma %%%d, saatte %d toplama (eşik %d)" % (gc.mem_free(), fragmentation, per_hour, self.threshold))
+
+def largest_free_block(limit):
+    """Ayrılabilen en büyük bitişik bloğu (yaklaşık, 64 bayt hassasiyetle) ikili arama ile bulur."""
+    low, high = 0, limit
+    while high - low > 64:
+        size = (low + high) // 2
+        try:
+            bytearray(size)
+            gc.collect() # Deneme bloğu bir sonraki denemeden önce geri verilmeli
+            low = size
+        except MemoryError:
+            high = size
+    return low
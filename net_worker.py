@@ -0,0 +1,136 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# Ağ işlerini (Wi-Fi, NTP, RSS) ayrı bir thread'de çalıştıran işçi.
+# Ekran thread'i ağ beklerken bloklanmaz; sonuçlar kilitli bir posta kutusundan alınır.
+import _thread
+
+class Mailbox:
+    """Kilit ile korunan, sabit kapasiteli halka tampon. Doluysa en eski kayıt atılır."""
+    def __init__(self, capacity=4):
+        self._lock = _thread.allocate_lock()
+        self._items = [None] * capacity
+        self._head = 0
+        self._count = 0
+        self.dropped = 0
+
+    def put(self, item):
+        """Kaydı ekler. Yer açmak için atılan en eski kaydı, atılmadıysa None döndürür."""
+        dropped = None
+        with self._lock:
+            capacity = len(self._items)
+            if self._count == capacity:
+                # En eski kaydı at, yenisine yer aç
+                dropped = self._items[self._head]
+                self._items[self._head] = None
+                self._head = (self._head + 1) % capacity
+                self._count -= 1
+                self.dropped += 1
+            self._items[(self._head + self._count) % capacity] = item
+            self._count += 1
+        return dropped
+
+    def get(self):
+        """Bloklamadan bir kayıt döndürür, boşsa None."""
+        with self._lock:
+            if self._count == 0:
+                return None
+            item = self._items[self._head]
+            self._items[self._head] = None
+            self._head = (self._head + 1) % len(self._items)
+            self._count -= 1
+            return item
+
+class NetWorker:
+    """
+    İşler (etiket, fonksiyon, argümanlar) olarak gönderilir, işçi thread'de sırayla çalışır.
+    Sonuçlar (etiket, başarı, değer) olarak posta kutusuna konur; hata durumunda değer istisnadır.
+    Aynı türden (etiketin ilk elemanı) ikinci bir iş, ilki bitmeden kabul edilmez.
+    """
+    def __init__(self, stack_size=16 * 1024):
+        self.requests = Mailbox(4)
+        self.results = Mailbox(4)
+        self.stack_size = stack_size
+        self._wake = _thread.allocate_lock()
+        self._wake.acquire() # İş gelene kadar işçi bu kilitte bekler
+        self._pending_lock = _thread.allocate_lock()
+        self._pending = []
+        self.running = False
+        self.alive = False # İşçi thread'i çalışıyor (stop() sonrası döngüden çıkınca False olur)
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.alive = True
+        try:
+            _thread.stack_size(self.stack_size)
+        except (AttributeError, ValueError):
+            pass
+        _thread.start_new_thread(self._run, ())
+
+    def stop(self):
+        """İşçiye çıkmasını bildirir; kuyruktaki işler bitirilir, sonra alive False olur."""
+        self.running = False
+        self._signal()
+
+    def is_pending(self, kind):
+        with self._pending_lock:
+            return kind in self._pending
+
+    def is_idle(self):
+        """Bekleyen veya çalışan iş yoksa True."""
+        with self._pending_lock:
+            return not self._pending
+
+    def submit(self, tag, func, *args):
+        """İşi kuyruğa ekler. Aynı türde bekleyen iş varsa False döndürür."""
+        kind = tag[0] if isinstance(tag, tuple) else tag
+        with self._pending_lock:
+            if kind in self._pending:
+                return False
+            self._pending.append(kind)
+        dropped = self.requests.put((tag, func, args))
+        if dropped is not None:
+            # Kuyruk doluydu, en eski iş atıldı: türü tekrar gönderilebilsin
+            print("Ağ işçisi kuyruğu dolu, atılan iş: %s" % (dropped[0],))
+            self._done(dropped[0])
+        self._signal()
+        return True
+
+    def poll(self):
+        """Bloklamadan bir sonuç döndürür, yoksa None."""
+        return self.results.get()
+
+    def _signal(self):
+        try:
+            if self._wake.locked():
+                self._wake.release()
+        except RuntimeError:
+            pass # Başka bir thread araya girip kilidi zaten bıraktı
+
+    def _done(self, tag):
+        kind = tag[0] if isinstance(tag, tuple) else tag
+        with self._pending_lock:
+            if kind in self._pending:
+                self._pending.remove(kind)
+
+    def _run(self):
+        while True:
+            self._wake.acquire()
+            job = self.requests.get()
+            while job is not None:
+                tag, func, args = job
+                try:
+                    result = (tag, True, func(*args))
+                except Exception as e:
+                    print("Ağ işçisi hatası (%s): %s - %s" % (tag, type(e).__name__, e))
+                    result = (tag, False, e)
+                self.results.put(result)
+                self._done(tag)
+                job = self.requests.get()
+            if not self.running:
+                break # Durdurma, kuyruk boşaltıldıktan sonra uygulanır
+        self.alive = False
@@ -0,0 +1,199 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# Enerji yönetimi: senkronlar arasında radyo kapalı, boşta düşük CPU frekansı, vakitlere göre
+# ekran parlaklığı/kapatma ve radyo kapalıyken lightsleep. Politikaları karşılaştırmak için günlük mAh tahmini.
+import time
+from timing import Deadline
+from prayer_schedule import VAKIT_SAYISI, MINUTES_PER_DAY, UNSET
+
+try:
+    import machine
+except ImportError:
+    machine = None # Bilgisayarda sadece enerji modeli kullanılır
+
+CPU_FREQ_ACTIVE = 160000000
+CPU_FREQ_IDLE = 80000000 # Wi-Fi açıkken ESP32'nin desteklediği en düşük frekans
+
+# Enerji modeli için yaklaşık akımlar (mA). ESP32 + SSD1306 ölçümlerinden yuvarlanmış değerler.
+CURRENT_MA = {
+    "cpu_active": 40, # 160 MHz, çalışırken
+    "cpu_idle": 22, # 80 MHz, time.sleep ile beklerken
+    "cpu_full_idle": 35, # 160 MHz (frekans düşürülmeden) beklerken
+    "lightsleep": 0.8,
+    "radio_connected": 25, # Modem uyku (DTIM) ile bağlı ortalama
+    "radio_sync": 110, # Bağlanma ve veri aktarımı sırasında
+    "panel_full": 12, # Kontrast 0xFF, tipik ekran doluluğu
+    "panel_dim": 5,
+    "panel_off": 0.01,
+}
+
+class PowerManager:
+    """
+    Ekran: vakit girmeden prayer_before dakika öncesinden prayer_after dakika sonrasına kadar tam parlak,
+    diğer zamanlarda kısık; night_off ise Yatsı'dan sonraki pencere bitiminden İmsâk penceresine kadar kapalı.
+    Radyo: radio_off ise senkronlar arasında kapatılır. CPU: boşta CPU_FREQ_IDLE'a düşürülür.
+    lightsleep: radyo kapalıyken döngü beklemeleri machine.lightsleep ile yapılır.
+    """
+    def __init__(self, full_contrast=0xFF, dim_contrast=0x10, prayer_before=10, prayer_after=20,
+                 night_off=True, radio_off=True, cpu_scaling=True, lightsleep=True):
+        self.full_contrast = full_contrast
+        self.dim_contrast = dim_contrast
+        self.prayer_before = prayer_before
+        self.prayer_after = prayer_after
+        self.night_off = night_off
+        self.radio_off = radio_off
+        self.cpu_scaling = cpu_scaling
+        self.lightsleep = lightsleep
+        self.radio_sleeping = False # Radyo bilinçli olarak kapatıldı
+        self._panel = None # Panele en son uygulanan (açık mı, kontrast)
+        self._awake = None # wake_panel ile tutulan tam parlaklığın bitişi (Deadline)
+        self._freq = None
+
+    # --- Ekran ---
+    def panel_state(self, schedule, minute_of_day):
+        """(ekran açık mı, kontrast) döndürür. Vakitler bilinmiyorsa ekran tam parlak kalır."""
+        if schedule is None or schedule.count() == 0:
+            return True, self.full_contrast
+        for index in range(VAKIT_SAYISI):
+            t = schedule.minutes[index]
+            if t == UNSET:
+                continue
+            if _in_window(minute_of_day, t - self.prayer_before, t + self.prayer_after):
+                return True, self.full_contrast
+        if self.night_off:
+            first = schedule.minutes[schedule.first_index()]
+            last = first
+            for index in range(VAKIT_SAYISI):
+                t = schedule.minutes[index]
+                if t != UNSET and t > last:
+                    last = t
+            if _in_window(minute_of_day, last + self.prayer_after, first - self.prayer_before):
+                return False, 0
+        return True, self.dim_contrast
+
+    def apply_panel(self, display, schedule, minute_of_day):
+        """Ekran durumunu sadece değiştiğinde panele gönderir. Ekran açıksa True."""
+        state = self.panel_state(schedule, minute_of_day)
+        if self._awake is not None:
+            if self._awake.expired():
+                self._awake = None
+            else:
+                state = (True, self.full_contrast) # Gösterilen mesaj okunabilsin
+        if state == self._panel:
+            return state[0]
+        try:
+            if not state[0]:
+                display.poweroff()
+            else:
+                if self._panel is None or not self._panel[0]:
+                    display.poweron()
+                display.contrast(state[1])
+            self._panel = state
+        except Exception as e:
+            print("Ekran güç ayarı yapılamadı: %s" % e)
+        return state[0]
+
+    def wake_panel(self, display, hold_ms=60000):
+        """
+        Kullanıcıya mesaj gösterilmesi gerektiğinde (Wi-Fi koptu, kurulum modu, vakit olayı) ekranı tam parlak açar.
+        apply_panel, hold_ms boyunca ekranı kısmaz veya kapatmaz.
+        """
+        self._awake = Deadline(hold_ms)
+        if self._panel == (True, self.full_contrast):
+            return
+        try:
+            display.poweron()
+            display.contrast(self.full_contrast)
+            self._panel = (True, self.full_contrast)
+        except Exception as e:
+            self._panel = None
+            print("Ekran açılamadı: %s" % e)
+
+    # --- Radyo ---
+    def sleep_radio(self, wlan):
+        """Senkron bittiğinde radyoyu kapatır."""
+        if not self.radio_off or self.radio_sleeping:
+            return
+        try:
+            wlan.disconnect()
+        except Exception:
+            pass
+        wlan.active(False)
+        self.radio_sleeping = True
+        print("Radyo bir sonraki senkrona kadar kapatıldı.")
+
+    def wake_radio(self, wlan, connect):
+        """
+        Radyoyu açar ve connect() ile bağlanır. Bağlantı başarılıysa True.
+        Başarısız olursa radyo açık kalır; bağlantı kopması normal yoldan ele alınır.
+        """
+        self.active()
+        self.radio_sleeping = False
+        wlan.active(True)
+        return connect()
+
+    # --- CPU ---
+    def active(self):
+        self._set_freq(CPU_FREQ_ACTIVE)
+
+    def idle(self):
+        self._set_freq(CPU_FREQ_IDLE)
+
+    def _set_freq(self, freq):
+        if not self.cpu_scaling or machine is None or freq == self._freq:
+            return
+        try:
+            machine.freq(freq)
+            self._freq = freq
+        except Exception as e:
+            print("CPU frekansı ayarlanamadı: %s" % e)
+            self.cpu_scaling = False
+
+    def sleep_ms(self, ms):
+        """Döngü beklemesi. Radyo kapalıyken lightsleep (Wi-Fi bağlantısı lightsleep'te korunmaz)."""
+        if self.lightsleep and self.radio_sleeping and machine is not None:
+            machine.lightsleep(ms)
+        else:
+            time.sleep_ms(ms)
+
+def _in_window(minute, start, end):
+    """minute, gece yarısını aşabilen [start, end) aralığında mı?"""
+    start %= MINUTES_PER_DAY
+    end %= MINUTES_PER_DAY
+    if start <= end:
+        return start <= minute < end
+    return minute >= start or minute < end
+
+def estimate_daily_mah(manager, schedule, syncs_per_day=5, sync_seconds=20, active_ms_per_second=40):
+    """
+    Bir politikanın günlük tüketimini (mAh) dakika dakika simüle ederek tahmin eder (bilgisayarda çalışır).
+    syncs_per_day: Günlük NTP + RSS senkron sayısı, sync_seconds: her senkronda radyonun tam güçte açık kaldığı süre.
+    active_ms_per_second: Döngünün her saniyede çalıştığı (uyumadığı) süre.
+    """
+    sync_hours = syncs_per_day * sync_seconds / 3600.0
+    total = sync_hours * CURRENT_MA["radio_sync"]
+    if not manager.radio_off:
+        total += (24 - sync_hours) * CURRENT_MA["radio_connected"]
+    active_fraction = active_ms_per_second / 1000.0
+    if manager.lightsleep and manager.radio_off:
+        sleep_current = CURRENT_MA["lightsleep"]
+    elif manager.cpu_scaling:
+        sleep_current = CURRENT_MA["cpu_idle"]
+    else:
+        sleep_current = CURRENT_MA["cpu_full_idle"]
+    total += 24 * (active_fraction * CURRENT_MA["cpu_active"] + (1 - active_fraction) * sleep_current)
+    panel_minutes = {"panel_full": 0, "panel_dim": 0, "panel_off": 0}
+    for minute in range(MINUTES_PER_DAY):
+        on, contrast = manager.panel_state(schedule, minute)
+        if not on:
+            panel_minutes["panel_off"] += 1
+        elif contrast >= manager.full_contrast:
+            panel_minutes["panel_full"] += 1
+        else:
+            panel_minutes["panel_dim"] += 1
+    for key, minutes in panel_minutes.items():
+        total += minutes / 60.0 * CURRENT_MA[key]
+    return total
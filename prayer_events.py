@@ -0,0 +1,192 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# Vakit girdiği anda (1 sn'lik döngüyü ve bloklayan RSS çekimini beklemeden) olay üreten dağıtıcı.
+# Bir sonraki vakit için machine.Timer kurulur; olaydan sonra ve vakitler/saat değiştiğinde yeniden kurulur.
+import instrumentation
+from timing import Deadline
+from prayer_schedule import VAKIT_SAYISI, VAKIT_ANAHTARLARI, UNSET
+
+try:
+    import machine
+    ONE_SHOT = machine.Timer.ONE_SHOT
+except ImportError:
+    machine = None # Bilgisayarda zamanlayıcı ve saat dışarıdan verilir
+    ONE_SHOT = 0
+
+MS_PER_DAY = 86400000
+MAX_ARM_MS = 60000 # Zamanlayıcı en fazla bu kadar ileriye kurulur; her uyanışta kalan süre RTC'den yeniden hesaplanır
+MISSED_AFTER_MS = 120000 # Saat ileri alındığı için bu kadar geçmiş vakitler tetiklenmez, atlanır
+
+def rtc_ms_of_day():
+    """RTC'deki yerel zamana göre günün milisaniyesi (8. alan: mikrosaniye)."""
+    dt = machine.RTC().datetime()
+    return ((dt[4] * 60 + dt[5]) * 60 + dt[6]) * 1000 + dt[7] // 1000
+
+class PrayerEventDispatcher:
+    """
+    arm(schedule, tomorrow) bir sonraki vakte göre zamanlayıcıyı kurar. Zamanlayıcı MAX_ARM_MS'den uzun
+    kurulmaz; böylece NTP ile saat değiştiğinde de hedef en geç bir dakika içinde düzeltilir.
+    Anlık işleyiciler zamanlayıcı geri çağrısında (vakitten birkaç ms sonra) çalışır; bunlar kısa olmalı
+    ve kilit beklememelidir (GPIO). Ertelenen işleyiciler (ekran, ağ) ana döngüdeki service() ile çalışır.
+    Tetiklenme gecikmesi RTC'ye göre "prayer_event_latency_ms" olarak kaydedilir.
+    """
+    def __init__(self, timer=None, clock=None, timer_id=0):
+        self._timer = timer if timer is not None else machine.Timer(timer_id)
+        self._clock = clock if clock is not None else rtc_ms_of_day
+        self._handlers = []
+        self._deferred = [] # Ana döngüde çalıştırılacak (işleyici, vakit indeksi)
+        self._later = [] # (Deadline, fonksiyon)
+        self.schedule = None
+        self.tomorrow = None
+        self.index = -1 # Beklenen vaktin indeksi, kurulu değilse -1
+        self.target_ms = 0 # Beklenen vaktin günün milisaniyesi cinsinden anı
+        self.fired_ms = -1 # Son tetiklenen (veya kaçırılan) vaktin anı, henüz yoksa -1
+        self.fired = 0
+        self.missed = 0
+
+    def add_handler(self, handler, deferred=False):
+        """handler(vakit_indeksi) vakit girdiğinde çağrılır."""
+        self._handlers.append((handler, deferred))
+
+    def later(self, delay_ms, func):
+        """func'ı delay_ms sonra ana döngüde (service) çalıştırır."""
+        self._later.append((Deadline(delay_ms), func))
+
+    def arm(self, schedule, tomorrow=None):
+        """Vakitler veya saat değiştiğinde çağrılır; şu andan sonraki ilk vakte göre zamanlayıcıyı kurar."""
+        self.schedule = schedule
+        self.tomorrow = tomorrow
+        after_ms = self._clock()
+        remaining = self.remaining_ms()
+        if remaining is not None and -MISSED_AFTER_MS < remaining <= 0:
+            # Beklenen vakit geldi ama geri çağrı henüz çalışmadı: olay kaybolmasın, aynı vakit yeniden seçilir
+            after_ms = self.target_ms - 1
+        elif self.fired_ms >= 0 and 0 < (self.fired_ms - after_ms) % MS_PER_DAY <= MISSED_AFTER_MS:
+            # Saat, az önce tetiklenen vaktin öncesine geri alındı (NTP): aynı vakit ikinci kez seçilmez
+            after_ms = self.fired_ms
+        self._select(after_ms)
+        self._start()
+
+    def rearm(self):
+        """
+        Zamanlayıcıyı kalan süreye göre RTC'den yeniden kurar. lightsleep'te donanım zamanlayıcısı durur,
+        RTC ise çalışmaya devam eder; vakitten hemen önce uyuyan döngü bunu çağırır.
+        """
+        self._start()
+
+    def disarm(self):
+        self.index = -1
+        self._timer.deinit()
+
+    def remaining_ms(self):
+        """Beklenen vakte kalan süre (geçtiyse negatif); kurulu değilse None."""
+        if self.index < 0:
+            return None
+        diff = (self.target_ms - self._clock()) % MS_PER_DAY
+        if diff > MS_PER_DAY // 2:
+            diff -= MS_PER_DAY # Hedef geride kaldı
+        return diff
+
+    def _select(self, after_ms):
+        """after_ms'den sonraki ilk vakti seçer; bugün kalmadıysa yarının (bilinmiyorsa bugünün) ilk vakti."""
+        self.index = -1
+        if self.schedule is None:
+            return
+        for i in range(VAKIT_SAYISI):
+            t = self.schedule.minutes[i]
+            if t != UNSET and t * 60000 > after_ms:
+                self.index = i
+                self.target_ms = t * 60000
+                return
+        schedule = self.tomorrow or self.schedule
+        i = schedule.first_index()
+        if i >= 0:
+            self.index = i
+            self.target_ms = schedule.minutes[i] * 60000
+
+    def _start(self):
+        remaining = self.remaining_ms()
+        if remaining is None:
+            self._timer.deinit()
+            return
+        self._timer.init(mode=ONE_SHOT, period=max(1, min(remaining, MAX_ARM_MS)), callback=self._on_timer)
+
+    def _on_timer(self, timer):
+        remaining = self.remaining_ms()
+        if remaining is None:
+            return
+        if remaining > 0:
+            # Ara uyanış veya zamanlayıcı RTC'den biraz önde: kalan süre için yeniden kur
+            self._start()
+            return
+        late_ms = -remaining
+        index = self.index
+        self.fired_ms = self.target_ms
+        if late_ms > MISSED_AFTER_MS:
+            self.missed += 1
+            instrumentation.count("prayer_events_missed")
+        else:
+            instrumentation.record("prayer_event_latency_ms", late_ms)
+            instrumentation.count("prayer_events")
+            self.fired += 1
+            for handler, deferred in self._handlers:
+                if deferred:
+                    self._deferred.append((handler, index))
+                    continue
+                try:
+                    handler(index)
+                except Exception as e:
+                    print("Vakit olayı işleyici hatası: %s" % e)
+        self._select(self.target_ms)
+        self._start()
+
+    def service(self):
+        """Ana döngüden çağrılır: ertelenen işleyicileri ve zamanı gelen later() işlerini çalıştırır."""
+        while self._deferred:
+            handler, index = self._deferred.pop(0)
+            try:
+                handler(index)
+            except Exception as e:
+                print("Vakit olayı işleyici hatası: %s" % e)
+        if self._later:
+            pending = []
+            for deadline, func in self._later:
+                if deadline.expired():
+                    try:
+                        func()
+                    except Exception as e:
+                        print("Vakit olayı işleyici hatası: %s" % e)
+                else:
+                    pending.append((deadline, func))
+            self._later = pending
+
+# --- Hazır işleyiciler ---
+def gpio_pulse(pin_number, duration_ms=500, timer_id=1):
+    """Vakit girdiğinde pini duration_ms boyunca 1 yapar (buzzer/röle). Kapatma ayrı bir zamanlayıcıyla yapılır."""
+    pin = machine.Pin(pin_number, machine.Pin.OUT, value=0)
+    timer = machine.Timer(timer_id)
+    def release(t):
+        pin.value(0)
+    def handler(index):
+        pin.value(1)
+        timer.init(mode=ONE_SHOT, period=duration_ms, callback=release)
+    return handler
+
+def display_invert(dispatcher, display, duration_ms=3000):
+    """Ekranı duration_ms boyunca ters çevirir. Ekran kilidini beklediği için ertelenen işleyici olarak eklenmeli."""
+    def handler(index):
+        display.invert(1)
+        dispatcher.later(duration_ms, lambda: display.invert(0))
+    return handler
+
+def publish_hook(publish, topic="namaz/vakit"):
+    """
+    MQTT tarzı kanca: publish(topic, payload) ile vakit adını JSON olarak gönderir.
+    Ağ işi yaptığı için ertelenen işleyici olarak eklenmeli.
+    """
+    def handler(index):
+        publish(topic, '{"vakit": "%s"}' % VAKIT_ANAHTARLARI[index])
+    return handler
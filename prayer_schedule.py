@@ -0,0 +1,137 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# Günlük namaz vakitlerinin array('H') tabanlı, sabit sıralı gösterimi.
+from array import array
+import struct
+
+VAKIT_SAYISI = 6
+# Sabit indeks sırası: 0 İmsâk, 1 Güneş, 2 Öğle, 3 İkindi, 4 Akşam, 5 Yatsı
+VAKIT_ADLARI = ("İmsâk", "Güneş", "Öğle", "İkindi", "Akşam", "Yatsı")
+VAKIT_ADLARI_ASCII = ("Imsak", "Gunes", "Ogle", "Ikindi", "Aksam", "Yatsi")
+# Eşleştirme için küçük harfli ve Türkçe karakterleri dönüştürülmüş adlar
+VAKIT_ANAHTARLARI = ("imsak", "gunes", "ogle", "ikindi", "aksam", "yatsi")
+
+MINUTES_PER_DAY = 1440
+SECONDS_PER_DAY = 86400
+UNSET = 0xFFFF # Henüz ayrıştırılmamış vakit
+TITLE_BYTES = 16
+# Kalıcı kayıt biçimi: gün anahtarı, 6 vakit (dakika), tarih başlığı (TITLE_BYTES = 16 bayt); toplam 32 bayt
+_PACKED = "<I%dH%ds" % (VAKIT_SAYISI, TITLE_BYTES)
+
+class PrayerSchedule:
+    """
+    Altı vakti gün içindeki dakika (0-1439) olarak array('H') içinde tutar.
+    Sorgular (sonraki vakit, kalan süre) bellek ayırmadan çalışır.
+    """
+    __slots__ = ("minutes", "title", "date")
+
+    def __init__(self):
+        self.minutes = array("H", [UNSET] * VAKIT_SAYISI)
+        self.title = "" # Ekranda gösterilecek tarih satırı
+        self.date = 0 # Vakitlerin ait olduğu gün (YYYYAAGG), bilinmiyorsa 0
+
+    def set(self, index, hour, minute):
+        """Vakti ayarlar. Geçersiz saat/dakika için False döner."""
+        if 0 <= hour < 24 and 0 <= minute < 60:
+            self.minutes[index] = hour * 60 + minute
+            return True
+        return False
+
+    def is_set(self, index):
+        return self.minutes[index] != UNSET
+
+    def count(self):
+        """Ayrıştırılmış vakit sayısı."""
+        n = 0
+        for i in range(VAKIT_SAYISI):
+            if self.minutes[i] != UNSET:
+                n += 1
+        return n
+
+    def first_index(self):
+        """Günün ilk geçerli vaktinin indeksi, yoksa -1."""
+        for i in range(VAKIT_SAYISI):
+            if self.minutes[i] != UNSET:
+                return i
+        return -1
+
+    def next_index(self, minute_of_day):
+        """
+        minute_of_day dakikasından sonraki ilk vaktin indeksi; bugün kalmadıysa -1.
+        Vakit dakikası şu anki dakikaya eşitse o vakit girmiş sayılır.
+        """
+        for i in range(VAKIT_SAYISI):
+            t = self.minutes[i]
+            if t != UNSET and t > minute_of_day:
+                return i
+        return -1
+
+    def seconds_until(self, index, second_of_day):
+        """index vaktine kalan saniye (vakit geçtiyse yarınki aynı vakte)."""
+        diff = self.minutes[index] * 60 - second_of_day
+        if diff <= 0:
+            diff += SECONDS_PER_DAY
+        return diff
+
+    def time_str(self, index):
+        """Ekran için "HH:MM" metni (sadece gösterimde kullanılır)."""
+        t = self.minutes[index]
+        return "%02d:%02d" % (t // 60, t % 60)
+
+class ScheduleCache:
+    """
+    Şehir başına vakitleri gün anahtarıyla (YYYYAAGG) saklar.
+    Bugünün ve önceden çekilmiş yarının vakitleri aynı anda tutulabilir.
+    """
+    def __init__(self):
+        self._entries = {} # (şehir indeksi, gün anahtarı) -> PrayerSchedule
+
+    def put(self, city_index, schedule):
+        self._entries[(city_index, schedule.date)] = schedule
+
+    def get(self, city_index, date):
+        return self._entries.get((city_index, date))
+
+    def latest(self, city_index):
+        """Şehrin en yeni tarihli vakitlerini döndürür, yoksa None."""
+        best = None
+        for (index, date), schedule in self._entries.items():
+            if index == city_index and (best is None or date > best.date):
+                best = schedule
+        return best
+
+    def prune(self, today_key):
+        """Bugünden eski kayıtları siler; her şehrin en yeni kaydı yedek olarak kalır."""
+        for key in list(self._entries):
+            city_index, date = key
+            if date < today_key and self.latest(city_index) is not self._entries[key]:
+                del self._entries[key]
+
+def encode_title(title):
+    """Başlığı en fazla TITLE_BYTES bayta keser; çok baytlı bir UTF-8 karakteri (ş, ğ, ...) ortadan bölünmez."""
+    data = title.encode()
+    if len(data) <= TITLE_BYTES:
+        return data
+    end = TITLE_BYTES
+    while end > 0 and data[end] & 0xC0 == 0x80: # Devam baytı: karakterin başına dön
+        end -= 1
+    return data[:end]
+
+def pack_schedule(schedule):
+    """Vakitleri flash'a yazmak için sabit boyutlu bayt dizisine çevirir."""
+    return struct.pack(_PACKED, schedule.date, *(list(schedule.minutes) + [encode_title(schedule.title)]))
+
+def unpack_schedule(data):
+    """pack_schedule çıktısından PrayerSchedule oluşturur; geçersizse None."""
+    if len(data) != struct.calcsize(_PACKED):
+        return None
+    fields = struct.unpack(_PACKED, data)
+    schedule = PrayerSchedule()
+    schedule.date = fields[0]
+    for index in range(VAKIT_SAYISI):
+        schedule.minutes[index] = fields[1 + index]
+    schedule.title = fields[1 + VAKIT_SAYISI].rstrip(b"\x00").decode()
+    return schedule
@@ -0,0 +1,115 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# Takvim günü değişimine göre RSS yenileme zamanlayıcısı.
+import time
+import random
+from timing import Deadline
+
+FETCH_TODAY = 1
+FETCH_TOMORROW = 2
+
+def date_key(year, month, day):
+    """(yıl, ay, gün) bilgisini karşılaştırılabilir tek bir tamsayıya çevirir (YYYYAAGG)."""
+    return year * 10000 + month * 100 + day
+
+def next_date_key(year, month, day):
+    """Verilen günden bir sonraki günün anahtarı."""
+    # Öğlen saatini kullanmak yaz saati/dakika taşmalarından etkilenmez.
+    # 9 elemanlı demet hem MicroPython'da hem CPython'da (bilgisayardaki testler) kabul edilir.
+    t = time.localtime(time.mktime((year, month, day, 12, 0, 0, 0, 0, 0)) + 24 * 3600)
+    return date_key(t[0], t[1], t[2])
+
+class RefreshScheduler:
+    """
+    Vakitleri günde bir kez, beslemenin yeni günü yayınlamasından kısa süre sonra çeker.
+    prefetch_minute verilirse o dakikadan sonra yarının verisini bir kez önceden çekmeyi dener; bu sadece
+    gece yarısından önce yarını yayınlayan kaynaklarda işe yarar (DailyRSS o saatte hâlâ bugünü verir).
+    Hata durumunda üstel bekleme (backoff) ve rastgele sapma (jitter) uygular.
+
+    current: bugünün PrayerSchedule'ı, tomorrow: önceden çekilmiş yarının vakitleri.
+    Saat ve tarih bilgisi RTC'deki yerel zamandan (timezone_offset uygulanmış) gelir;
+    yeniden deneme beklemeleri ise ticks_ms ile ölçülür, NTP düzeltmelerinden etkilenmez.
+    """
+    def __init__(self, publish_delay_minutes=5, prefetch_minute=None,
+                 base_backoff_seconds=30, max_backoff_seconds=3600):
+        self.publish_delay_minutes = publish_delay_minutes
+        self.prefetch_minute = prefetch_minute
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.current = None
+        self.tomorrow = None
+        self.failures = 0
+        self.retry_deadline = None # Hata sonrası bir sonraki denemeye kadar beklenen süre
+        self.prefetch_done_key = 0 # Yarın için ön çekimin denendiği günün anahtarı
+        self.fetch_count = 0
+
+    def rollover(self, today_key):
+        """
+        Gün dönümünde, önceden çekilmiş (veya kalıcı depodan yüklenmiş) yarının vakitlerini ağa çıkmadan
+        devreye alır. Döngü başında, due()'dan önce çağrılır. current değiştiyse True döndürür.
+        """
+        if ((self.current is None or self.current.date != today_key)
+                and self.tomorrow is not None and self.tomorrow.date == today_key):
+            self.current = self.tomorrow
+            self.tomorrow = None
+            return True
+        return False
+
+    def due(self, today_key, minute_of_day):
+        """Şu an bir çekim gerekiyorsa FETCH_TODAY veya FETCH_TOMORROW, gerekmiyorsa None döndürür (durumu değiştirmez)."""
+        if self.current is None or self.current.date != today_key:
+            if not self._retry_allowed():
+                return None
+            if self.current is not None and minute_of_day < self.publish_delay_minutes:
+                return None # Besleme yeni günü henüz yayınlamadı, dünün vakitleriyle devam
+            return FETCH_TODAY
+
+        if (self.prefetch_minute is not None and minute_of_day >= self.prefetch_minute and self.tomorrow is None
+                and self.prefetch_done_key != today_key and self._retry_allowed()):
+            return FETCH_TOMORROW
+        return None
+
+    def on_result(self, kind, schedule, today_key, tomorrow_key):
+        """
+        Çekim sonucunu işler. schedule None ise çekim başarısız sayılır.
+        Sonuç current'ı değiştirdiyse True döndürür (ekran yeniden çizilmeli).
+        """
+        self.fetch_count += 1
+        if kind == FETCH_TOMORROW:
+            self.prefetch_done_key = today_key # Günde en fazla bir ön çekim denemesi
+            if schedule is not None and schedule.date == tomorrow_key:
+                self.tomorrow = schedule
+            return False
+
+        if schedule is None:
+            self._backoff()
+            return False
+
+        changed = self.current is None or schedule.date in (0, today_key)
+        if changed:
+            self.current = schedule
+        if schedule.date in (0, today_key):
+            # Tarihi çözülemeyen besleme de bugünün verisi kabul edilir
+            self.failures = 0
+            self.retry_deadline = None
+            if schedule.date == 0:
+                schedule.date = today_key
+        else:
+            # Besleme henüz yeni güne geçmemiş, bir süre sonra tekrar dene
+            self._backoff()
+        return changed
+
+    def _retry_allowed(self):
+        return self.retry_deadline is None or self.retry_deadline.expired()
+
+    def _backoff(self):
+        delay = self.base_backoff_seconds << min(self.failures, 16)
+        if delay > self.max_backoff_seconds:
+            delay = self.max_backoff_seconds
+        jitter = random.getrandbits(16) % (delay // 2 + 1)
+        self.failures += 1
+        self.retry_deadline = Deadline((delay + jitter) * 1000)
+        print("RSS yeniden deneme %d sn sonra (hata sayısı: %d)" % (delay + jitter, self.failures))
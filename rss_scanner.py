@@ -0,0 +1,109 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# RSS yanıtını string'e çevirmeden, ham baytlar üzerinde tarayan ayrıştırıcı.
+# Vakit adları UTF-8 bayt dizileriyle aranır, "HH:MM" rakamları doğrudan okunur.
+
+_ITEM_OPEN = b"<item>"
+_TITLE_OPEN = b"<title>"
+_TITLE_CLOSE = b"</title>"
+_DESC_OPEN = b"<description>"
+_DESC_CLOSE = b"</description>"
+
+# Her vakit için beslemede görülebilecek UTF-8 yazımlar (PrayerSchedule indeks sırasıyla)
+VAKIT_BAYTLARI = (
+    (b"\xc4\xb0ms\xc3\xa2k", b"\xc4\xb0msak", b"Imsak"), # İmsâk, İmsak
+    (b"G\xc3\xbcne\xc5\x9f", b"Gunes"),                  # Güneş
+    (b"\xc3\x96\xc4\x9fle", b"Ogle"),                    # Öğle
+    (b"\xc4\xb0kindi", b"Ikindi"),                       # İkindi
+    (b"Ak\xc5\x9fam", b"Aksam"),                         # Akşam
+    (b"Yats\xc4\xb1", b"Yatsi"),                         # Yatsı
+)
+
+# Vakit adı ile saat arasında atlanabilecek en fazla bayt ("&nbsp;:&nbsp;", "&lt;b&gt;", hizalama boşlukları gibi)
+_MAX_GAP = 64
+
+def _is_digit(c):
+    return 48 <= c <= 57
+
+def _read_time(buf, start, end):
+    """
+    start konumundan itibaren ayraçları (boşluk, ':', HTML varlıkları, etiketler ve
+    kaçışlı etiketler "&lt;b&gt;") atlayıp "HH:MM" okur. Gün içindeki dakikayı veya bulunamazsa -1 döndürür.
+    """
+    i = start
+    limit = min(end, start + _MAX_GAP)
+    while i < limit:
+        c = buf[i]
+        if _is_digit(c):
+            break
+        if c == 38: # '&' -> ';' karakterine kadar atla; kaçışlı etiket ise "&gt;" sonuna kadar
+            if i + 3 < limit and buf[i + 1] == 108 and buf[i + 2] == 116 and buf[i + 3] == 59: # "&lt;"
+                i = buf.find(b"&gt;", i, limit)
+                if i < 0:
+                    return -1
+                i += 3
+            else:
+                i = buf.find(b";", i, limit)
+                if i < 0:
+                    return -1
+        elif c == 60: # '<' -> '>' karakterine kadar atla
+            i = buf.find(b">", i, limit)
+            if i < 0:
+                return -1
+        elif c not in (32, 58, 9, 10, 13): # Boşluk, ':', tab, satır sonu dışında bir şey
+            return -1
+        i += 1
+    if i + 5 > end:
+        return -1
+    h1, h2, sep, m1, m2 = buf[i], buf[i + 1], buf[i + 2], buf[i + 3], buf[i + 4]
+    if sep != 58 or not (_is_digit(h1) and _is_digit(h2) and _is_digit(m1) and _is_digit(m2)):
+        return -1
+    hour = (h1 - 48) * 10 + (h2 - 48)
+    minute = (m1 - 48) * 10 + (m2 - 48)
+    if hour > 23 or minute > 59:
+        return -1
+    return hour * 60 + minute
+
+def scan_rss(buf, schedule):
+    """
+    Ham RSS baytlarındaki ilk <item> içinden vakitleri schedule'a yazar.
+    Başlık (tarih) için memoryview dilimi döndürür; yapı bulunamazsa None.
+    Kopyalama yapılmaz, sadece başlık dilimi ve birkaç tamsayı oluşturulur.
+    """
+    item = buf.find(_ITEM_OPEN)
+    if item < 0:
+        return None
+    title_start = buf.find(_TITLE_OPEN, item)
+    if title_start < 0:
+        return None
+    title_start += len(_TITLE_OPEN)
+    title_end = buf.find(_TITLE_CLOSE, title_start)
+    if title_end < 0:
+        return None
+    desc_start = buf.find(_DESC_OPEN, title_end)
+    if desc_start < 0:
+        return None
+    desc_start += len(_DESC_OPEN)
+    desc_end = buf.find(_DESC_CLOSE, desc_start)
+    if desc_end < 0:
+        return None
+
+    for index in range(len(VAKIT_BAYTLARI)):
+        for name in VAKIT_BAYTLARI[index]:
+            pos = buf.find(name, desc_start, desc_end)
+            if pos < 0:
+                continue
+            minutes = _read_time(buf, pos + len(name), desc_end)
+            if minutes >= 0:
+                schedule.minutes[index] = minutes
+                break
+
+    # Başlığın baştaki/sondaki boşluklarını kopyalamadan kırp
+    while title_start < title_end and buf[title_start] in (32, 9, 10, 13):
+        title_start += 1
+    while title_end > title_start and buf[title_end - 1] in (32, 9, 10, 13):
+        title_end -= 1
+    return memoryview(buf)[title_start:title_end]
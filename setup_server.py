@@ -0,0 +1,165 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# Kurulum web sunucusu için sınırlı ve zaman aşımlı HTTP istek okuyucu.
+# Yavaş (slowloris), parça parça gönderilen veya aşırı büyük istekler sunucuyu kilitleyemez.
+import gc
+import errno
+import usocket
+import instrumentation
+from timing import Deadline
+
+REQUEST_TIMEOUT_MS = 3000 # Bir isteğin tamamı (başlıklar + gövde) bu süre içinde gelmeli
+MAX_HEADER_BYTES = 2048
+MAX_BODY_BYTES = 1024
+_RECV_SIZE = 512
+# CPython'da recv zaman aşımı socket.timeout (OSError alt sınıfı) fırlatır; MicroPython'da bu sınıf yoktur
+_SOCKET_TIMEOUT = getattr(usocket, "timeout", ())
+
+# Telefon ve bilgisayarların captive-portal kontrol adresleri: kurulum sayfasına yönlendirilir
+PORTAL_PROBE_PATHS = (
+    "/generate_204", "/gen_204", # Android, Chrome
+    "/hotspot-detect.html", "/library/test/success.html", # Apple
+    "/connecttest.txt", "/ncsi.txt", "/redirect", # Windows
+    "/canonical.html", "/success.txt", # Firefox
+)
+
+_REASONS = {
+    200: "OK",
+    204: "No Content",
+    302: "Found",
+    400: "Bad Request",
+    408: "Request Timeout",
+    413: "Payload Too Large",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+}
+
+class RequestError(Exception):
+    """İstek okunamadı; status istemciye gönderilecek HTTP durum kodudur."""
+    def __init__(self, status):
+        super().__init__(status)
+        self.status = status
+
+class Request:
+    __slots__ = ("method", "path", "headers", "body")
+
+    def __init__(self, method, path, headers, body):
+        self.method = method
+        self.path = path
+        self.headers = headers # küçük harfli başlık adı -> değer
+        self.body = body
+
+def _recv(conn, deadline):
+    remaining = deadline.remaining_ms()
+    if remaining <= 0:
+        raise RequestError(408)
+    conn.settimeout(remaining / 1000)
+    try:
+        data = conn.recv(_RECV_SIZE)
+    except OSError as e:
+        # MicroPython: OSError(ETIMEDOUT); CPython: socket.timeout
+        if isinstance(e, _SOCKET_TIMEOUT) or (e.args and e.args[0] in (errno.ETIMEDOUT, errno.EAGAIN)):
+            raise RequestError(408)
+        raise
+    if not data:
+        raise RequestError(400) # İstemci isteği tamamlamadan bağlantıyı kapattı
+    return data
+
+def read_request(conn, timeout_ms=None, max_header_bytes=MAX_HEADER_BYTES, max_body_bytes=MAX_BODY_BYTES):
+    """
+    Başlıklar ve Content-Length kadar gövde gelene kadar okur. Toplam süre timeout_ms (verilmezse
+    REQUEST_TIMEOUT_MS) ile sınırlıdır. Request döndürür; hatalı, yavaş veya büyük isteklerde RequestError fırlatır.
+    """
+    deadline = Deadline(REQUEST_TIMEOUT_MS if timeout_ms is None else timeout_ms)
+    buf = b""
+    header_end = -1
+    while header_end < 0:
+        buf += _recv(conn, deadline)
+        header_end = buf.find(b"\r\n\r\n")
+        if header_end < 0 and len(buf) > max_header_bytes:
+            raise RequestError(431)
+    if header_end > max_header_bytes:
+        raise RequestError(431)
+
+    lines = buf[:header_end].decode("utf-8", "ignore").split("\r\n")
+    parts = lines[0].split(" ")
+    if len(parts) < 2:
+        raise RequestError(400)
+    headers = {}
+    for line in lines[1:]:
+        colon = line.find(":")
+        if colon > 0:
+            headers[line[:colon].strip().lower()] = line[colon + 1:].strip()
+
+    body = buf[header_end + 4:]
+    length = 0
+    if "content-length" in headers:
+        try:
+            length = int(headers["content-length"])
+        except ValueError:
+            raise RequestError(400)
+        if length < 0:
+            raise RequestError(400)
+        if length > max_body_bytes:
+            raise RequestError(413)
+    while len(body) < length:
+        body += _recv(conn, deadline)
+    return Request(parts[0], parts[1], headers, body[:length])
+
+def send_response(conn, status, body=b"", content_type="text/html; charset=UTF-8"):
+    """Tam bir yanıtı (Connection: close) tek seferde gönderir."""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    head = "HTTP/1.1 %d %s\r\n" % (status, _REASONS.get(status, ""))
+    if body:
+        head += "Content-Type: %s\r\n" % content_type
+    head += "Connection: close\r\nContent-Length: %d\r\n\r\n" % len(body)
+    send_bytes(conn, head.encode())
+    if body:
+        conn.sendall(body)
+
+def send_bytes(conn, data):
+    """Önceden hazırlanmış yanıtı gönderir."""
+    conn.settimeout(REQUEST_TIMEOUT_MS / 1000) # Okumayan istemci gönderimi sonsuza kadar bekletemez
+    conn.sendall(data)
+
+_redirect = None # (ip, önceden kodlanmış 302 yanıtı)
+
+def portal_redirect(ip):
+    """Kurulum sayfasına 302 yönlendirmesi. Her istekte yeniden biçimlendirilmez, IP başına bir kez kodlanır."""
+    global _redirect
+    if _redirect is None or _redirect[0] != ip:
+        _redirect = (ip, ("HTTP/1.1 302 Found\r\nLocation: http://%s/\r\nContent-Length: 0\r\nConnection: close\r\n\r\n" % ip).encode())
+    return _redirect[1]
+
+def is_portal_probe(request, ip):
+    """Bilinen kontrol adresi veya başka bir alan adına (DNS bizi gösterdiği için) gelen istek mi?"""
+    path = request.path.split("?")[0]
+    if path in PORTAL_PROBE_PATHS:
+        return True
+    host = request.headers.get("host", "").split(":")[0]
+    return bool(host) and host != ip and path != "/favicon.ico"
+
+def polled(ready, sock):
+    """poll() sonucunda sock hazır mı? (MicroPython soket nesnesi, CPython dosya numarası döndürür)"""
+    for obj in ready:
+        if obj is sock:
+            return True
+    try:
+        return sock.fileno() in ready
+    except AttributeError:
+        return False
+
+def record_request(started_ms, status):
+    """İstek istatistiklerini kaydeder: süre, durum ve bellek kullanımının en yüksek değeri."""
+    instrumentation.record("web_request_ms", instrumentation.ticks_diff(instrumentation.ticks_ms(), started_ms))
+    instrumentation.count("web_requests")
+    if status >= 400:
+        instrumentation.count("web_status_%d" % status)
+    try:
+        instrumentation.record("web_heap_used", gc.mem_alloc())
+    except AttributeError:
+        pass # CPython'da gc.mem_alloc yok
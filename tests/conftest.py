@@ -0,0 +1,38 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# Bilgisayarda (CPython) çalışan testler için ortak ayarlar.
+# Modüller depo kökünden düz olarak içe aktarılır; MicroPython'a özgü "u" modülleri CPython karşılıklarına yönlendirilir.
+import os
+import sys
+import json
+import socket
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FEEDS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "feeds")
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+sys.modules.setdefault("ujson", json)
+sys.modules.setdefault("usocket", socket)
+
+import pytest
+
+@pytest.fixture
+def device(tmp_path, monkeypatch):
+    """
+    network/machine yerine geçen Board ile yüklenmiş NamazVakti5.main. Çalışma dizini geçici dizindir
+    (config.json, dns_cache.json oraya yazılır). Test sırasında yüklenen modüller sonra sys.modules'tan çıkarılır.
+    """
+    from device_stubs import Board, install, load_main
+    monkeypatch.chdir(tmp_path)
+    before = set(sys.modules)
+    board = Board()
+    install(board, monkeypatch)
+    board.main = load_main()
+    board.main.oled = board.main.FallbackMockOLED()
+    yield board
+    for name in set(sys.modules) - before:
+        sys.modules.pop(name, None)
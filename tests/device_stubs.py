@@ -0,0 +1,221 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# NamazVakti5.main'i bilgisayarda çalıştırmak için network ve machine modüllerinin yerine geçen sınıflar.
+# Ağ arayüzü ve RTC gerçek donanım yerine bu nesnelerle taklit edilir; soketler gerçek (CPython) soketlerdir.
+import importlib
+import importlib.util
+import os
+import socket
+import sys
+import threading
+import time
+import types
+
+MAIN_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "NamazVakti5.main.py")
+
+class DeviceReset(Exception):
+    """machine.reset() çağrıldı; cihazda yeniden başlatma, testte döngüden çıkış."""
+
+class WLAN:
+    """network.WLAN: active, config, ifconfig, connect, isconnected ve disconnect çağrılarını kaydeder."""
+    def __init__(self, interface, board):
+        self.interface = interface
+        self.board = board
+        self._active = False
+        self.connected = False
+        self.settings = {"channel": 6}
+        self.static = None # ifconfig ile verilen sabit adres, None ise DHCP
+        self.calls = []
+
+    def active(self, value=None):
+        if value is None:
+            return self._active
+        self.calls.append(("active", value))
+        self._active = value
+        if not value:
+            self.connected = False
+
+    def config(self, *args, **kwargs):
+        if args:
+            return self.settings[args[0]]
+        self.calls.append(("config", kwargs))
+        self.settings.update(kwargs)
+
+    def ifconfig(self, value=None):
+        if value is None:
+            if self.interface == AP_IF:
+                return ("192.168.4.1", "255.255.255.0", "192.168.4.1", "192.168.4.1")
+            if not self.connected:
+                return ("0.0.0.0", "0.0.0.0", "0.0.0.0", "0.0.0.0")
+            return self.static or self.board.dhcp_lease
+        self.calls.append(("ifconfig", value))
+        if value == "dhcp" and self.board.dhcp_errors:
+            self.board.dhcp_errors -= 1
+            raise OSError(-1)
+        self.static = None if value == "dhcp" else tuple(value)
+
+    def connect(self, ssid, password, **kwargs):
+        self.calls.append(("connect", ssid, kwargs))
+        if self.board.connect_failures:
+            self.board.connect_failures -= 1
+            return
+        self.connected = self._active and self.board.network_up
+
+    def isconnected(self):
+        return self.connected
+
+    def disconnect(self):
+        self.calls.append(("disconnect",))
+        self.connected = False
+
+    def status(self):
+        return 1010 if self.connected else 1000
+
+STA_IF, AP_IF = 0, 1
+
+class RTC:
+    def __init__(self, board):
+        self.board = board
+
+    def datetime(self, value=None):
+        if value is None:
+            return self.board.rtc_datetime
+        self.board.rtc_datetime = tuple(value)
+
+    def memory(self, data=None):
+        if data is None:
+            return self.board.rtc_memory
+        self.board.rtc_memory = bytes(data)
+
+class WDT:
+    def __init__(self, timeout=5000):
+        self.timeout = timeout
+        self.feeds = 0
+
+    def feed(self):
+        self.feeds += 1
+
+class Board:
+    """Testin kontrol ettiği cihaz durumu: ağ, DHCP adresi, RTC ve RTC belleği."""
+    def __init__(self):
+        self.network_up = True
+        self.connect_failures = 0 # Bu kadar connect() çağrısı bağlanamaz
+        self.dhcp_errors = 0 # Bu kadar ifconfig("dhcp") çağrısı hata verir
+        self.reset_cause = 1 # machine.PWRON_RESET
+        self.dhcp_lease = ("192.168.1.50", "255.255.255.0", "192.168.1.1", "192.168.1.1")
+        self.rtc_datetime = (2026, 10, 19, 0, 12, 0, 0, 0)
+        self.rtc_memory = b""
+        self.wlans = {}
+        self.resets = 0
+
+    def wlan(self, interface):
+        if interface not in self.wlans:
+            self.wlans[interface] = WLAN(interface, self)
+        return self.wlans[interface]
+
+    def network_module(self):
+        module = types.ModuleType("network")
+        module.STA_IF, module.AP_IF = STA_IF, AP_IF
+        module.WLAN = self.wlan
+        return module
+
+    def machine_module(self):
+        module = types.ModuleType("machine")
+        board = self
+
+        def reset():
+            board.resets += 1
+            raise DeviceReset()
+
+        module.reset = reset
+        module.RTC = lambda: RTC(board)
+        module.unique_id = lambda: b"\x24\x0a\xc4\x12\x34\x56"
+        module.reset_cause = lambda: board.reset_cause
+        module.PWRON_RESET, module.SOFT_RESET, module.WDT_RESET = 1, 5, 3
+        module.WDT = WDT
+        return module
+
+def install(board, monkeypatch):
+    """network, machine ve time.sleep_ms'i test süresince yerine koyar."""
+    monkeypatch.setitem(sys.modules, "network", board.network_module())
+    monkeypatch.setitem(sys.modules, "machine", board.machine_module())
+    if not hasattr(time, "sleep_ms"):
+        monkeypatch.setattr(time, "sleep_ms", lambda ms: time.sleep(ms / 1000.0), raising=False)
+
+def load_main():
+    """NamazVakti5.main'i (dosya adında nokta olduğu için) yoldan, her seferinde temiz olarak yükler."""
+    spec = importlib.util.spec_from_file_location("namazvakti_main", MAIN_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+class _NoSleepTime:
+    """main'in time modülü yerine: bekleme yapmaz (kurulum döngüsündeki hata ve yeniden başlatma beklemeleri)."""
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+    def sleep(self, seconds):
+        pass
+
+    def sleep_ms(self, ms):
+        pass
+
+class SetupLoop:
+    """
+    main.start_ap_mode_and_web_server'ı ayrı thread'de, port 80 yerine loopback'te dinleyen soketle çalıştırır.
+    Captive DNS de loopback'te rastgele bir porta bağlanır. stop() AP süresini bitirir ve döngünün çıkmasını bekler.
+    request_timeout_ms verilirse setup_server.REQUEST_TIMEOUT_MS (cihazda 3000 ms) test süresince değiştirilir.
+    """
+    def __init__(self, board, monkeypatch, request_timeout_ms=None):
+        main = board.main
+        self.board = board
+        self.deadlines = []
+        self.dns = None
+        loop = self
+
+        class StoppableDeadline(main.Deadline):
+            def __init__(self, timeout_ms):
+                super().__init__(timeout_ms)
+                loop.deadlines.append(self)
+
+        captive_dns = importlib.import_module("captive_dns")
+
+        class LoopbackDns(captive_dns.CaptiveDns):
+            def __init__(self, ip):
+                super().__init__(ip, port=0, bind_ip="127.0.0.1")
+                loop.dns = self
+
+        setup_server = importlib.import_module("setup_server")
+        if request_timeout_ms is not None:
+            monkeypatch.setattr(setup_server, "REQUEST_TIMEOUT_MS", request_timeout_ms)
+        monkeypatch.setattr(captive_dns, "CaptiveDns", LoopbackDns)
+        monkeypatch.setattr(main, "Deadline", StoppableDeadline)
+        monkeypatch.setattr(main, "time", _NoSleepTime())
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(5) # Cihazdaki gibi
+        self.address = self.sock.getsockname()
+        self._thread = threading.Thread(target=main.start_ap_mode_and_web_server, daemon=True,
+                                        kwargs={"ap_mode_duration_seconds": 600, "server_socket": self.sock})
+        self._thread.start()
+        end = time.monotonic() + 5
+        while self.dns is None and time.monotonic() < end:
+            time.sleep(0.005)
+        assert self.dns is not None, "Kurulum döngüsü başlamadı"
+        self.dns_address = self.dns.sock.getsockname()
+
+    def stop(self):
+        """AP süresini bitirir; poll'da bekleyen döngü boş bir bağlantıyla uyandırılır."""
+        if not self._thread.is_alive():
+            return
+        self.deadlines[0].reset(0)
+        try:
+            socket.create_connection(self.address, timeout=1).close()
+        except OSError:
+            pass
+        self._thread.join(10)
+        assert not self._thread.is_alive(), "Kurulum döngüsü durmadı"
@@ -0,0 +1,122 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# Captive portal: DNS sorgusundan kurulum sayfasına 302 yönlendirmesine kadar loopback üzerinde uçtan uca test.
+# Cihazdaki kurulum döngüsü (NamazVakti5.main.start_ap_mode_and_web_server) network/machine taklitleriyle
+# çalıştırılır; DNS ve HTTP soketleri aynı select.poll ile beklenir, istekler handle_setup_request ile yanıtlanır.
+# Ölçüm için: python -m pytest tests/test_captive_portal.py -s
+import json
+import socket
+import struct
+import time
+import pytest
+import instrumentation
+from device_stubs import SetupLoop
+
+AP_IP = "192.168.4.1"
+
+def dns_query(name, qtype=1, query_id=0x1234, flags=0x0100):
+    question = b"".join(bytes((len(label),)) + label.encode() for label in name.split(".")) + b"\x00"
+    return struct.pack("!HHHHHH", query_id, flags, 1, 0, 0, 0) + question + struct.pack("!HH", qtype, 1)
+
+@pytest.fixture
+def portal(device, monkeypatch):
+    instrumentation.reset()
+    loop = SetupLoop(device, monkeypatch, request_timeout_ms=1000)
+    yield loop
+    loop.stop()
+
+def resolve(portal, name, qtype=1, query_id=0x1234):
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.settimeout(1)
+    try:
+        client.sendto(dns_query(name, qtype, query_id), portal.dns_address)
+        return client.recvfrom(512)[0]
+    finally:
+        client.close()
+
+def http_get(portal, path, host):
+    conn = socket.create_connection(portal.address, timeout=2)
+    try:
+        conn.sendall(("GET %s HTTP/1.1\r\nHost: %s\r\nUser-Agent: Dalvik/2.1.0\r\n\r\n" % (path, host)).encode())
+        data = b""
+        while True:
+            chunk = conn.recv(1024)
+            if not chunk:
+                return data
+            data += chunk
+    finally:
+        conn.close()
+
+def test_answer_packet_bytes(portal):
+    query = dns_query("connectivitycheck.gstatic.com")
+    answer = resolve(portal, "connectivitycheck.gstatic.com")
+    assert answer == (b"\x12\x34" # Aynı kimlik
+                      b"\x81\x80" # QR=1, RD kopyalandı, RA=1, RCODE=0
+                      b"\x00\x01\x00\x01\x00\x00\x00\x00" # 1 soru, 1 cevap
+                      + query[12:] + # Soru aynen
+                      b"\xc0\x0c\x00\x01\x00\x01\x00\x00\x00\x3c\x00\x04" + bytes((192, 168, 4, 1)))
+    portal.stop() # Sayaç yanıt gönderildikten sonra artar
+    assert portal.dns.queries == 1
+
+def test_non_a_query_gets_empty_answer(portal):
+    query = dns_query("captive.apple.com", qtype=28, query_id=0xBEEF) # AAAA
+    answer = resolve(portal, "captive.apple.com", qtype=28, query_id=0xBEEF)
+    assert answer == b"\xbe\xef\x81\x80\x00\x01\x00\x00\x00\x00\x00\x00" + query[12:]
+
+def test_malformed_queries_ignored(portal):
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.settimeout(0.2)
+    try:
+        for packet in (b"\x00" * 5, # Çok kısa
+                       dns_query("a.com", flags=0x8180), # Yanıt paketi
+                       dns_query("a.com")[:-3]): # Soru yarım
+            client.sendto(packet, portal.dns_address)
+            with pytest.raises(socket.timeout):
+                client.recvfrom(512)
+    finally:
+        client.close()
+    assert portal.dns.queries == 0
+    assert resolve(portal, "hala.calisiyor.com")[3] == 0x80 # Sunucu çalışmaya devam eder
+
+@pytest.mark.parametrize("host,path", [
+    ("connectivitycheck.gstatic.com", "/generate_204"), # Android
+    ("captive.apple.com", "/hotspot-detect.html"), # Apple
+    ("www.msftconnecttest.com", "/connecttest.txt"), # Windows
+    ("detectportal.firefox.com", "/canonical.html"), # Firefox
+])
+def test_query_to_redirect(portal, host, path):
+    started = time.monotonic()
+    answer = resolve(portal, host)
+    assert answer[-4:] == bytes((192, 168, 4, 1))
+    # Cihaz adresi gerçek AP'de 192.168.4.1'dir; loopback'te aynı döngünün HTTP soketine bağlanılır
+    response = http_get(portal, path, host)
+    elapsed_ms = (time.monotonic() - started) * 1000
+    assert response == b"HTTP/1.1 302 Found\r\nLocation: http://192.168.4.1/\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+    assert elapsed_ms < 250
+    print("\n%-32s sorgu -> 302: %.1f ms" % (host, elapsed_ms))
+
+def test_setup_page_not_redirected(portal):
+    response = http_get(portal, "/", AP_IP)
+    assert response.startswith(b"HTTP/1.1 200 OK\r\n")
+    assert b"Namaz Vakitleri Ayarlar" in response
+    assert instrumentation.get("web_requests")[0] == 1
+    assert instrumentation.get("time_to_portal_ms") is not None # İlk 200 yanıtında kaydedilir
+
+def test_form_saved_and_device_restarted(portal):
+    body = b"ssid=Ev+Agi&password=gizli%21&rss_url=http%3A%2F%2Fnamazvakti.com%2FDailyRSS.php&timezone_offset=3"
+    conn = socket.create_connection(portal.address, timeout=2)
+    try:
+        conn.sendall(b"POST / HTTP/1.1\r\nHost: 192.168.4.1\r\nContent-Type: application/x-www-form-urlencoded\r\n"
+                     b"Content-Length: %d\r\n\r\n" % len(body) + body)
+        response = conn.recv(4096)
+    finally:
+        conn.close()
+    assert response.startswith(b"HTTP/1.1 200 OK\r\n")
+    portal.stop()
+    assert portal.board.resets == 1
+    with open("config.json") as f:
+        config = json.load(f)
+    assert (config["ssid"], config["password"], config["timezone_offset"]) == ("Ev Agi", "gizli!", 3)
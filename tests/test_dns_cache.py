@@ -0,0 +1,130 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# DnsCache: ağ işçisi kayıt eklerken ana thread'in kayıtları dolaşması (needs_refresh, save, refresh_expiring),
+# flash'tan yüklenen kayıtların RTC'ye bakılmadan doğrulanması ve ticks_ms ile ölçülen TTL.
+import json
+import sys
+import threading
+import time
+import dns_cache
+import timing
+from dns_cache import DnsCache
+
+def fake_getaddrinfo(host, port):
+    if not host[0].isdigit():
+        host = "10.0.%d.%d" % (len(host) % 256, hash(host) % 256)
+    return [(2, 1, 0, "", (host, port))]
+
+def test_expiring_entries_refreshed(tmp_path, monkeypatch):
+    monkeypatch.setattr(dns_cache.usocket, "getaddrinfo", fake_getaddrinfo)
+    cache = DnsCache(path=str(tmp_path / "dns.json"), ttl_seconds=60, refresh_margin_seconds=120)
+    cache.resolve_ip("namazvakti.com")
+    assert cache.needs_refresh() # TTL, yenileme payından kısa
+    assert cache.refresh_expiring() == 1
+    reloaded = DnsCache(path=str(tmp_path / "dns.json"))
+    assert reloaded.resolve_ip("namazvakti.com") == cache.resolve_ip("namazvakti.com")
+
+def test_iteration_while_other_thread_inserts(tmp_path, monkeypatch):
+    monkeypatch.setattr(dns_cache.usocket, "getaddrinfo", fake_getaddrinfo)
+    cache = DnsCache(path=str(tmp_path / "dns.json"), ttl_seconds=1, refresh_margin_seconds=600)
+    errors = []
+    stop = threading.Event()
+
+    def insert():
+        # Ağ işçisi: yeni kayıtlar ekler
+        for i in range(20000):
+            cache._lookup("host%d.example" % i)
+        stop.set()
+
+    def iterate():
+        # Ana döngü: kayıtları dolaşır ve kaydeder
+        try:
+            while not stop.is_set():
+                cache.needs_refresh()
+                cache.refresh_expiring()
+                cache._dirty = True
+                cache.save()
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+
+    threads = [threading.Thread(target=insert), threading.Thread(target=iterate)]
+    previous = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6) # Thread geçişlerini sıklaştır
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        sys.setswitchinterval(previous)
+    assert errors == []
+
+class Resolver:
+    """getaddrinfo yerine geçer; çağrıları sayar, up False ise DNS'e ulaşılamıyormuş gibi hata verir."""
+    def __init__(self, ip):
+        self.ip = ip
+        self.up = True
+        self.calls = 0
+
+    def __call__(self, host, port):
+        if host[0].isdigit():
+            return [(2, 1, 0, "", (host, port))]
+        self.calls += 1
+        if not self.up:
+            raise OSError(-202) # MicroPython getaddrinfo hatası
+        return [(2, 1, 0, "", (self.ip, port))]
+
+def test_loaded_entries_verified_before_use(tmp_path, monkeypatch):
+    path = str(tmp_path / "dns.json")
+    with open(path, "w") as f:
+        json.dump({"pool.ntp.org": "10.0.0.1", "namazvakti.com": ["10.0.0.2", 4102444800]}, f) # Eski biçim de okunur
+    # Soğuk açılış, NTP'den önce: RTC 2000 yılını gösteriyor
+    monkeypatch.setattr(time, "time", lambda: 946684800.0)
+    resolver = Resolver("10.0.0.9")
+    monkeypatch.setattr(dns_cache.usocket, "getaddrinfo", resolver)
+    cache = DnsCache(path=path)
+    assert cache.needs_refresh() # Doğrulanmamış kayıtlar arka planda yenilenmeli
+    assert cache.resolve_ip("pool.ntp.org") == "10.0.0.9" # Kayıtlı (ölü) adres değil, yeni çözüm
+    assert resolver.calls == 1
+    assert cache.resolve_ip("pool.ntp.org") == "10.0.0.9" and resolver.calls == 1 # Artık geçerli
+    assert cache.refresh_expiring() == 1 and resolver.calls == 2 # Sadece doğrulanmamış namazvakti.com
+    assert not cache.needs_refresh()
+    with open(path) as f:
+        assert json.load(f) == {"pool.ntp.org": "10.0.0.9", "namazvakti.com": "10.0.0.9"}
+
+def test_loaded_entry_is_fallback_when_dns_down(tmp_path, monkeypatch):
+    path = str(tmp_path / "dns.json")
+    with open(path, "w") as f:
+        json.dump({"pool.ntp.org": "10.0.0.1"}, f)
+    resolver = Resolver("10.0.0.9")
+    resolver.up = False
+    monkeypatch.setattr(dns_cache.usocket, "getaddrinfo", resolver)
+    cache = DnsCache(path=path)
+    assert cache.resolve_ip("pool.ntp.org") == "10.0.0.1" and cache.stale_hits == 1
+    assert cache.resolve_ip("pool.ntp.org") == "10.0.0.1" and resolver.calls == 2 # Geçerli sayılmadı, yine denendi
+    # Arka plan yenilemesi başarısız: kayıt yedek kalır, işçi her döngüde tekrar denemez
+    assert cache.refresh_expiring() == 0 and not cache.needs_refresh()
+    resolver.up = True
+    assert cache.resolve_ip("pool.ntp.org") == "10.0.0.9"
+
+def test_ttl_measured_with_ticks(tmp_path, monkeypatch):
+    ticks = [0]
+    monkeypatch.setattr(timing, "ticks_ms", lambda: ticks[0])
+    resolver = Resolver("10.0.0.9")
+    monkeypatch.setattr(dns_cache.usocket, "getaddrinfo", resolver)
+    cache = DnsCache(path=str(tmp_path / "dns.json"), ttl_seconds=3600, refresh_margin_seconds=600)
+    cache.resolve_ip("namazvakti.com")
+    monkeypatch.setattr(time, "time", lambda: 946684800.0) # NTP saati geri/ileri atlatsa da TTL değişmez
+    ticks[0] = 2999 * 1000
+    assert not cache.needs_refresh()
+    ticks[0] = 3001 * 1000
+    assert cache.needs_refresh()
+    cache.resolve_ip("namazvakti.com")
+    assert resolver.calls == 1
+    ticks[0] = 3600 * 1000
+    cache.resolve_ip("namazvakti.com")
+    assert resolver.calls == 2
@@ -0,0 +1,66 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# Ayrıştırıcıların sağlayıcı yanıt biçimlerinden yeniden oluşturulmuş örnekler (tests/feeds) üzerinde birbirleriyle ve beklenen sonuçla uyumu.
+# Yeni bir yanıt kaydedildiğinde tests/feeds'e eklenip beklenen vakitleri tests/feeds_expected.json'a yazılmalıdır.
+import json
+import os
+import pytest
+from conftest import FEEDS
+from prayer_schedule import PrayerSchedule, UNSET
+from feed_parsers import PARSERS, sniff, parse_auto, parse_json
+from feed_bench import compare_backends, corpus, load_recorded, SAMPLE_RSS, SAMPLE_EXPECTED
+
+with open(os.path.join(os.path.dirname(FEEDS), "feeds_expected.json")) as f:
+    EXPECTED = json.load(f)
+
+def backends_for(body):
+    kind = sniff(body)
+    return [name for name in sorted(PARSERS) if name == "auto" or name.split("_")[0] == kind]
+
+def run(parser, body):
+    schedule = PrayerSchedule()
+    title = parser(body, schedule)
+    return title, list(schedule.minutes)
+
+def test_every_recording_has_expected_result():
+    assert sorted(os.listdir(FEEDS)) == sorted(EXPECTED)
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_recorded_feed(name):
+    with open(os.path.join(FEEDS, name), "rb") as f:
+        body = f.read()
+    backends = backends_for(body)
+    assert len(backends) >= 2 # En az "auto" ve türüne özel ayrıştırıcı
+    for backend in backends:
+        title, minutes = run(PARSERS[backend], body)
+        assert minutes == EXPECTED[name]["minutes"], backend
+        assert title == EXPECTED[name]["title"], backend
+
+def test_compare_backends_agree():
+    expected = dict((name, value["minutes"]) for name, value in EXPECTED.items())
+    report = compare_backends(corpus() + load_recorded(FEEDS, expected), repeat=1)
+    for backend, (_, _, agreed, count) in report.items():
+        assert agreed == count, backend
+
+def test_fallback_fills_only_unset_slots():
+    # Bayt tarayıcı İmsâk'ı okuyamaz (saat ad ile aynı satırda değil); yedek yol sadece onu doldurmalı
+    body = SAMPLE_RSS.replace(b"\xc4\xb0ms\xc3\xa2k : 05:41", b"\xc4\xb0ms\xc3\xa2k" + b" " * 80 + b"05:41")
+    scanned = PrayerSchedule()
+    PARSERS["rss"](body, scanned)
+    assert scanned.minutes[0] == UNSET and scanned.count() == 5
+    # Yedek yolun yanlış okuyacağı bir değer: tarayıcının bulduğu Öğle vakti korunmalı
+    body = body.replace(b"</description>", b"\xc3\x96\xc4\x9fle 23 59</description>")
+    title, minutes = run(parse_auto, body)
+    assert title == "19 Ekim 2026 Pazartesi"
+    assert minutes == list(SAMPLE_EXPECTED)
+
+def test_json_prefers_fajr_over_precautionary_imsak():
+    body = b'{"timings": {"Imsak": "05:31", "Fajr": "05:41", "Sunrise": "07:04"}}'
+    assert run(parse_json, body)[1][:2] == [341, 424]
+    body = b'{"timings": {"Fajr": "05:41", "Imsak": "05:31"}}'
+    assert run(parse_json, body)[1][0] == 341
+    body = b'{"vakitler": {"imsak": "05:41", "gunes": "07:04"}}' # Sadece Türkçe anahtar
+    assert run(parse_json, body)[1][:2] == [341, 424]
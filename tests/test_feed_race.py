@@ -0,0 +1,214 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# feed_race: gecikmesi ve hata türü ayarlanabilen yerel HTTP sunucularıyla kademeli başlatma, kaybedenlerin
+# iptali, birincil kaynak hata verdiğinde yedeğe geçiş ve SourceStats sıralaması.
+import os
+import select
+import socket
+import threading
+import time
+import pytest
+from conftest import FEEDS
+from feed_race import race, SourceStats
+
+with open(os.path.join(FEEDS, "namazvakti_istanbul.rss"), "rb") as f:
+    RSS_BODY = f.read()
+ISTANBUL = (341, 424, 764, 952, 1094, 1172)
+
+class StubServer:
+    """
+    Tek istekte: isteği okur, latency saniye bekler (bu sırada istemci kapatırsa iptal sayılır) ve mode'a göre cevap verir.
+    mode: "ok" (200 + RSS), "500", "garbage" (200 + vakitsiz gövde), "partial" (200 + Yatsı eksik), "close" (cevapsız kapat).
+    """
+    def __init__(self, latency=0.0, mode="ok"):
+        self.latency = latency
+        self.mode = mode
+        self.requests = [] # (isteğin geldiği an, yol)
+        self.cancelled = 0
+        self.served = 0
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(8)
+        self.port = self.sock.getsockname()[1]
+        self.url = "http://127.0.0.1:%d/DailyRSS.php?cityID=16741" % self.port
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while self._running:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        with conn:
+            data = b""
+            while b"\r\n\r\n" not in data:
+                chunk = conn.recv(1024)
+                if not chunk:
+                    return
+                data += chunk
+            self.requests.append((time.monotonic(), data.split(b" ")[1].decode()))
+            end = time.monotonic() + self.latency
+            while time.monotonic() < end:
+                readable, _, _ = select.select([conn], [], [], max(0, min(0.01, end - time.monotonic())))
+                if readable and not conn.recv(1):
+                    self.cancelled += 1 # İstemci yarışı kaybedip bağlantıyı kapattı
+                    return
+            if self.mode == "close":
+                return
+            status, body = b"200 OK", RSS_BODY
+            if self.mode == "500":
+                status, body = b"500 Internal Server Error", b"hata"
+            elif self.mode == "garbage":
+                body = b"<html><body>Bakimda</body></html>"
+            elif self.mode == "partial":
+                body = RSS_BODY.replace("Yatsı : 19:32".encode(), b"")
+            try:
+                conn.sendall(b"HTTP/1.0 " + status + b"\r\nContent-Type: application/rss+xml\r\n\r\n" + body)
+                self.served += 1
+            except OSError:
+                self.cancelled += 1
+
+    def close(self):
+        self._running = False
+        self.sock.close()
+
+def resolver(host, port):
+    return socket.getaddrinfo(host, port)[0][-1]
+
+@pytest.fixture
+def servers():
+    created = []
+    def make(latency=0.0, mode="ok"):
+        server = StubServer(latency, mode)
+        created.append(server)
+        return server
+    yield make
+    for server in created:
+        server.close()
+
+def wait_for(condition, timeout=2.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end and not condition():
+        time.sleep(0.005)
+    return condition()
+
+def test_stagger_order(servers):
+    a, b, c = servers(0.6), servers(0.6), servers(0.1)
+    stats = SourceStats()
+    start = time.monotonic()
+    winner = race([(a.url, "rss"), (b.url, "rss"), (c.url, "rss")], stats, resolver, stagger_ms=150, timeout_ms=3000)
+    assert winner is not None and winner[0] == c.url and tuple(winner[1].minutes) == ISTANBUL
+    assert winner[2] == "19 Ekim 2026 Pazartesi"
+    offsets = [server.requests[0][0] - start for server in (a, b, c)]
+    # Yapılandırma sırasıyla, en az stagger_ms aralıkla başlatılır
+    assert offsets[0] < 0.1
+    assert 0.14 <= offsets[1] - offsets[0] < 0.3
+    assert 0.14 <= offsets[2] - offsets[1] < 0.3
+
+def test_losers_cancelled(servers):
+    slow, fast = servers(1.0), servers(0.0)
+    stats = SourceStats()
+    start = time.monotonic()
+    winner = race([(slow.url, "rss"), (fast.url, "rss")], stats, resolver, stagger_ms=100, timeout_ms=3000)
+    assert winner[0] == fast.url
+    assert time.monotonic() - start < 0.5 # Yavaş kaynağı beklemez
+    # Kaybeden bağlantı kapatıldı; sunucu cevap veremeden iptali gördü
+    assert wait_for(lambda: slow.cancelled == 1)
+    assert slow.served == 0
+    # İptal hata sayılmaz, geçen süre gecikmenin alt sınırı olarak işlenir
+    successes, failures, avg_ms = stats.get(slow.url)
+    assert (successes, failures) == (0, 0) and avg_ms >= 90
+
+@pytest.mark.parametrize("mode", ["500", "garbage", "partial", "close"])
+def test_fallback_when_primary_fails(servers, mode):
+    primary, backup = servers(0.0, mode), servers(0.0)
+    stats = SourceStats()
+    start = time.monotonic()
+    winner = race([(primary.url, "rss"), (backup.url, "rss")], stats, resolver, stagger_ms=1000, timeout_ms=3000)
+    assert winner[0] == backup.url and tuple(winner[1].minutes) == ISTANBUL
+    # Birincil hemen bitti: yedek stagger_ms beklenmeden başlatıldı
+    assert backup.requests[0][0] - start < 0.5
+    assert stats.get(primary.url)[:2] == [0, 1]
+
+def test_fallback_when_primary_refuses(servers):
+    closed = socket.socket()
+    closed.bind(("127.0.0.1", 0))
+    refused_url = "http://127.0.0.1:%d/" % closed.getsockname()[1]
+    closed.close() # Port kapalı: bağlantı reddedilir
+    backup = servers(0.0)
+    stats = SourceStats()
+    winner = race([(refused_url, "rss"), (backup.url, "rss")], stats, resolver, stagger_ms=1000, timeout_ms=3000)
+    assert winner[0] == backup.url
+    assert stats.get(refused_url)[1] == 1
+
+def test_all_fail_returns_none(servers):
+    a, b = servers(0.0, "500"), servers(0.0, "close")
+    stats = SourceStats()
+    assert race([(a.url, "rss"), (b.url, "rss")], stats, resolver, stagger_ms=50, timeout_ms=2000) is None
+    assert stats.get(a.url)[1] == 1 and stats.get(b.url)[1] == 1
+
+def test_timeout_cancels_everything(servers):
+    slow = servers(2.0)
+    stats = SourceStats()
+    start = time.monotonic()
+    assert race([(slow.url, "rss")], stats, resolver, stagger_ms=50, timeout_ms=300) is None
+    assert time.monotonic() - start < 0.8
+    assert stats.get(slow.url)[1] == 1 # Zaman aşımı hata sayılır
+    assert wait_for(lambda: slow.cancelled == 1)
+
+def test_stats_reorder_sources(servers):
+    flaky, steady = servers(0.0, "500"), servers(0.05)
+    sources = [(flaky.url, "rss"), (steady.url, "rss")]
+    stats = SourceStats()
+    assert race(sources, stats, resolver, stagger_ms=200, timeout_ms=3000)[0] == steady.url
+    assert stats.order(sources)[0][0] == steady.url # Hata veren kaynak geriye düştü
+    before = len(flaky.requests)
+    start = time.monotonic()
+    assert race(sources, stats, resolver, stagger_ms=200, timeout_ms=3000)[0] == steady.url
+    # İkinci yarışta önce sağlıklı kaynak denenir; kazanınca hatalı kaynağa hiç gidilmez
+    assert steady.requests[-1][0] - start < 0.1
+    assert len(flaky.requests) == before
+
+def test_faster_source_promoted(servers):
+    slow, fast = servers(0.3), servers(0.0)
+    sources = [(slow.url, "rss"), (fast.url, "rss")]
+    stats = SourceStats()
+    for _ in range(2):
+        stats.record(slow.url, True, 300)
+        stats.record(fast.url, True, 20)
+    assert [s[0] for s in stats.order(sources)] == [fast.url, slow.url]
+    winner = race(sources, stats, resolver, stagger_ms=500, timeout_ms=3000)
+    assert winner[0] == fast.url and slow.requests == []
+
+RELEASE_CHECK = r"""
+import gc, sys, weakref
+sys.path[:0] = [%r, %r]
+import conftest
+from feed_race import race, SourceStats
+stats = {}
+SourceStats(stats).record("http://a/", True, 120)
+refs = [weakref.ref(f) for f in (race, sys.modules["feed_parsers"].parse_rss, sys.modules["http_client"].split_url)]
+del race, SourceStats
+for name in ("feed_race", "feed_parsers", "rss_scanner", "http_client"): # NamazVakti5.main.get_city_schedules ile aynı
+    sys.modules.pop(name, None)
+gc.collect()
+print([r() is None for r in refs], stats)
+"""
+
+def test_release_frees_race_and_parsers():
+    # Ana döngü istatistikleri düz sözlükte tutar; modüller çıkarılınca fonksiyonlar (ve globalleri) serbest kalmalı
+    import subprocess
+    import sys
+    here = os.path.dirname(os.path.abspath(__file__))
+    out = subprocess.run([sys.executable, "-c", RELEASE_CHECK % (here, os.path.dirname(here))],
+                         capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "[True, True, True] {'http://a/': [1, 0, 120]}"
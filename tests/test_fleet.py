@@ -0,0 +1,146 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# Filo yapılandırması: 127.0.0.1 üzerinde farklı portlarda benzetilmiş iki cihaz ve bir Provisioner ile
+# keşif, toplu gönderim, tekrar gönderilen (replay) ve hatalı imzalı paketlerin reddi.
+import struct
+import threading
+import time
+import pytest
+import instrumentation
+from fleet import (FleetAgent, Provisioner, encode_push, config_hash, MSG_ACK,
+                   STATUS_OK, STATUS_REPLAY, STATUS_INVALID)
+
+KEY = b"filo-anahtari"
+DEFAULTS = {
+    "rss_url": "",
+    "cities": [],
+    "sources": [],
+    "city_rotate_seconds": 10,
+    "large_countdown": False,
+    "fleet_key": "",
+    "fleet_counter": 0,
+}
+
+class Device:
+    """Kaydettiği yapılandırmaları saklayan, arka planda handle() çağıran benzetilmiş cihaz."""
+    def __init__(self, device_id):
+        self.config = dict(DEFAULTS, rss_url="http://example.com/%d" % device_id[-1])
+        self.saved = []
+        self.agent = FleetAgent(KEY, device_id, 7, self.config, DEFAULTS, self.save, port=0, bind_ip="127.0.0.1")
+        self.address = self.agent.sock.getsockname()
+
+    def save(self, config):
+        self.saved.append(config)
+        return True
+
+class Fleet:
+    def __init__(self, count=2):
+        self.devices = [Device(b"\x24\x0a\xc4\x00\x00" + bytes((i + 1,))) for i in range(count)]
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+        self.provisioner = Provisioner(KEY, [device.address for device in self.devices])
+
+    def _loop(self):
+        # Cihazdaki ana döngü gibi: soketler bloklamadan, kısa aralıklarla okunur
+        while self.running:
+            for device in self.devices:
+                device.agent.handle()
+            time.sleep(0.005)
+
+    def close(self):
+        self.running = False
+        self.thread.join()
+        self.provisioner.close()
+        for device in self.devices:
+            device.agent.close()
+
+@pytest.fixture
+def fleet():
+    instrumentation.reset()
+    fleet = Fleet()
+    yield fleet
+    fleet.close()
+
+def test_discover_lists_every_device(fleet):
+    devices = fleet.provisioner.discover(timeout_ms=300)
+    assert sorted(devices) == sorted(device.agent.device_id for device in fleet.devices)
+    for device in fleet.devices:
+        addr, version, digest, counter = devices[device.agent.device_id]
+        assert addr == device.address
+        assert (version, digest, counter) == (7, config_hash(device.config), 0)
+
+def test_batch_push_updates_all_devices(fleet):
+    fleet.provisioner.discover(timeout_ms=300)
+    cities = [{"name": "Ankara", "rss_url": "http://example.com/ankara"}]
+    results = fleet.provisioner.push({"cities": cities, "city_rotate_seconds": 20}, timeout_ms=300)
+    assert sorted(results) == sorted(device.agent.device_id for device in fleet.devices)
+    for device in fleet.devices:
+        status, digest = results[device.agent.device_id]
+        assert status == STATUS_OK
+        assert device.config["cities"] == cities and device.config["fleet_counter"] == 1
+        assert digest == config_hash(device.config)
+        assert len(device.saved) == 1
+    # Gönderimden sonra keşif yeni sayacı gösterir
+    devices = fleet.provisioner.discover(timeout_ms=300)
+    assert all(counter == 1 for _, _, _, counter in devices.values())
+
+def test_targeted_push_skips_other_devices(fleet):
+    fleet.provisioner.discover(timeout_ms=300)
+    target = fleet.devices[0].agent.device_id
+    results = fleet.provisioner.push({"large_countdown": True}, targets=(target,), timeout_ms=300)
+    assert list(results) == [target]
+    assert fleet.devices[0].config["large_countdown"] is True
+    assert fleet.devices[1].config["large_countdown"] is False
+
+def test_replayed_counter_rejected(fleet):
+    fleet.provisioner.discover(timeout_ms=300)
+    assert all(status == STATUS_OK for status, _ in fleet.provisioner.push({"city_rotate_seconds": 30}, timeout_ms=300).values())
+    # Yakalanmış paket aynen yeniden gönderilir; sayaç artmadığı için reddedilmeli
+    fleet.provisioner._send(encode_push(KEY, fleet.provisioner.counter, {"city_rotate_seconds": 5}))
+    acks = fleet.provisioner._collect(MSG_ACK, 300)
+    assert len(acks) == len(fleet.devices)
+    for payload, _ in acks:
+        assert struct.unpack("!I6sB4s", payload)[2] == STATUS_REPLAY
+    for device in fleet.devices:
+        assert device.config["city_rotate_seconds"] == 30 and len(device.saved) == 1
+    assert instrumentation.get("fleet_replays")[0] == len(fleet.devices)
+
+def test_bad_hmac_rejected_silently(fleet):
+    fleet.provisioner.discover(timeout_ms=300)
+    fleet.provisioner._send(encode_push(b"yanlis-anahtar", 99, {"city_rotate_seconds": 5}))
+    packet = bytearray(encode_push(KEY, 100, {"city_rotate_seconds": 5}))
+    packet[-1] ^= 1 # İmzanın son biti bozulur
+    fleet.provisioner._send(bytes(packet))
+    assert fleet.provisioner._collect(MSG_ACK, 300) == [] # İmzasız paketlere cevap verilmez
+    for device in fleet.devices:
+        assert device.config["city_rotate_seconds"] == 10 and device.config["fleet_counter"] == 0
+        assert device.saved == []
+    assert instrumentation.get("fleet_auth_failures")[0] == 2 * len(fleet.devices)
+
+@pytest.mark.parametrize("changes", [
+    {"cities": [1]},
+    {"cities": [{"name": "Ankara"}]},
+    {"cities": [{"name": 3, "rss_url": "http://example.com"}]},
+    {"sources": ["http://example.com"]},
+    {"sources": [{"url": "http://example.com", "parser": 1}]},
+    {"sources": [{"parser": "auto"}]},
+    {"fleet_counter": 1000},
+    {"city_rotate_seconds": "20"},
+    {"bilinmeyen": 1},
+])
+def test_invalid_changes_not_saved(fleet, changes):
+    fleet.provisioner.discover(timeout_ms=300)
+    results = fleet.provisioner.push(changes, timeout_ms=300)
+    assert [status for status, _ in results.values()] == [STATUS_INVALID] * len(fleet.devices)
+    for device in fleet.devices:
+        assert device.saved == [] and device.config == dict(DEFAULTS, rss_url=device.config["rss_url"])
+
+def test_source_without_parser_accepted(fleet):
+    fleet.provisioner.discover(timeout_ms=300)
+    sources = [{"url": "http://example.com/json"}, {"url": "http://example.com/csv", "parser": "csv"}]
+    results = fleet.provisioner.push({"sources": sources}, timeout_ms=300)
+    assert [status for status, _ in results.values()] == [STATUS_OK] * len(fleet.devices)
@@ -0,0 +1,231 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# http_client.KeepAliveClient: yerel HTTP/1.1 sunucusuna karşı bağlantının yeniden kullanımı, Content-Length ve
+# chunked gövdeler, oturum ortasında bağlantıyı kapatan sunucu. Çoklu şehirde get_city_schedules'ın tek bağlantıyla
+# N ayrı çekimden daha ucuz olduğu da ölçülür (rapor için: python -m pytest tests/test_http_client.py -s).
+import os
+import socket
+import threading
+import time
+import pytest
+from conftest import FEEDS
+from http_client import KeepAliveClient, split_url
+
+class KeepAliveServer:
+    """
+    Her bağlantıda istekleri sırayla okur ve respond(yol) ile cevaplar. respond (parçalar, kapat) döndürür:
+    parçalar aralarında kısa beklemeyle ayrı ayrı gönderilir, kapat True ise cevaptan sonra bağlantı kapatılır.
+    accept_delay: her yeni bağlantının kabulünden önceki bekleme (cihazdaki TCP/DNS kurulum maliyeti yerine).
+    """
+    def __init__(self, respond, accept_delay=0.0):
+        self.respond = respond
+        self.accept_delay = accept_delay
+        self.connections = 0
+        self.requests = [] # (bağlantı sırası, yol)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(8)
+        self.base = "http://127.0.0.1:%d" % self.sock.getsockname()[1]
+        self._running = True
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while self._running:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            time.sleep(self.accept_delay)
+            self.connections += 1
+            threading.Thread(target=self._handle, args=(conn, self.connections), daemon=True).start()
+
+    def _handle(self, conn, index):
+        with conn:
+            data = b""
+            while True:
+                while b"\r\n\r\n" not in data:
+                    chunk = conn.recv(1024)
+                    if not chunk:
+                        return
+                    data += chunk
+                head, data = data.split(b"\r\n\r\n", 1)
+                path = head.split(b" ")[1].decode()
+                self.requests.append((index, path))
+                pieces, close = self.respond(path)
+                try:
+                    for i, piece in enumerate(pieces):
+                        if i:
+                            time.sleep(0.005) # İstemci parçaları ayrı ayrı okusun
+                        conn.sendall(piece)
+                except OSError:
+                    return
+                if close:
+                    return
+
+    def close(self):
+        self._running = False
+        self.sock.close()
+
+def response(body, headers=b"", version=b"HTTP/1.1"):
+    return version + b" 200 OK\r\nContent-Length: " + str(len(body)).encode() + b"\r\n" + headers + b"\r\n" + body
+
+def chunked(parts, extension=b"", trailer=b""):
+    out = [b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"]
+    for part in parts:
+        out.append(b"%x%s\r\n%s\r\n" % (len(part), extension, part))
+    out.append(b"0\r\n" + trailer + b"\r\n")
+    return out
+
+@pytest.fixture
+def serve():
+    servers = []
+    def start(respond, accept_delay=0.0):
+        server = KeepAliveServer(respond, accept_delay)
+        servers.append(server)
+        return server
+    yield start
+    for server in servers:
+        server.close()
+
+def test_split_url():
+    assert split_url("http://namazvakti.com/DailyRSS.php?cityID=1") == ("namazvakti.com", 80, "/DailyRSS.php?cityID=1")
+    assert split_url("127.0.0.1:8080") == ("127.0.0.1", 8080, "/")
+    with pytest.raises(ValueError):
+        split_url("https://example.com/")
+
+def test_keep_alive_reuses_connection(serve):
+    server = serve(lambda path: ([response(path.encode())], False))
+    client = KeepAliveClient(timeout=2)
+    try:
+        for i in range(5):
+            assert client.get(server.base + "/sehir/%d" % i) == (200, b"/sehir/%d" % i)
+    finally:
+        client.close()
+    assert client.connections_opened == 1 and server.connections == 1
+    assert client.requests_sent == 5 and [index for index, _ in server.requests] == [1] * 5
+
+def test_content_length_body_in_pieces(serve):
+    body = bytes(range(256)) * 40 + b"\r\n\r\n0\r\n" # Gövdede başlık/parça ayracına benzeyen baytlar
+    raw = response(body)
+    pieces = [raw[:30], raw[30:200], raw[200:5000], raw[5000:]]
+    server = serve(lambda path: (pieces if path == "/buyuk" else [response(b"")], False))
+    client = KeepAliveClient(timeout=2)
+    try:
+        assert client.get(server.base + "/buyuk") == (200, body)
+        assert client.get(server.base + "/bos") == (200, b"") # Aynı bağlantıda, önceki gövde tam okunmuş
+    finally:
+        client.close()
+    assert server.connections == 1
+
+def test_chunked_body(serve):
+    parts = [b"<rss>", b"x" * 5000, b"\r\n", b"</rss>"]
+    def respond(path):
+        if path == "/tek":
+            return chunked([b"tek parca"]), False
+        if path == "/ek":
+            return chunked(parts, extension=b";isim=deger", trailer=b"X-Checksum: 1\r\n"), False
+        return chunked(parts), False
+    server = serve(respond)
+    client = KeepAliveClient(timeout=2)
+    try:
+        assert client.get(server.base + "/") == (200, b"".join(parts))
+        assert client.get(server.base + "/ek") == (200, b"".join(parts)) # Parça uzantısı ve sondaki başlıklar atlanır
+        assert client.get(server.base + "/tek") == (200, b"tek parca")
+    finally:
+        client.close()
+    assert server.connections == 1 and len(server.requests) == 3
+
+def test_connection_close_and_http10(serve):
+    def respond(path):
+        if path == "/kapat":
+            return [response(b"son", b"Connection: close\r\n")], True
+        if path == "/eski":
+            return [response(b"1.0", version=b"HTTP/1.0")], True
+        if path == "/uzunluksuz":
+            return [b"HTTP/1.1 200 OK\r\n\r\n", b"kapanana ", b"kadar"], True
+        return [response(b"ok")], False
+    server = serve(respond)
+    client = KeepAliveClient(timeout=2)
+    try:
+        assert client.get(server.base + "/kapat") == (200, b"son")
+        assert client._sock is None # İstemci de bağlantıyı bırakır
+        assert client.get(server.base + "/eski") == (200, b"1.0")
+        assert client.get(server.base + "/uzunluksuz") == (200, b"kapanana kadar")
+        assert client.get(server.base + "/") == (200, b"ok")
+    finally:
+        client.close()
+    assert client.connections_opened == server.connections == 4
+
+def test_server_closes_idle_connection(serve):
+    # Sunucu her iki istekten sonra "Connection: close" demeden kapatır; istemci yeni bağlantıyla bir kez tekrar dener
+    counts = {}
+    def respond(path):
+        counts[path] = counts.get(path, 0) + 1
+        return [response(path.encode())], len(counts) % 2 == 0
+    server = serve(respond)
+    client = KeepAliveClient(timeout=2)
+    try:
+        for i in range(5):
+            assert client.get(server.base + "/%d" % i) == (200, b"/%d" % i)
+    finally:
+        client.close()
+    assert client.connections_opened == server.connections == 3
+    assert sorted(counts.values()) == [1] * 5 # Kapanan bağlantıda istek sunucuya hiç ulaşmadı, tekrar gönderildi
+
+def test_server_closes_mid_body(serve):
+    raw = response(b"x" * 1000)
+    truncate = {"/kes": 1, "/hep": 99}
+    def respond(path):
+        if truncate.get(path, 0) > 0:
+            truncate[path] -= 1
+            return [raw[:400]], True
+        return [raw], False
+    server = serve(respond)
+    client = KeepAliveClient(timeout=2)
+    try:
+        assert client.get(server.base + "/")[1] == b"x" * 1000
+        # Açık bağlantıda gövde yarıda kesildi: bir kez yeni bağlantıyla denenir
+        assert client.get(server.base + "/kes")[1] == b"x" * 1000
+        # Tekrar denemede de kesilirse hata çağırana iletilir, bağlantı kapatılır
+        with pytest.raises(OSError):
+            client.get(server.base + "/hep")
+        assert client._sock is None
+        assert client.get(server.base + "/")[1] == b"x" * 1000
+    finally:
+        client.close()
+    assert client.connections_opened == server.connections == 4 # /kes ve /hep birer kez yeniden bağlandı
+
+SETUP_S = 0.1
+
+def test_city_schedules_share_one_connection(device, serve):
+    main = device.main
+    feeds = {}
+    for name in ("istanbul", "ankara", "izmir", "erzurum"):
+        with open(os.path.join(FEEDS, "namazvakti_%s.rss" % name), "rb") as f:
+            feeds["/DailyRSS.php?city=" + name] = f.read()
+    # Cihazda her yeni bağlantı DNS + TCP kurulumu demektir; sunucu her kabulden önce SETUP_S bekler
+    server = serve(lambda path: ([response(feeds[path], b"Content-Type: application/rss+xml\r\n")], False), accept_delay=SETUP_S)
+    urls = [server.base + path for path in feeds]
+
+    start = time.monotonic()
+    success, schedules = main.get_city_schedules(urls, main.silent_display)
+    shared_s = time.monotonic() - start
+    shared_connections = server.connections
+    assert success and all(s is not None and s.count() == 6 for s in schedules)
+    assert shared_connections == 1
+
+    start = time.monotonic()
+    separate = [main.get_namaz_vakitleri(url, main.silent_display) for url in urls]
+    separate_s = time.monotonic() - start
+    separate_connections = server.connections - shared_connections
+    assert separate_connections == len(urls)
+    assert [list(s.minutes) for s in schedules] == [list(s.minutes) for _, s in separate]
+    # Fark en az (N - 1) kurulum süresidir; makine yüküne karşı yarısı aranır
+    assert separate_s - shared_s > (len(urls) - 1) * SETUP_S / 2
+    print()
+    print("%d şehir: tek bağlantı %d bağlantı %.0f ms, ayrı çekim %d bağlantı %.0f ms" %
+          (len(urls), shared_connections, shared_s * 1000, separate_connections, separate_s * 1000))
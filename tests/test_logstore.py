@@ -0,0 +1,144 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# logstore: açılışta kurtarma (yarım sıkıştırma, yarım yazılmış kuyruk), sıkıştırma ve payı, olay günlüğünde
+# UTF-8 kesme. Ana döngünün günlük yazma yükü NamazVakti5.main.persist_state ile simüle edilir
+# (rapor için: python -m pytest tests/test_logstore.py -s).
+import os
+import pytest
+import instrumentation
+from logstore import LogStore, EventLog, RECORD_SIZE, MAX_VALUE_BYTES
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "nv_store.log")
+
+def test_values_survive_remount(path):
+    store = LogStore(path)
+    store.put("a", b"1")
+    store.put("b", b"2")
+    store.put("a", b"3")
+    store.delete("b")
+    assert not store.put("a", b"3") # Değişmeyen değer yazılmaz
+    assert os.path.getsize(path) == 4 * RECORD_SIZE
+    store = LogStore(path)
+    assert store.get("a") == b"3" and store.get("b") is None and store.keys() == [b"a"]
+
+@pytest.mark.parametrize("tail", [17, RECORD_SIZE - 1])
+def test_torn_tail_discarded(path, tail):
+    store = LogStore(path)
+    store.put("a", b"1")
+    store.put("b", b"2")
+    with open(path, "r+b") as f:
+        f.truncate(RECORD_SIZE + tail) # İkinci kayıt yazılırken güç kesildi
+    store = LogStore(path)
+    assert store.get("a") == b"1" and store.get("b") is None
+    assert os.path.getsize(path) == RECORD_SIZE # Kuyruk onarıldı, sonraki eklemeler hizalı
+    store.put("c", b"3")
+    assert LogStore(path).get("c") == b"3"
+
+def test_corrupt_record_stops_replay(path):
+    store = LogStore(path)
+    for i in range(3):
+        store.put("k%d" % i, b"v")
+    with open(path, "r+b") as f:
+        f.seek(RECORD_SIZE + 20)
+        f.write(b"\xff") # İkinci kaydın CRC'si tutmaz; sonrası güvenilmez
+    store = LogStore(path)
+    assert store.keys() == [b"k0"]
+
+def test_interrupted_compaction_recovered(path):
+    store = LogStore(path)
+    store.put("a", b"1")
+    # Yeni dosya yazılırken kesildi: asıl dosya sağlam, yarım .tmp atılır
+    with open(path + ".tmp", "wb") as f:
+        f.write(b"\x00" * 10)
+    assert LogStore(path).get("a") == b"1" and not os.path.exists(path + ".tmp")
+    # Eski dosya silindi ama rename yapılamadan kesildi: .tmp tamdır, yerine konur
+    store.compact()
+    os.rename(path, path + ".tmp")
+    assert LogStore(path).get("a") == b"1" and os.path.exists(path)
+
+def test_compaction_bounds_size(path):
+    store = LogStore(path, max_bytes=2048)
+    for i in range(1000):
+        store.put("k%d" % (i % 5), b"%d" % i)
+        assert os.path.getsize(path) <= 2048
+    store = LogStore(path)
+    assert sorted(store.keys()) == [b"k%d" % i for i in range(5)]
+    assert store.get("k4") == b"999"
+
+def test_full_store_compacts_with_hysteresis(path):
+    max_bytes = 2048
+    store = LogStore(path, max_bytes=max_bytes) # Pay 512 bayt: en fazla 24 canlı kayıt
+    for i in range(24):
+        store.put("k%02d" % i, b"x")
+    with pytest.raises(OSError):
+        store.put("fazla", b"x") # Yeni anahtar paya girerdi
+    writes = 400
+    for i in range(writes):
+        store.put("k%02d" % (i % 24), b"%d" % i)
+    # Her sıkıştırmadan sonra en az pay kadar ekleme yapılır; dolu depo her yazmada kendini yeniden yazmaz.
+    # Yazma çarpanı en fazla 1 + canlı / pay = 4 (paysız sıkıştırmada her yazma 24 kaydı yeniden yazardı)
+    assert store.compactions <= writes * RECORD_SIZE // store.compact_margin
+    assert store.bytes_written <= 4 * writes * RECORD_SIZE + (max_bytes - store.compact_margin)
+
+def test_event_log_ring_and_utf8(path):
+    store = LogStore(path)
+    log = EventLog(store, capacity=4)
+    for i in range(6):
+        log.log(1000 + i, i, "olay %d" % i)
+    message = "Wi-Fi şifresi yanlış: ağ Çağrı" # 30 bayt sınırı 'ğ'nin ortasına düşer
+    with pytest.raises(UnicodeError):
+        message.encode()[:MAX_VALUE_BYTES - 6].decode()
+    log.log(2000, 9, message)
+    events = EventLog(LogStore(path), capacity=4).events()
+    assert [e[1] for e in events] == [3, 4, 5, 9]
+    text = events[-1][2]
+    assert message.startswith(text) and len(text.encode()) <= MAX_VALUE_BYTES - 6
+    # Düzeltmeden önce karakter ortasından kesilerek yazılmış kayıt da okunur
+    store.put("ev00", b"\xe8\x03\x00\x00\x01\x00" + "aş".encode()[:2])
+    assert EventLog(store, capacity=4).events()[1] == (1000, 1, "a")
+
+def test_daily_write_load(device):
+    """
+    Ana döngünün bir ayı: günde 4 NTP ve 1 RSS senkronu (her biri persist_state), 2 olay. Karşılaştırma için
+    aynı durumun her senkronda JSON dosyası olarak baştan yazılması da hesaplanır; littlefs'te her yeniden yazma
+    en az bir 4 KB blok silip yazar, depo ise aynı bloğun sonuna 64 baytlık kayıtlar ekler.
+    """
+    main = device.main
+    from prayer_schedule import PrayerSchedule, ScheduleCache
+    instrumentation.reset()
+    days = 30
+    cache = ScheduleCache()
+    json_rewrites = 0
+    for day in range(days):
+        today, tomorrow = 20261001 + day, 20261002 + day
+        for sync in range(4):
+            now = 1790000000 + day * 86400 + sync * 21600
+            if sync == 0:
+                schedule = PrayerSchedule()
+                schedule.date = today
+                schedule.title = "%d Ekim 2026" % (day + 1)
+                for i in range(6):
+                    schedule.set(i, 5 + 3 * i, day % 60)
+                cache.put(0, schedule)
+                cache.prune(today)
+            main.persist_state(cache, 1, today, tomorrow, now, now - sync * 21600)
+            json_rewrites += 1 # Senkron zamanı her seferinde değişir
+        main.log_event(main.EVENT_NTP_FAIL, "gün %d" % day)
+        main.log_event(main.EVENT_RSS_FAIL, "hata %d" % day)
+    store = main.get_data_store()
+    per_day = store.bytes_written // days
+    count, total, peak, _ = instrumentation.get("logstore_write_ms")
+    assert store.compactions < count <= store.records_written # Her ekleme ve sıkıştırma için bir ölçüm
+    assert per_day <= 16 * RECORD_SIZE # Günde en fazla 16 kayıt (sıkıştırmalar dahil)
+    assert store.compactions <= days * 16 * RECORD_SIZE // store.compact_margin
+    assert os.path.getsize(main.DATA_STORE_FILE) <= main.DATA_STORE_MAX_BYTES
+    print()
+    print("%d gün: %d B/gün (%d kayıt, %d sıkıştırma), yazma ort=%d ms max=%d ms" %
+          (days, per_day, store.records_written, store.compactions, total // count, peak))
+    print("JSON dosyasını baştan yazma: %d yeniden yazma/gün, en az %d B/gün blok silme" %
+          (json_rewrites // days, json_rewrites // days * 4096))
@@ -0,0 +1,57 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# MemoryManager: MicroPython'un gc.mem_alloc/mem_free/threshold fonksiyonları sahte bir yığınla simüle edilir.
+# Saatlik toplama sayısı periyodik bellek raporunda kaydedilmeli ve konsola yazılmalı.
+import instrumentation
+import memory_manager
+
+class FakeGc:
+    def __init__(self, free=100000):
+        self.alloc = 0
+        self.free = free
+        self.thresholds = []
+
+    def mem_alloc(self):
+        return self.alloc
+
+    def mem_free(self):
+        return self.free
+
+    def threshold(self, value):
+        self.thresholds.append(value)
+
+    def collect(self):
+        self.alloc = 0
+
+def test_report_records_collections_per_hour(monkeypatch, capsys):
+    now = [0]
+    fake = FakeGc()
+    monkeypatch.setattr(memory_manager, "gc", fake)
+    monkeypatch.setattr(instrumentation, "ticks_ms", lambda: now[0])
+    instrumentation.reset()
+    memory = memory_manager.MemoryManager()
+    for _ in range(3):
+        now[0] += 600000 # 10 dakikada bir toplama
+        memory.collect()
+    fake.alloc = 5000
+    now[0] += 600000
+    memory.sample()
+    fake.alloc = 1000 # Ayrılan bellek azaldı: arada otomatik toplama olmuş
+    memory.sample()
+    assert memory.collections_per_hour() == 4 * 3600000 // 2400000
+    memory.report(12)
+    assert instrumentation.get("gc_collections_per_hour")[3] == 6
+    out = capsys.readouterr().out
+    assert "parçalanma %12" in out and "saatte 6 toplama" in out
+
+def test_report_skipped_without_heap_stats(monkeypatch, capsys):
+    monkeypatch.setattr(memory_manager, "gc", object())
+    instrumentation.reset()
+    memory = memory_manager.MemoryManager()
+    assert not memory.enabled
+    memory.report(0)
+    assert instrumentation.get("gc_collections_per_hour") is None
+    assert capsys.readouterr().out == ""
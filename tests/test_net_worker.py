@@ -0,0 +1,157 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# Mailbox ve NetWorker için CPython thread testleri (_thread CPython'da da var).
+import threading
+import time
+from net_worker import Mailbox, NetWorker
+
+def wait_until(condition, timeout=2.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if condition():
+            return True
+        time.sleep(0.001)
+    return condition()
+
+def drain(mailbox):
+    items = []
+    item = mailbox.get()
+    while item is not None:
+        items.append(item)
+        item = mailbox.get()
+    return items
+
+# --- Mailbox ---
+def test_ring_order_and_wrap():
+    box = Mailbox(3)
+    for round_start in (0, 10, 20): # Baş işaretçisi her turda farklı konumdan döner
+        box.put(round_start)
+        box.put(round_start + 1)
+        assert drain(box) == [round_start, round_start + 1]
+    assert box.dropped == 0
+
+def test_overflow_drops_oldest():
+    box = Mailbox(3)
+    dropped = [box.put(i) for i in range(5)]
+    assert dropped == [None, None, None, 0, 1]
+    assert box.dropped == 2
+    assert drain(box) == [2, 3, 4]
+    assert box.get() is None
+
+def test_cross_thread_post_take():
+    box = Mailbox(8)
+    producers, per_producer = 4, 2000
+    received = []
+    done = threading.Event()
+
+    def produce(n):
+        for i in range(per_producer):
+            box.put((n, i))
+            if i % 64 == 0:
+                time.sleep(0) # Tüketicinin araya girmesine izin ver
+
+    def consume():
+        while not done.is_set() or box._count:
+            item = box.get()
+            if item is None:
+                time.sleep(0)
+            else:
+                received.append(item)
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    threads = [threading.Thread(target=produce, args=(n,)) for n in range(producers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    done.set()
+    consumer.join()
+    # Kayıp yok: alınan + atılan = gönderilen; tekrar yok; her üreticinin sırası korunur
+    assert len(received) + box.dropped == producers * per_producer
+    assert len(set(received)) == len(received)
+    for n in range(producers):
+        own = [i for p, i in received if p == n]
+        assert own == sorted(own)
+
+# --- NetWorker ---
+def test_jobs_run_on_worker_thread():
+    worker = NetWorker()
+    worker.start()
+    main = threading.get_ident()
+    try:
+        assert worker.submit("ntp", threading.get_ident)
+        assert wait_until(worker.is_idle)
+        tag, ok, value = worker.poll()
+        assert (tag, ok) == ("ntp", True) and value != main
+    finally:
+        worker.stop()
+
+def test_failure_result_and_duplicate_kind():
+    worker = NetWorker()
+    gate = threading.Event()
+    def fail():
+        gate.wait(2)
+        raise OSError("baglanti yok")
+    worker.start()
+    try:
+        assert worker.submit(("rss", 0), fail)
+        assert not worker.submit(("rss", 1), fail) # Aynı tür bitmeden kabul edilmez
+        assert worker.is_pending("rss")
+        gate.set()
+        assert wait_until(worker.is_idle)
+        tag, ok, value = worker.poll()
+        assert tag == ("rss", 0) and not ok and isinstance(value, OSError)
+        assert worker.submit(("rss", 1), lambda: 1)
+    finally:
+        worker.stop()
+
+def test_request_overflow_releases_dropped_kind():
+    worker = NetWorker() # Başlatılmadı: işler kuyrukta birikir
+    for kind in ("a", "b", "c", "d", "e"):
+        assert worker.submit(kind, lambda: kind)
+    assert worker.requests.dropped == 1
+    assert not worker.is_pending("a") # Atılan iş bekliyor görünmez, tekrar gönderilebilir
+    worker.start()
+    try:
+        assert wait_until(worker.is_idle)
+        assert [r[0] for r in drain(worker.results)] == ["b", "c", "d", "e"]
+    finally:
+        worker.stop()
+
+def test_results_overflow_keeps_newest():
+    worker = NetWorker()
+    worker.start()
+    try:
+        for i in range(6):
+            assert worker.submit(i, lambda i=i: i)
+            assert wait_until(worker.is_idle)
+        assert [r[2] for r in drain(worker.results)] == [2, 3, 4, 5]
+        assert worker.results.dropped == 2
+    finally:
+        worker.stop()
+
+def test_shutdown():
+    worker = NetWorker()
+    worker.start()
+    gate = threading.Event()
+    assert worker.submit("wifi", gate.wait, 2)
+    worker.stop()
+    assert worker.alive # Çalışan iş bitmeden çıkılmaz
+    gate.set()
+    assert wait_until(lambda: not worker.alive)
+    assert worker.poll()[0] == "wifi"
+    # Durduktan sonra gönderilen iş çalışmaz, başka bir thread uyanmaz
+    assert worker.submit("ntp", lambda: 1)
+    time.sleep(0.05)
+    assert worker.poll() is None and worker.is_pending("ntp")
+
+def test_stop_while_idle():
+    worker = NetWorker()
+    worker.start()
+    assert wait_until(lambda: worker._wake.locked()) # İşçi kilitte bekliyor
+    worker.stop()
+    assert wait_until(lambda: not worker.alive)
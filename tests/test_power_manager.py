@@ -0,0 +1,82 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# PowerManager ekran politikası: vakit pencereleri, gece kapatma ve wake_panel ile mesaj gösterimi.
+import pytest
+import timing
+from prayer_schedule import PrayerSchedule
+from power_manager import PowerManager, estimate_daily_mah
+
+ISTANBUL = (341, 424, 764, 952, 1094, 1172)
+
+class FakeDisplay:
+    def __init__(self):
+        self.calls = []
+
+    def poweron(self):
+        self.calls.append("on")
+
+    def poweroff(self):
+        self.calls.append("off")
+
+    def contrast(self, value):
+        self.calls.append(value)
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [0]
+    monkeypatch.setattr(timing, "ticks_ms", lambda: now[0])
+    return now
+
+def schedule():
+    s = PrayerSchedule()
+    for i, m in enumerate(ISTANBUL):
+        s.minutes[i] = m
+    return s
+
+def test_panel_windows():
+    power = PowerManager()
+    s = schedule()
+    assert power.panel_state(s, 764 - 10) == (True, 0xFF) # Öğle'den 10 dk önce
+    assert power.panel_state(s, 764 + 19) == (True, 0xFF)
+    assert power.panel_state(s, 764 + 20) == (True, 0x10) # Pencere bitti: kısık
+    assert power.panel_state(s, 1172 + 20) == (False, 0) # Yatsı penceresinden sonra gece kapalı
+    assert power.panel_state(s, 2 * 60) == (False, 0) # Gece yarısından sonra da
+    assert power.panel_state(s, 341 - 10) == (True, 0xFF) # İmsâk penceresinde açılır
+    assert power.panel_state(None, 0) == (True, 0xFF) # Vakitler bilinmiyorsa tam parlak
+
+def test_apply_panel_sends_only_changes():
+    power, display, s = PowerManager(), FakeDisplay(), schedule()
+    assert power.apply_panel(display, s, 764)
+    assert power.apply_panel(display, s, 765)
+    assert not power.apply_panel(display, s, 1300)
+    assert power.apply_panel(display, s, 800)
+    assert display.calls == ["on", 0xFF, "off", "on", 0x10]
+
+def test_wake_panel_holds_full_brightness(clock):
+    power, display, s = PowerManager(), FakeDisplay(), schedule()
+    power.apply_panel(display, s, 1300) # Gece: kapalı
+    power.wake_panel(display, hold_ms=60000) # Örn: Wi-Fi koptu mesajı
+    assert display.calls == ["off", "on", 0xFF]
+    calls = len(display.calls)
+    clock[0] = 59000
+    assert power.apply_panel(display, s, 1301) # Süre dolmadan kapatılmaz
+    assert len(display.calls) == calls
+    clock[0] = 60000
+    assert not power.apply_panel(display, s, 1302) # Süre doldu: gece politikası geri gelir
+    assert display.calls[-1] == "off"
+
+def test_wake_panel_when_already_on(clock):
+    power, display, s = PowerManager(), FakeDisplay(), schedule()
+    power.apply_panel(display, s, 764)
+    power.wake_panel(display)
+    assert display.calls == ["on", 0xFF] # Zaten tam parlak: panele komut gönderilmez
+
+def test_power_policies_ordered():
+    s = schedule()
+    full = estimate_daily_mah(PowerManager(night_off=False, radio_off=False, cpu_scaling=False, lightsleep=False,
+                                           dim_contrast=0xFF), s)
+    saving = estimate_daily_mah(PowerManager(), s)
+    assert saving < full / 2
@@ -0,0 +1,198 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# PrayerEventDispatcher: donanım zamanlayıcısı ve RTC sanal olarak simüle edilir.
+# Zamanlayıcı gerçek geçen süreyle (hafif hızlı/yavaş ve birkaç ms gecikmeli) çalışır; RTC ise NTP ile
+# ileri/geri atlatılabilir. Her vaktin gecikmesi, yeni vakitlerle ve saat düzeltmesiyle yeniden kurma ve
+# kaçırılan vaktin tam bir kez tetiklenmesi kontrol edilir.
+import pytest
+import instrumentation
+from prayer_events import PrayerEventDispatcher, MAX_ARM_MS, MISSED_AFTER_MS, MS_PER_DAY
+from prayer_schedule import PrayerSchedule
+
+TIMES = ((5, 12), (6, 41), (13, 5), (16, 22), (19, 31), (20, 58))
+TOMORROW = ((5, 13), (6, 42), (13, 5), (16, 21), (19, 30), (20, 57))
+TIMER_LATE_MS = 2 # Geri çağrı zamanlayıcı süresinden bu kadar sonra çalışır
+
+def schedule(times):
+    s = PrayerSchedule()
+    for i, (hour, minute) in enumerate(times):
+        s.set(i, hour, minute)
+    return s
+
+def at(hour, minute, second=0):
+    return ((hour * 60 + minute) * 60 + second) * 1000
+
+class Sim:
+    """
+    mono: gerçek geçen süre (ms), zamanlayıcı buna göre çalışır. RTC = mono + offset (gün içinde).
+    drift: zamanlayıcının gerçek süreye oranı (<1 erken, >1 geç uyanır).
+    """
+    def __init__(self, start_ms, drift=1.0):
+        self.mono = 0
+        self.offset = start_ms
+        self.drift = drift
+        self.due = None
+        self.callback = None
+        self.inits = 0
+
+    # machine.Timer arayüzü
+    def init(self, mode=0, period=0, callback=None):
+        assert period >= 1
+        self.due = self.mono + max(1, int(period * self.drift)) + TIMER_LATE_MS
+        self.callback = callback
+        self.inits += 1
+
+    def deinit(self):
+        self.due = None
+
+    def clock(self):
+        return (self.mono + self.offset) % MS_PER_DAY
+
+    def run(self, ms):
+        """ms kadar gerçek süre ilerletir; zamanı gelen zamanlayıcı geri çağrıları sırayla çalışır."""
+        end = self.mono + ms
+        while self.due is not None and self.due <= end:
+            self.mono = self.due
+            self.due = None
+            self.callback(self)
+        self.mono = end
+
+    def run_until(self, rtc_ms):
+        self.run((rtc_ms - self.clock()) % MS_PER_DAY)
+
+    def step(self, ms):
+        """NTP düzeltmesi: RTC atlar, zamanlayıcı etkilenmez."""
+        self.offset += ms
+
+    def sleep(self, ms):
+        """lightsleep: RTC çalışır, donanım zamanlayıcısı durur (kalan süresi korunur)."""
+        if self.due is not None:
+            self.due += ms
+        self.mono += ms
+
+def dispatcher(sim):
+    fired = []
+    events = PrayerEventDispatcher(timer=sim, clock=sim.clock)
+    events.add_handler(lambda index: fired.append((index, sim.clock())))
+    return events, fired
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    instrumentation.reset()
+    yield
+    instrumentation.reset()
+
+@pytest.mark.parametrize("drift", [1.0, 0.999, 1.001])
+def test_latency_at_each_boundary(drift):
+    sim = Sim(at(0, 0, 7) + 123, drift)
+    today, tomorrow = schedule(TIMES), schedule(TOMORROW)
+    events, fired = dispatcher(sim)
+    events.arm(today, tomorrow)
+    sim.run(MS_PER_DAY + at(6, 0))
+    assert [index for index, _ in fired] == [0, 1, 2, 3, 4, 5, 0]
+    targets = [m * 60000 for m in today.minutes] + [tomorrow.minutes[0] * 60000]
+    # Hızlı zamanlayıcı erken uyanır ve kalanı için yeniden kurulur; yavaş olan en fazla son kurulumun payı kadar gecikir
+    bound = TIMER_LATE_MS + int(MAX_ARM_MS * max(0.0, drift - 1)) + 1
+    latencies = [(clock - target) % MS_PER_DAY for (_, clock), target in zip(fired, targets)]
+    assert all(0 <= late <= bound for late in latencies), latencies
+    count, _, peak, _ = instrumentation.get("prayer_event_latency_ms")
+    assert count == 7 and peak <= bound
+    assert events.fired == 7 and events.missed == 0
+    # Zamanlayıcı hiçbir zaman MAX_ARM_MS'den uzun kurulmaz: gün boyunca en az dakikada bir uyanış
+    assert sim.inits >= (MS_PER_DAY + at(6, 0)) // (MAX_ARM_MS * 2)
+
+@pytest.mark.parametrize("new_minute", [30, 20 + 60]) # Öğle 12:30'a alınır / 13:20'ye ertelenir
+def test_rearm_after_new_schedule(new_minute):
+    sim = Sim(at(12, 0))
+    events, fired = dispatcher(sim)
+    events.arm(schedule(TIMES))
+    sim.run(at(0, 10))
+    times = list(TIMES)
+    times[2] = (12 + new_minute // 60, new_minute % 60)
+    changed = schedule(times)
+    events.arm(changed)
+    sim.run_until(at(16, 0))
+    assert [index for index, _ in fired] == [2]
+    assert 0 <= fired[0][1] - changed.minutes[2] * 60000 <= TIMER_LATE_MS
+    assert events.index == 3
+
+@pytest.mark.parametrize("call_arm", [True, False])
+def test_rtc_step_back_before_event(call_arm):
+    # RTC 10 dk ileriydi; 12:58'de NTP geri alır. Vakit RTC 13:05'i gösterdiğinde girmeli, 10 dk erken değil
+    sim = Sim(at(12, 58))
+    events, fired = dispatcher(sim)
+    s = schedule(TIMES)
+    events.arm(s)
+    sim.run(1000)
+    sim.step(-at(0, 10))
+    if call_arm:
+        events.arm(s)
+    sim.run_until(at(13, 4, 59))
+    assert fired == []
+    sim.run_until(at(13, 30))
+    assert len(fired) == 1 and fired[0][0] == 2
+    assert 0 <= fired[0][1] - at(13, 5) <= TIMER_LATE_MS + 1
+
+@pytest.mark.parametrize("call_arm", [True, False])
+def test_rtc_step_forward_past_event(call_arm):
+    # RTC 90 sn geriydi; 13:04'te ileri alınınca vakit 30 sn geride kalır: kaybolmaz, bir kez tetiklenir
+    sim = Sim(at(13, 4))
+    events, fired = dispatcher(sim)
+    s = schedule(TIMES)
+    events.arm(s)
+    sim.run(10)
+    sim.step(90000)
+    behind = sim.clock() - at(13, 5)
+    if call_arm:
+        events.arm(s)
+        events.arm(s) # Art arda yeniden kurma aynı vakti iki kez tetiklememeli
+    sim.run_until(at(16, 30))
+    assert [index for index, _ in fired] == [2, 3]
+    late = fired[0][1] - at(13, 5)
+    assert behind <= late <= behind + (TIMER_LATE_MS + 1 if call_arm else MAX_ARM_MS + TIMER_LATE_MS)
+    assert events.missed == 0
+
+def test_rtc_step_back_after_event_does_not_refire():
+    # Öğle girdikten 20 sn sonra NTP saati 1 dk geri alır ve vakitler yeniden kurulur
+    sim = Sim(at(13, 4, 50))
+    events, fired = dispatcher(sim)
+    s = schedule(TIMES)
+    events.arm(s)
+    sim.run_until(at(13, 5, 20))
+    assert [index for index, _ in fired] == [2]
+    sim.step(-60000)
+    events.arm(s)
+    sim.run_until(at(16, 30))
+    assert [index for index, _ in fired] == [2, 3]
+
+@pytest.mark.parametrize("rearm", [True, False])
+def test_missed_during_sleep_fires_once(rearm):
+    # lightsleep zamanlayıcıyı 90 sn durdurur; vakit uykuda geçer
+    sim = Sim(at(13, 4, 30))
+    events, fired = dispatcher(sim)
+    events.arm(schedule(TIMES))
+    sim.run(1000)
+    sim.sleep(90000)
+    if rearm:
+        events.rearm()
+    sim.run_until(at(16, 30))
+    assert [index for index, _ in fired] == [2, 3]
+    assert 0 < fired[0][1] - at(13, 5) < MISSED_AFTER_MS
+    assert events.fired == 2 and events.missed == 0
+    assert instrumentation.get("prayer_events")[0] == 2
+
+def test_event_beyond_missed_window_counted_once():
+    # Tetiklenmeden MISSED_AFTER_MS'den fazla geçen vakit işleyiciye gönderilmez, bir kez "kaçırıldı" sayılır
+    sim = Sim(at(13, 4, 30))
+    events, fired = dispatcher(sim)
+    events.arm(schedule(TIMES))
+    sim.run(1000)
+    sim.sleep(at(0, 10))
+    events.rearm()
+    sim.run_until(at(16, 30))
+    assert [index for index, _ in fired] == [3]
+    assert events.missed == 1
+    assert instrumentation.get("prayer_events_missed")[0] == 1
@@ -0,0 +1,168 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# RefreshScheduler: gün dönümü, yayın gecikmesi, üstel bekleme ve sapma sınırları, yarının ön çekimi.
+# Ana döngü 10 sn'lik adımlarla günlerce simüle edilir; besleme yeni günü belirli bir dakikada yayınlar.
+import random
+import pytest
+import timing
+from prayer_schedule import PrayerSchedule
+from refresh_scheduler import RefreshScheduler, FETCH_TODAY, FETCH_TOMORROW, date_key, next_date_key
+
+DAY_KEYS = [date_key(2026, 10, 19 + i) for i in range(8)]
+STEP_SECONDS = 10
+
+class SimTicks:
+    def __init__(self):
+        self.ticks = 0
+
+    def advance(self, ms):
+        self.ticks += ms
+
+    def ticks_ms(self):
+        return self.ticks
+
+@pytest.fixture
+def ticks(monkeypatch):
+    ticks = SimTicks()
+    monkeypatch.setattr(timing, "ticks_ms", ticks.ticks_ms)
+    return ticks
+
+def schedule_for(key):
+    schedule = PrayerSchedule()
+    schedule.date = key
+    for i in range(6):
+        schedule.set(i, 5 + 3 * i, 0)
+    return schedule
+
+class Feed:
+    """Aynı adresten o an yayınlanan günü veren besleme. switch_minute: yeni güne geçtiği dakika (eksi: gece yarısından önce)."""
+    def __init__(self, switch_minute):
+        self.switch_minute = switch_minute
+
+    def fetch(self, absolute_minute):
+        return schedule_for(DAY_KEYS[(absolute_minute - self.switch_minute) // 1440])
+
+def simulate(ticks, scheduler, feed, start_minute, end_minute):
+    """Ana döngü gibi rollover, due ve on_result çağırır. [(mutlak dakika, tür)] çekim listesi döndürür."""
+    fetches = []
+    rollovers = []
+    for second in range(start_minute * 60, end_minute * 60, STEP_SECONDS):
+        minute = second // 60
+        day, minute_of_day = divmod(minute, 1440)
+        today_key, tomorrow_key = DAY_KEYS[day], DAY_KEYS[day + 1]
+        if scheduler.rollover(today_key):
+            rollovers.append(minute)
+        kind = scheduler.due(today_key, minute_of_day)
+        if kind is not None:
+            fetches.append((minute, kind))
+            scheduler.on_result(kind, feed.fetch(minute), today_key, tomorrow_key)
+        ticks.advance(STEP_SECONDS * 1000)
+    return fetches, rollovers
+
+def per_day(fetches, days):
+    counts = [0] * days
+    for minute, _ in fetches:
+        counts[minute // 1440] += 1
+    return counts
+
+def test_next_date_key_month_and_year_end():
+    assert next_date_key(2026, 10, 19) == 20261020
+    assert next_date_key(2026, 10, 31) == 20261101
+    assert next_date_key(2026, 12, 31) == 20270101
+    assert next_date_key(2028, 2, 28) == 20280229
+
+def test_one_fetch_per_day(ticks):
+    # DailyRSS gece yarısından 2 dk sonra yeni güne geçer; cihaz öğlen açılır ve 3 gün çalışır
+    scheduler = RefreshScheduler()
+    fetches, _ = simulate(ticks, scheduler, Feed(2), 12 * 60, 4 * 1440)
+    assert per_day(fetches, 4) == [1, 1, 1, 1]
+    assert [minute % 1440 for minute, _ in fetches] == [12 * 60, 5, 5, 5]
+    assert all(kind == FETCH_TODAY for _, kind in fetches)
+    assert scheduler.fetch_count == 4 and scheduler.failures == 0
+    assert scheduler.current.date == DAY_KEYS[3]
+
+def test_publish_delay(ticks):
+    scheduler = RefreshScheduler(publish_delay_minutes=5)
+    assert scheduler.due(DAY_KEYS[0], 0) == FETCH_TODAY # Elde hiç vakit yoksa beklenmez
+    scheduler.on_result(FETCH_TODAY, schedule_for(DAY_KEYS[0]), DAY_KEYS[0], DAY_KEYS[1])
+    assert scheduler.due(DAY_KEYS[0], 600) is None
+    # Gün dönümünden sonraki ilk 5 dk dünün vakitleriyle devam edilir
+    for minute in range(5):
+        assert scheduler.due(DAY_KEYS[1], minute) is None
+    assert scheduler.due(DAY_KEYS[1], 5) == FETCH_TODAY
+
+def test_midnight_rollover_uses_stored_tomorrow(ticks):
+    scheduler = RefreshScheduler()
+    scheduler.current = schedule_for(DAY_KEYS[0])
+    scheduler.tomorrow = schedule_for(DAY_KEYS[1]) # Örneğin kalıcı depodan yüklenmiş
+    assert not scheduler.rollover(DAY_KEYS[0])
+    assert scheduler.rollover(DAY_KEYS[1])
+    assert scheduler.current.date == DAY_KEYS[1] and scheduler.tomorrow is None
+    assert scheduler.due(DAY_KEYS[1], 5) is None
+    # Yanlış güne ait yarın verisi devreye alınmaz
+    scheduler.tomorrow = schedule_for(DAY_KEYS[3])
+    assert not scheduler.rollover(DAY_KEYS[2])
+    assert scheduler.due(DAY_KEYS[2], 5) == FETCH_TODAY
+
+def test_backoff_and_jitter_bounds(ticks):
+    base, cap = 30, 3600
+    seen = {}
+    for seed in range(200):
+        random.seed(seed)
+        scheduler = RefreshScheduler(base_backoff_seconds=base, max_backoff_seconds=cap)
+        for failure in range(10):
+            scheduler.on_result(FETCH_TODAY, None, DAY_KEYS[0], DAY_KEYS[1])
+            delay = min(base << failure, cap)
+            wait = scheduler.retry_deadline.remaining_ms() // 1000
+            assert delay <= wait <= delay + delay // 2
+            assert scheduler.due(DAY_KEYS[0], 600) is None # Bekleme dolmadan tekrar denenmez
+            seen.setdefault(failure, set()).add(wait)
+    assert scheduler.failures == 10
+    # Sapma gerçekten dağılıyor (aynı anda açılan cihazlar sunucuya aynı saniyede gitmesin)
+    assert all(len(waits) > 10 for waits in seen.values())
+
+def test_backoff_expires_and_success_resets(ticks):
+    random.seed(1)
+    scheduler = RefreshScheduler()
+    scheduler.on_result(FETCH_TODAY, None, DAY_KEYS[0], DAY_KEYS[1])
+    scheduler.on_result(FETCH_TODAY, None, DAY_KEYS[0], DAY_KEYS[1])
+    ticks.advance(scheduler.retry_deadline.remaining_ms() - 1)
+    assert scheduler.due(DAY_KEYS[0], 600) is None
+    ticks.advance(1)
+    assert scheduler.due(DAY_KEYS[0], 600) == FETCH_TODAY
+    assert scheduler.on_result(FETCH_TODAY, schedule_for(DAY_KEYS[0]), DAY_KEYS[0], DAY_KEYS[1])
+    assert scheduler.failures == 0 and scheduler.retry_deadline is None
+
+def test_late_feed_is_retried_with_backoff(ticks):
+    # Besleme yeni güne 00:40'ta geçer: 00:05'ten itibaren artan aralıklarla denenir, saat başı dolmadan alınır
+    random.seed(3)
+    scheduler = RefreshScheduler()
+    scheduler.current = schedule_for(DAY_KEYS[0])
+    fetches, _ = simulate(ticks, scheduler, Feed(40), 1440 - 60, 2 * 1440)
+    minutes = [minute - 1440 for minute, _ in fetches]
+    assert minutes[0] == 5 and 40 <= minutes[-1] < 60
+    assert len(fetches) <= 8
+    gaps = [b - a for a, b in zip(minutes, minutes[1:])]
+    assert gaps == sorted(gaps) # Aralıklar büyür
+    assert scheduler.current.date == DAY_KEYS[1] and scheduler.failures == 0
+
+def test_prefetch_next_day(ticks):
+    # Yarını 23:00'te yayınlayan kaynak: 23:30'daki ön çekim yeterli, gece yarısı ağa çıkılmaz
+    scheduler = RefreshScheduler(prefetch_minute=23 * 60 + 30)
+    fetches, rollovers = simulate(ticks, scheduler, Feed(-60), 12 * 60, 4 * 1440)
+    assert per_day(fetches, 4) == [2, 1, 1, 1]
+    assert fetches[0] == (12 * 60, FETCH_TODAY)
+    assert all(kind == FETCH_TOMORROW and minute % 1440 == 23 * 60 + 30 for minute, kind in fetches[1:])
+    assert rollovers == [1440, 2 * 1440, 3 * 1440] # Yeni gün tam gece yarısında, çekim beklemeden
+    assert scheduler.current.date == DAY_KEYS[3] and scheduler.tomorrow.date == DAY_KEYS[4]
+
+def test_prefetch_on_daily_feed_is_tried_once(ticks):
+    # DailyRSS 23:30'da hâlâ bugünü verir: ön çekim atılır, aynı gün tekrar denenmez, 00:05 çekimi yine yapılır
+    scheduler = RefreshScheduler(prefetch_minute=23 * 60 + 30)
+    fetches, rollovers = simulate(ticks, scheduler, Feed(2), 12 * 60, 3 * 1440)
+    assert per_day(fetches, 3) == [2, 2, 2]
+    assert [kind for minute, kind in fetches if minute % 1440 == 5] == [FETCH_TODAY, FETCH_TODAY]
+    assert rollovers == [] and scheduler.tomorrow is None
@@ -0,0 +1,98 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# Bayt tarayıcı (rss_scanner) ile düzenli ifade yolu (parse_rss_regex) karşılaştırması:
+# kayıtlı beslemelerde aynı sonucu verdikleri ve tarayıcının gövdeyi kopyalamadığı (tepe bellek) doğrulanır.
+# Ölçümler için: python -m pytest tests/test_rss_scanner.py -s
+import os
+import sys
+import tracemalloc
+import pytest
+from conftest import FEEDS
+from prayer_schedule import PrayerSchedule
+from feed_parsers import parse_rss, parse_rss_regex
+from feed_bench import SAMPLE_RSS, SAMPLE_EXPECTED, mutations
+
+def recorded_rss():
+    return sorted(name for name in os.listdir(FEEDS) if name.endswith(".rss"))
+
+def read_feed(name):
+    with open(os.path.join(FEEDS, name), "rb") as f:
+        return f.read()
+
+def run(parser, body):
+    schedule = PrayerSchedule()
+    title = parser(body, schedule)
+    return title, tuple(schedule.minutes)
+
+def alloc_profile(parser, body):
+    """
+    (tepe bayt, ayrılan blok) döndürür; ölçümden önce bir kez ısınma çağrısı yapılır.
+    Tepe: tracemalloc ile çağrı sırasındaki en yüksek ek bellek.
+    Blok: her satır olayında sys.getallocatedblocks() artışlarının toplamı. İzleyicinin kendi tuttuğu tamsayı
+    düşülür; aynı satırda ayrılıp bırakılan nesneler görünmez, bu yüzden değer bir alt sınırdır.
+    """
+    schedule = PrayerSchedule()
+    parser(body, schedule)
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        parser(body, schedule)
+        peak = tracemalloc.get_traced_memory()[1] - start
+    finally:
+        tracemalloc.stop()
+    state = [0, 0] # ayrılan blok, son okunan sayı
+    def tracer(frame, event, arg):
+        grown = sys.getallocatedblocks() - state[1] - 1
+        if grown > 0:
+            state[0] += grown
+        state[1] = sys.getallocatedblocks()
+        return tracer
+    state[1] = sys.getallocatedblocks()
+    sys.settrace(tracer)
+    try:
+        parser(body, schedule)
+    finally:
+        sys.settrace(None)
+    return peak, state[0]
+
+def padded(body, size):
+    """<item>'dan önce size baytlık yorum eklenmiş gövde (kanal açıklaması uzun olan beslemeler gibi)."""
+    return body.replace(b"<item>", b"<!-- " + b"x" * size + b" --><item>", 1)
+
+@pytest.mark.parametrize("name", recorded_rss())
+def test_recorded_feeds_agree(name):
+    body = read_feed(name)
+    title, minutes = run(parse_rss, body)
+    assert (title, minutes) == run(parse_rss_regex, body)
+    assert title == "19 Ekim 2026 Pazartesi"
+
+@pytest.mark.parametrize("name,body", mutations(SAMPLE_RSS))
+def test_mutations_match_reference(name, body):
+    assert run(parse_rss, body)[1] == SAMPLE_EXPECTED
+
+def test_gap_limit():
+    # _MAX_GAP'ten uzun ayraçta saat okunmaz (açıklamanın başka yerindeki bir saat yanlış vakte yazılmasın)
+    body = SAMPLE_RSS.replace(b" : 05:41", b" :" + b" " * 80 + b"05:41")
+    assert run(parse_rss, body)[1][0] == 0xFFFF
+
+def test_allocation_benchmark():
+    rows = []
+    for name in recorded_rss():
+        body = read_feed(name)
+        for label, sample in ((name, body), (name + " x25", padded(body, 24 * len(body)))):
+            scan_peak, scan_blocks = alloc_profile(parse_rss, sample)
+            regex_peak, regex_blocks = alloc_profile(parse_rss_regex, sample)
+            rows.append((label, len(sample), scan_peak, scan_blocks, regex_peak, regex_blocks))
+            # Düzenli ifade yolu gövdenin en az bir str kopyasını oluşturur
+            assert regex_peak >= len(sample)
+            assert scan_blocks < regex_blocks
+        # Tarayıcının tepe belleği gövde boyundan bağımsızdır (kopya yok; sadece başlık ve memoryview)
+        assert rows[-1][2] - rows[-2][2] < 256
+    print()
+    print("%-30s %6s %10s %10s %10s %10s" % ("besleme", "bayt", "tara tepe", "tara blok", "regex tepe", "regex blok"))
+    for row in rows:
+        print("%-30s %6d %10d %10d %10d %10d" % row)
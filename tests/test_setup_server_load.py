@@ -0,0 +1,269 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# Kurulum sunucusu için yük ve dayanıklılık testi. Cihazdaki kurulum döngüsü
+# (NamazVakti5.main.start_ap_mode_and_web_server, istekler handle_setup_request ile) network/machine
+# taklitleriyle çalıştırılır; gerçek TCP soketleri üzerinden eşzamanlı, yavaş (slowloris), parça parça ve
+# aşırı büyük istekler gönderilir. Her senaryo için verim, p50/p99 gecikme, kopan bağlantı ve bellek tepe
+# değeri ölçülür. Sınırlar (tests/baselines/setup_server_load.json) makineden bağımsız olsun diye orandır:
+# verim, gecikme ve bellek aynı döngüye tek istemcili sıralı isteklerle yapılan kalibrasyona oranlanır;
+# yavaş istemcilerin belirlediği gecikmeler ise istek zaman aşımının (REQUEST_TIMEOUT_MS) katı olarak ölçülür.
+# Rapor için: python -m pytest tests/test_setup_server_load.py -s
+# Sınırları yeniden yazmak için: UPDATE_BASELINE=1 python -m pytest tests/test_setup_server_load.py
+import json
+import os
+import select
+import socket
+import threading
+import time
+import tracemalloc
+import pytest
+import instrumentation
+from device_stubs import SetupLoop
+from setup_server import read_request, send_response, RequestError
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "setup_server_load.json")
+REQUEST_TIMEOUT_MS = 400 # Test süresi için cihazdaki 3000 ms yerine
+GET = b"GET / HTTP/1.1\r\nHost: 192.168.4.1\r\nUser-Agent: yuk-testi\r\n\r\n"
+
+def request(address, payload, fragment=0, delay=0.0, read_timeout=5.0):
+    """İsteği gönderir, yanıtın durum kodunu ve süresini (ms) döndürür; yanıt alınamazsa durum None."""
+    started = time.monotonic()
+    try:
+        conn = socket.create_connection(address, timeout=read_timeout)
+    except OSError:
+        return None, (time.monotonic() - started) * 1000
+    data = b""
+    try:
+        if fragment:
+            for i in range(0, len(payload), fragment):
+                conn.sendall(payload[i:i + fragment])
+                if delay:
+                    time.sleep(delay)
+        else:
+            conn.sendall(payload)
+        while True:
+            chunk = conn.recv(4096)
+            if not chunk:
+                break
+            data += chunk
+    except OSError:
+        pass # Yanıtın gelen kısmı aşağıda değerlendirilir
+    finally:
+        conn.close()
+    elapsed = (time.monotonic() - started) * 1000
+    if not data.startswith(b"HTTP/1.1 "):
+        return None, elapsed
+    return int(data[9:12]), elapsed
+
+def slowloris(address, hold_s):
+    """Başlıkları baytı baytına ve hiç bitirmeden gönderir; sunucunun kapatmasını bekler."""
+    started = time.monotonic()
+    try:
+        conn = socket.create_connection(address, timeout=5)
+    except OSError:
+        return None, 0
+    status = None
+    try:
+        for byte in GET[:-2]: # Son satır sonu gönderilmez
+            conn.send(bytes((byte,)))
+            readable, _, _ = select.select([conn], [], [], hold_s / len(GET))
+            if readable:
+                break # Sunucu zaman aşımı yanıtı gönderdi
+        data = conn.recv(4096)
+        if data.startswith(b"HTTP/1.1 "):
+            status = int(data[9:12])
+    except OSError:
+        pass # Sunucu yanıt vermeden kapattı
+    finally:
+        conn.close()
+    return status, (time.monotonic() - started) * 1000
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else 0
+
+def run_clients(jobs):
+    """jobs: [(fonksiyon, argümanlar), ...] her biri ayrı thread'de; (durum, ms) listesi döndürür."""
+    results = [None] * len(jobs)
+    def worker(i, func, args):
+        results[i] = func(*args)
+    threads = [threading.Thread(target=worker, args=(i, func, args)) for i, (func, args) in enumerate(jobs)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+def repeat(address, count, payload, **kwargs):
+    return [request(address, payload, **kwargs) for _ in range(count)]
+
+def flatten(results):
+    flat = []
+    for item in results:
+        flat.extend(item if isinstance(item, list) else [item])
+    return flat
+
+# --- Senaryolar: (ölçülen istemci sonuçları, beklenen durum kodları) ---
+def scenario_concurrency(address):
+    # listen(5) + işlenen bağlantı: 6 istemci kuyruğa sığar (fazlası SYN tekrarıyla ~1 sn bekler)
+    results = flatten(run_clients([(repeat, (address, 25, GET))] * 6))
+    return results, results, {200}
+
+def scenario_slowloris(address):
+    jobs = [(slowloris, (address, 2.0))] * 3 + [(repeat, (address, 10, GET))] * 4
+    results = run_clients(jobs)
+    slow, normal = results[:3], flatten(results[3:])
+    # Yavaş istemciler sunucuyu kilitlememeli: her biri zaman aşımıyla 408 alır, diğerleri hizmet görür
+    assert [status for status, _ in slow] == [408, 408, 408]
+    assert all(ms < 2000 for _, ms in slow)
+    return normal, slow + normal, {200, 408}
+
+def scenario_fragmented(address):
+    # Tam form kaydedilir ve yeniden başlatma istenir (taklitte DeviceReset; döngü çalışmaya devam eder)
+    post_body = b"ssid=Ev+Agi&password=gizli%21&rss_url=http%3A%2F%2Fnamazvakti.com%2FDailyRSS.php"
+    post = (b"POST / HTTP/1.1\r\nHost: 192.168.4.1\r\nContent-Type: application/x-www-form-urlencoded\r\n"
+            b"Content-Length: %d\r\n\r\n" % len(post_body)) + post_body
+    probe = b"GET /generate_204 HTTP/1.1\r\nHost: connectivitycheck.gstatic.com\r\n\r\n"
+    jobs = []
+    for fragment in (1, 3, 7, 16):
+        jobs.append((repeat, (address, 5, post), {"fragment": fragment, "delay": 0.001}))
+        jobs.append((repeat, (address, 5, probe), {"fragment": fragment, "delay": 0.001}))
+    results = flatten(run_clients([(lambda f, a, k: f(*a, **k), job) for job in jobs]))
+    return results, results, {200, 302}
+
+def scenario_oversized(address):
+    big_header = b"GET / HTTP/1.1\r\nHost: 192.168.4.1\r\nCookie: " + b"a" * 4096 + b"\r\n\r\n"
+    big_body = (b"POST / HTTP/1.1\r\nHost: 192.168.4.1\r\nContent-Type: application/x-www-form-urlencoded\r\n"
+                b"Content-Length: 65536\r\n\r\n" + b"x" * 512)
+    no_end = b"GET / HTTP/1.1\r\nHost: 192.168.4.1\r\n" + b"X-Dolgu: " + b"b" * 3000 # Başlık sonu hiç gelmez
+    jobs = [(repeat, (address, 10, big_header))] * 2 + [(repeat, (address, 10, big_body))] * 2 + [(repeat, (address, 10, no_end))]
+    results = run_clients(jobs)
+    statuses = [status for status, _ in flatten(results[:2])], [status for status, _ in flatten(results[2:4])]
+    # Aşırı büyük istekler gövde beklenmeden reddedilir
+    assert set(statuses[0]) <= {431, None} and set(statuses[1]) <= {413, None}
+    assert set(status for status, _ in results[4]) <= {431, None}
+    results = flatten(results)
+    return results, results, {413, 431}
+
+SCENARIOS = {
+    "concurrency": scenario_concurrency,
+    "slowloris": scenario_slowloris,
+    "fragmented": scenario_fragmented,
+    "oversized": scenario_oversized,
+}
+
+# Gecikmesi yavaş istemcilerin zaman aşımıyla belirlenen senaryolar; diğerlerinde birim kalibrasyon p50'sidir
+TIMEOUT_BOUND = ("fragmented", "slowloris")
+
+def calibrate(address, count=40):
+    """Tek istemcili sıralı GET'ler: bu makinedeki (verim, p50 ms, bellek tepe değeri KB)."""
+    repeat(address, 5, GET) # İlk isteklerdeki modül yüklemeleri ölçüme girmesin
+    tracemalloc.start()
+    try:
+        started = time.monotonic()
+        results = repeat(address, count, GET)
+        wall = time.monotonic() - started
+        heap_peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert all(status == 200 for status, _ in results)
+    return count / wall, percentile([ms for _, ms in results], 50), heap_peak / 1024.0
+
+def measure(name, loop):
+    base_rps, base_p50, base_heap = calibrate(loop.address)
+    tracemalloc.start()
+    try:
+        started = time.monotonic()
+        timed, results, expected = SCENARIOS[name](loop.address)
+        wall = time.monotonic() - started
+        heap_peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    latencies = [ms for status, ms in timed if status is not None]
+    dropped = sum(1 for status, _ in results if status is None)
+    unexpected = sorted(set(status for status, _ in results if status is not None) - expected)
+    p50, p99 = percentile(latencies, 50), percentile(latencies, 99)
+    unit = REQUEST_TIMEOUT_MS if name in TIMEOUT_BOUND else max(base_p50, 0.1)
+    return {
+        "requests": len(results),
+        "throughput_rps": round(len(timed) / wall, 1),
+        "p50_ms": round(p50, 1),
+        "p99_ms": round(p99, 1),
+        "base_rps": round(base_rps, 1),
+        "base_p50_ms": round(base_p50, 2),
+        "throughput_ratio": round(len(timed) / wall / base_rps, 3),
+        "p50_ratio": round(p50 / unit, 2),
+        "p99_ratio": round(p99 / unit, 2),
+        "heap_ratio": round(heap_peak / 1024.0 / max(base_heap, 1.0), 2),
+        "dropped": dropped,
+        "heap_peak_kb": round(heap_peak / 1024.0, 1),
+        "unexpected_status": unexpected,
+        "server_dropped": (instrumentation.get("web_dropped") or (0,))[0],
+    }
+
+def load_baseline():
+    with open(BASELINE) as f:
+        return json.load(f)
+
+def write_baseline(name, metrics):
+    """Ölçülen oranlardan pay bırakılmış sınırlar (zamanlama gürültüsüne karşı 4 kat, bellek için 2 kat)."""
+    try:
+        baseline = load_baseline()
+    except (OSError, ValueError):
+        baseline = {}
+    baseline[name] = {
+        "latency_unit": "request_timeout" if name in TIMEOUT_BOUND else "calibration_p50",
+        "min_throughput_ratio": round(metrics["throughput_ratio"] / 4, 3),
+        "max_p50_ratio": round(max(metrics["p50_ratio"] * 4, 1), 2),
+        "max_p99_ratio": round(max(metrics["p99_ratio"] * 4, 2), 2),
+        "max_dropped": metrics["dropped"],
+        "max_heap_ratio": round(max(metrics["heap_ratio"] * 2, 2), 2),
+    }
+    with open(BASELINE, "w", newline="\r\n") as f: # Depodaki diğer dosyalar gibi CRLF
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+@pytest.mark.parametrize("name", sorted(SCENARIOS))
+def test_load(name, device, monkeypatch):
+    instrumentation.reset()
+    loop = SetupLoop(device, monkeypatch, REQUEST_TIMEOUT_MS)
+    try:
+        metrics = measure(name, loop)
+    finally:
+        loop.stop()
+    print("\n%-12s %s" % (name, " ".join("%s=%s" % item for item in sorted(metrics.items()))))
+    assert metrics["unexpected_status"] == []
+    assert metrics["server_dropped"] == 0
+    if os.environ.get("UPDATE_BASELINE"):
+        write_baseline(name, metrics)
+        return
+    limits = load_baseline()[name]
+    assert limits["latency_unit"] == ("request_timeout" if name in TIMEOUT_BOUND else "calibration_p50")
+    assert metrics["throughput_ratio"] >= limits["min_throughput_ratio"]
+    assert metrics["p50_ratio"] <= limits["max_p50_ratio"]
+    assert metrics["p99_ratio"] <= limits["max_p99_ratio"]
+    assert metrics["dropped"] <= limits["max_dropped"]
+    assert metrics["heap_ratio"] <= limits["max_heap_ratio"]
+
+def test_read_request_over_socketpair():
+    # Sunucu döngüsü olmadan: parçalı istek, tam yanıt ve zaman aşımı
+    server, client = socket.socketpair()
+    try:
+        client.sendall(b"POST /kaydet HTTP/1.1\r\nContent-Length: 5\r\n")
+        client.sendall(b"Content-Type: application/x-www-form-urlencoded\r\n\r\nab")
+        client.sendall(b"cde")
+        req = read_request(server, REQUEST_TIMEOUT_MS)
+        assert (req.method, req.path, req.body) == ("POST", "/kaydet", b"abcde")
+        assert req.headers["content-type"] == "application/x-www-form-urlencoded"
+        send_response(server, 204)
+        assert client.recv(1024).startswith(b"HTTP/1.1 204 No Content\r\n")
+        client.sendall(b"GET / HTTP/1.1\r\n") # Başlık sonu gelmez
+        with pytest.raises(RequestError) as error:
+            read_request(server, 100)
+        assert error.value.status == 408
+    finally:
+        server.close()
+        client.close()
@@ -0,0 +1,140 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# timing: ticks_ms tekdüze ilerlerken duvar saati (NTP düzeltmesi gibi) saatlerce ileri/geri atlatılır.
+# Deadline ve Interval etkilenmemeli; karşılaştırma için time.time() tabanlı eski yöntem de simüle edilir.
+# MicroPython'daki gibi ticks 2^30'da taşar; simülasyon taşmanın hemen öncesinden başlar.
+# Jitter raporu için: python -m pytest tests/test_timing.py -s
+import random
+import time
+import pytest
+import instrumentation
+import timing
+from timing import Deadline, Interval
+
+TICKS_PERIOD = 1 << 30
+
+class SimClock:
+    def __init__(self, ticks, wall):
+        self.ticks = ticks
+        self.wall = wall
+
+    def advance(self, ms):
+        self.ticks = (self.ticks + ms) % TICKS_PERIOD
+        self.wall += ms / 1000.0
+
+    def step_wall(self, seconds):
+        self.wall += seconds # Sadece duvar saati atlar, ticks tekdüze kalır
+
+    def ticks_ms(self):
+        return self.ticks
+
+    def time(self):
+        return self.wall
+
+def ticks_diff(new, old):
+    # MicroPython time.ticks_diff: işaretli, TICKS_PERIOD/2 aralığına katlanır
+    return ((new - old + TICKS_PERIOD // 2) % TICKS_PERIOD) - TICKS_PERIOD // 2
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) % TICKS_PERIOD
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimClock(TICKS_PERIOD - 20 * 60 * 1000, 1792386000.0) # Taşmaya 20 dk kala
+    monkeypatch.setattr(timing, "ticks_ms", clock.ticks_ms)
+    monkeypatch.setattr(timing, "ticks_diff", ticks_diff)
+    monkeypatch.setattr(timing, "ticks_add", ticks_add)
+    monkeypatch.setattr(time, "time", clock.time)
+    instrumentation.reset()
+    return clock
+
+class WallInterval:
+    """036 öncesi yöntem: time.time() farkıyla aralık."""
+    def __init__(self, period_ms):
+        self.period_s = period_ms / 1000.0
+        self.last = time.time()
+
+    def due(self):
+        if time.time() - self.last >= self.period_s:
+            self.last = time.time()
+            return True
+        return False
+
+# Simüle edilen süre ve duvar saati atlamaları: (simülasyonun kaçıncı saniyesinde, kaç saniye); periyotların ortasında
+HOURS = 6
+STEPS = ((3900, 3 * 3600), (7500, -5 * 3600), (14700, 30 * 60), (18300, -2 * 3600))
+
+def simulate(clock, period_ms, seed=1):
+    """1 sn'lik döngü (0-300 ms iş) boyunca her iki aralığın tetiklenme anlarını (simülasyon ms) döndürür."""
+    rng = random.Random(seed)
+    interval = Interval(period_ms, "sim")
+    wall = WallInterval(period_ms)
+    steps = dict(STEPS)
+    fired, wall_fired = [], []
+    now_ms = 0
+    for second in range(HOURS * 3600):
+        if second in steps:
+            clock.step_wall(steps[second])
+        work = rng.randrange(0, 300)
+        clock.advance(work)
+        now_ms += work
+        if interval.due():
+            fired.append(now_ms)
+        if wall.due():
+            wall_fired.append(now_ms)
+        clock.advance(1000 - work)
+        now_ms += 1000 - work
+    return fired, wall_fired
+
+def test_interval_ignores_wall_clock_steps(clock):
+    period_ms = 10 * 60 * 1000
+    fired, wall_fired = simulate(clock, period_ms)
+    # Her tetiklemede sayaç o andan yeniden başladığı için döngü gecikmesi birikir (en fazla 1 sn/periyot)
+    assert HOURS * 3600 * 1000 // (period_ms + 1000) <= len(fired) <= HOURS * 3600 * 1000 // period_ms
+    gaps = [b - a for a, b in zip([0] + fired, fired)]
+    # Her tetikleme bir periyot sonra, en fazla bir döngü (1 sn + iş süresindeki fark) gecikmeyle
+    assert all(period_ms <= gap < period_ms + 1300 for gap in gaps)
+    count, total, peak, last = instrumentation.get("sim_jitter_ms")
+    assert count == len(fired) and peak < 1300
+    # Duvar saatine dayalı yöntem ileri atlamada erken tetiklenir, geri atlamada saatlerce susar
+    ends = wall_fired + [HOURS * 3600 * 1000] # Son tetiklemeden simülasyon sonuna kadar geçen süre de sayılır
+    wall_gaps = [b - a for a, b in zip([0] + ends, ends)]
+    assert min(wall_gaps) < period_ms // 2
+    assert max(wall_gaps) > 4 * 3600 * 1000
+    print()
+    print("Interval %d dk, %d saat, duvar saati atlamaları: %s" % (period_ms // 60000, HOURS,
+          ", ".join("%+d dk" % (s // 60) for _, s in STEPS)))
+    print("ticks tabanlı : %3d tetikleme, jitter ort=%d ms max=%d ms, aralık %d..%d ms" %
+          (count, total // count, peak, min(gaps), max(gaps)))
+    print("time() tabanlı: %3d tetikleme, aralık %d..%d ms" % (len(wall_fired), min(wall_gaps), max(wall_gaps)))
+
+def test_deadline_across_steps_and_wrap(clock):
+    deadline = Deadline(30 * 60 * 1000) # Taşmanın öbür tarafında dolar
+    elapsed = 0
+    for second in range(40 * 60):
+        if second == 60:
+            clock.step_wall(-3 * 3600)
+        elif second == 600:
+            clock.step_wall(6 * 3600)
+        if deadline.expired():
+            break
+        assert deadline.remaining_ms() == 30 * 60 * 1000 - elapsed
+        clock.advance(1000)
+        elapsed += 1000
+    assert elapsed == 30 * 60 * 1000
+
+def test_expire_and_restart(clock):
+    interval = Interval(60000, "sim", expired=True)
+    assert interval.due() # İlk çağrı beklemez
+    assert not interval.due()
+    clock.advance(30000)
+    interval.expire()
+    assert interval.due() and interval.remaining_ms() == 60000
+    interval.restart(already_elapsed_ms=50000)
+    clock.step_wall(-7200)
+    clock.advance(10000)
+    assert interval.due()
+    assert instrumentation.get("sim_jitter_ms")[0] == 1 # expire() ile tetikleme gecikme kaydetmez
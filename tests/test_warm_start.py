@@ -0,0 +1,160 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# warm_start: RTC belleği ve watchdog dışarıdan verilerek bilgisayarda sıcak başlangıç özeti testleri.
+# Sıcak başlangıçta Wi-Fi'nin sabit IP ile bağlanıp DHCP'ye dönmesi NamazVakti5.main.main_loop üzerinden denenir.
+import sys
+import time
+import pytest
+import timing
+from prayer_schedule import PrayerSchedule
+from warm_start import encode_snapshot, save_snapshot, load_snapshot, clear_snapshot, is_warm_reset, Supervisor
+
+TODAY = 20261019
+
+class FakeRTC:
+    """machine.RTC().memory() gibi: argümanla yazar, argümansız okur."""
+    def __init__(self):
+        self.data = b""
+
+    def memory(self, data=None):
+        if data is None:
+            return self.data
+        self.data = bytes(data)
+
+class FakeWDT:
+    def __init__(self):
+        self.fed = 0
+
+    def feed(self):
+        self.fed += 1
+
+def schedule(date, title="19 Ekim 2026 Pazartesi", minutes=(341, 424, 764, 952, 1094, 1172)):
+    s = PrayerSchedule()
+    s.date = date
+    s.title = title
+    for i, m in enumerate(minutes):
+        s.minutes[i] = m
+    return s
+
+def test_module_does_not_import_machine():
+    assert "machine" not in sys.modules
+    assert not is_warm_reset() # machine yok: soğuk başlangıç sayılır
+
+def test_round_trip():
+    rtc = FakeRTC()
+    ifconfig = ("192.168.1.40", "255.255.255.0", "192.168.1.1", "1.1.1.1")
+    save_snapshot(encode_snapshot([schedule(TODAY), None, schedule(TODAY, "İkinci Şehir")],
+                                  1792370000, 1792371000, ifconfig), rtc)
+    snapshot = load_snapshot(rtc, TODAY)
+    assert snapshot["last_ntp_time"] == 1792370000 and snapshot["last_rss_time"] == 1792371000
+    assert snapshot["ifconfig"] == ifconfig
+    first, missing, second = snapshot["schedules"]
+    assert missing is None
+    assert first.date == TODAY and tuple(first.minutes) == (341, 424, 764, 952, 1094, 1172)
+    assert first.title == "19 Ekim 2026 Paz" # TITLE_BYTES (16) bayta kesilir
+    assert second.title == "İkinci Şehir"
+
+def test_title_cut_on_character_boundary():
+    rtc = FakeRTC()
+    title = "aaaaaaaaaaaaaaaş" # 15 + 2 bayt: 'ş' ortadan bölünmemeli
+    save_snapshot(encode_snapshot([schedule(TODAY, title)]), rtc)
+    assert load_snapshot(rtc, TODAY)["schedules"][0].title == "a" * 15
+
+def test_crc_corruption_rejected():
+    rtc = FakeRTC()
+    data = bytearray(encode_snapshot([schedule(TODAY)], 1, 2))
+    for offset in (5, len(data) // 2, len(data) - 1): # Başlık, şehir kaydı ve CRC'nin kendisi
+        corrupted = bytearray(data)
+        corrupted[offset] ^= 0x01
+        rtc.memory(corrupted)
+        assert load_snapshot(rtc, TODAY) is None
+    rtc.memory(data[:-3]) # Yarım yazılmış
+    assert load_snapshot(rtc, TODAY) is None
+    rtc.memory(b"")
+    assert load_snapshot(rtc, TODAY) is None
+
+def test_stale_snapshot_ignored():
+    rtc = FakeRTC()
+    save_snapshot(encode_snapshot([schedule(20261018)], 1, 2), rtc)
+    assert load_snapshot(rtc, TODAY) is None
+    assert load_snapshot(rtc)["schedules"][0].date == 20261018 # Gün verilmezse olduğu gibi döner
+
+def test_stale_secondary_city_dropped():
+    rtc = FakeRTC()
+    save_snapshot(encode_snapshot([schedule(TODAY), schedule(20261018, "Eski")]), rtc)
+    schedules = load_snapshot(rtc, TODAY)["schedules"]
+    assert schedules[0].date == TODAY and schedules[1] is None
+
+def test_clear():
+    rtc = FakeRTC()
+    save_snapshot(encode_snapshot([schedule(TODAY)]), rtc)
+    clear_snapshot(rtc)
+    assert load_snapshot(rtc, TODAY) is None
+
+def test_supervisor_uses_injected_wdt():
+    wdt = FakeWDT()
+    supervisor = Supervisor(90, wdt)
+    supervisor.feed()
+    supervisor.feed()
+    assert wdt.fed == 2
+    Supervisor(0).feed() # Watchdog kapalı: machine gerekmez
+
+class WifiReady(Exception):
+    """Wi-Fi bağlandıktan sonra main_loop'u durdurur."""
+
+WARM_IFCONFIG = ("192.168.1.40", "255.255.255.0", "192.168.1.1", "1.1.1.1")
+
+@pytest.fixture
+def warm_device(device, monkeypatch):
+    """Watchdog reset'i sonrası açılan cihaz: RTC belleğinde bugünün vakitleri ve önceki IP ayarları var."""
+    ticks = [0]
+    def sleep(seconds):
+        ticks[0] += int(seconds * 1000)
+    monkeypatch.setattr(timing, "ticks_ms", lambda: ticks[0])
+    monkeypatch.setattr(time, "sleep", sleep)
+    monkeypatch.setattr(time, "sleep_ms", lambda ms: sleep(ms / 1000.0), raising=False)
+    device.reset_cause = 3 # machine.WDT_RESET
+    device.rtc_memory = encode_snapshot([schedule(TODAY)], 1792370000, 1792371000, WARM_IFCONFIG)
+    def stop(config):
+        raise WifiReady()
+    monkeypatch.setattr(device.main, "new_rss_scheduler", stop) # Wi-Fi bağlantısından hemen sonra çağrılır
+    return device
+
+def sta_calls(device, *names):
+    return [call for call in device.wlan(0).calls if call[0] in names]
+
+def test_warm_connect_returns_to_dhcp(warm_device):
+    with pytest.raises(WifiReady):
+        warm_device.main.main_loop()
+    assert sta_calls(warm_device, "ifconfig", "connect") == [
+        ("ifconfig", WARM_IFCONFIG), ("connect", "Bilal", {}), ("ifconfig", "dhcp")]
+    assert warm_device.wlan(0).static is None and not warm_device.main.wifi_static_ip
+
+def test_failed_warm_connect_retries_with_dhcp(warm_device):
+    warm_device.connect_failures = 1
+    with pytest.raises(WifiReady):
+        warm_device.main.main_loop()
+    assert sta_calls(warm_device, "ifconfig", "connect") == [
+        ("ifconfig", WARM_IFCONFIG), ("connect", "Bilal", {}), ("ifconfig", "dhcp"), ("connect", "Bilal", {})]
+    assert warm_device.wlan(0).static is None
+
+def test_dhcp_restored_on_next_main_loop(warm_device):
+    # Bağlandıktan sonra DHCP'ye dönüş hata verdi: sonraki main_loop (örn. Wi-Fi koptu) bağlanmadan önce tekrar dener
+    warm_device.dhcp_errors = 1
+    with pytest.raises(WifiReady):
+        warm_device.main.main_loop()
+    assert warm_device.wlan(0).static == WARM_IFCONFIG and warm_device.main.wifi_static_ip
+    warm_device.wlan(0).calls = []
+    with pytest.raises(WifiReady):
+        warm_device.main.main_loop() # warm_snapshot ilk çağrıda tüketildi
+    assert sta_calls(warm_device, "ifconfig", "connect") == [("ifconfig", "dhcp"), ("connect", "Bilal", {})]
+    assert warm_device.wlan(0).static is None
+
+def test_cold_boot_never_touches_ifconfig(warm_device):
+    warm_device.reset_cause = 1 # machine.PWRON_RESET: RTC belleği kullanılmaz
+    with pytest.raises(WifiReady):
+        warm_device.main.main_loop()
+    assert sta_calls(warm_device, "ifconfig") == []
@@ -0,0 +1,82 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# time.ticks_ms tabanlı zaman aşımı ve aralık ölçümü. NTP saati değiştirse de etkilenmez.
+# Duvar saati (time.time) sadece namaz vakitleri ve kalıcı kayıtlardaki zaman damgaları için kullanılır.
+import time
+import instrumentation
+from instrumentation import ticks_ms, ticks_diff
+
+try:
+    ticks_add = time.ticks_add
+except AttributeError:
+    def ticks_add(ticks, delta):
+        return ticks + delta
+
+# ticks_diff sadece TICKS_PERIOD/2 (MicroPython'da ~6.2 gün) altındaki farkları doğru hesaplar
+MAX_INTERVAL_MS = (1 << 29) - 1
+
+def elapsed_ms(start):
+    """start (ticks_ms değeri) anından bu yana geçen milisaniye (taşma güvenli)."""
+    return ticks_diff(ticks_ms(), start)
+
+class Deadline:
+    """Belirli bir süre sonra dolan zaman aşımı."""
+    __slots__ = ("_end",)
+
+    def __init__(self, timeout_ms):
+        self.reset(timeout_ms)
+
+    def reset(self, timeout_ms):
+        self._end = ticks_add(ticks_ms(), min(int(timeout_ms), MAX_INTERVAL_MS))
+
+    def expired(self):
+        return ticks_diff(ticks_ms(), self._end) >= 0
+
+    def remaining_ms(self):
+        return max(0, ticks_diff(self._end, ticks_ms()))
+
+class Interval:
+    """
+    Periyodik işler için aralık sayacı. due() süre dolduğunda bir kez True döner ve sayacı yeniden başlatır.
+    name verilirse, işin gecikmesi (planlanan andan sonra geçen süre) "<name>_jitter_ms" olarak kaydedilir.
+    """
+    __slots__ = ("period_ms", "name", "_start", "_expired")
+
+    def __init__(self, period_ms, name=None, expired=False):
+        self.period_ms = min(int(period_ms), MAX_INTERVAL_MS)
+        self.name = name
+        self._start = ticks_ms()
+        self._expired = expired # True ise ilk due() beklemeden tetiklenir
+
+    def restart(self, already_elapsed_ms=0):
+        """Sayacı şimdiden (veya already_elapsed_ms kadar önceden) başlatır."""
+        already_elapsed_ms = min(max(0, int(already_elapsed_ms)), self.period_ms)
+        self._start = ticks_add(ticks_ms(), -already_elapsed_ms)
+        self._expired = False
+
+    def expire(self):
+        """Bir sonraki due() çağrısında tetiklenmesini sağlar."""
+        self._expired = True
+
+    def elapsed_ms(self):
+        return ticks_diff(ticks_ms(), self._start)
+
+    def remaining_ms(self):
+        if self._expired:
+            return 0
+        return max(0, self.period_ms - self.elapsed_ms())
+
+    def due(self):
+        if self._expired:
+            self.restart()
+            return True
+        late = self.elapsed_ms() - self.period_ms
+        if late < 0:
+            return False
+        if self.name is not None:
+            instrumentation.record(self.name + "_jitter_ms", late)
+        self.restart()
+        return True
@@ -0,0 +1,144 @@
+# --- ************************** ---
+# ---                            ---
+# ---     Bilal Emiroglu 2025    ---
+# ---                            ---
+# --- ************************** ---
+# RTC belleğinde tutulan durum özeti ve donanım watchdog'u ile hızlı (sıcak) yeniden başlatma.
+# Watchdog veya yazılımsal reset sonrası vakitler ağa çıkmadan RTC belleğinden geri yüklenir.
+# machine sadece gerektiğinde içe aktarılır: RTC ve WDT nesneleri dışarıdan verilebilir (bilgisayarda test)
+import struct
+from prayer_schedule import PrayerSchedule, VAKIT_SAYISI, TITLE_BYTES, encode_title
+
+try:
+    from binascii import crc32
+except ImportError:
+    from ubinascii import crc32
+
+_MAGIC = b"NV"
+_VERSION = 2 # 2: Wi-Fi kanalı çıkarıldı (ESP32'de WLAN.connect kanal almaz, geri yüklemede kullanılmıyordu)
+MAX_CITIES = 4
+
+# Başlık: sihirli sayı, sürüm, şehir sayısı, son NTP zamanı, son RSS zamanı, ifconfig (4 x IPv4)
+_HEADER = "<2sBBII16s"
+# Şehir kaydı: gün anahtarı, 6 vakit (dakika), tarih başlığı
+_CITY = "<I%dH%ds" % (VAKIT_SAYISI, TITLE_BYTES)
+_HEADER_SIZE = struct.calcsize(_HEADER)
+_CITY_SIZE = struct.calcsize(_CITY)
+
+def _pack_ip(ip):
+    parts = ip.split(".")
+    if len(parts) != 4:
+        return b"\x00\x00\x00\x00"
+    return bytes(int(p) & 0xFF for p in parts)
+
+def _unpack_ip(raw):
+    return "%d.%d.%d.%d" % (raw[0], raw[1], raw[2], raw[3])
+
+def encode_snapshot(schedules, last_ntp_time=0, last_rss_time=0, ifconfig=None):
+    """Durumu RTC belleğine sığacak kompakt bir bayt dizisine çevirir (sonunda CRC32)."""
+    schedules = schedules[:MAX_CITIES]
+    ifconfig_raw = b"".join(_pack_ip(ip) for ip in ifconfig) if ifconfig else bytes(16)
+    data = bytearray(struct.pack(_HEADER, _MAGIC, _VERSION, len(schedules),
+                                 last_ntp_time, last_rss_time, ifconfig_raw))
+    for schedule in schedules:
+        if schedule is None:
+            data.extend(bytes(_CITY_SIZE))
+            continue
+        data.extend(struct.pack(_CITY, schedule.date, *(list(schedule.minutes) + [encode_title(schedule.title)])))
+    data.extend(struct.pack("<I", crc32(data) & 0xFFFFFFFF))
+    return bytes(data)
+
+def decode_snapshot(data):
+    """
+    encode_snapshot çıktısını çözer. Bozuk veya eski sürümse None döndürür.
+    Dönüş: {"schedules": [...], "last_ntp_time", "last_rss_time", "ifconfig"}
+    """
+    if len(data) < _HEADER_SIZE + 4:
+        return None
+    magic, version, count, last_ntp_time, last_rss_time, ifconfig_raw = struct.unpack_from(_HEADER, data, 0)
+    if magic != _MAGIC or version != _VERSION or count > MAX_CITIES:
+        return None
+    end = _HEADER_SIZE + count * _CITY_SIZE
+    if len(data) < end + 4:
+        return None
+    if struct.unpack_from("<I", data, end)[0] != crc32(data[:end]) & 0xFFFFFFFF:
+        return None
+    schedules = []
+    for i in range(count):
+        fields = struct.unpack_from(_CITY, data, _HEADER_SIZE + i * _CITY_SIZE)
+        if fields[0] == 0:
+            schedules.append(None)
+            continue
+        schedule = PrayerSchedule()
+        schedule.date = fields[0]
+        for index in range(VAKIT_SAYISI):
+            schedule.minutes[index] = fields[1 + index]
+        schedule.title = fields[1 + VAKIT_SAYISI].rstrip(b"\x00").decode()
+        schedules.append(schedule)
+    ifconfig = None
+    if ifconfig_raw != bytes(16):
+        ifconfig = tuple(_unpack_ip(ifconfig_raw[i:i + 4]) for i in range(0, 16, 4))
+    return {
+        "schedules": schedules,
+        "last_ntp_time": last_ntp_time,
+        "last_rss_time": last_rss_time,
+        "ifconfig": ifconfig,
+    }
+
+def _rtc(rtc):
+    if rtc is not None:
+        return rtc
+    import machine
+    return machine.RTC()
+
+def save_snapshot(snapshot_bytes, rtc=None):
+    """Özeti RTC belleğine yazar (flash değil, yıpranma yok)."""
+    _rtc(rtc).memory(snapshot_bytes)
+
+def load_snapshot(rtc=None, today_key=0):
+    """
+    RTC belleğindeki özeti okur. today_key verilirse başka güne ait şehir vakitleri atılır;
+    bugüne ait hiç vakit kalmadıysa özet eskimiş sayılır ve None döner.
+    """
+    try:
+        snapshot = decode_snapshot(_rtc(rtc).memory())
+    except Exception as e:
+        print("RTC belleğindeki durum okunamadı: %s" % e)
+        return None
+    if snapshot is None or not today_key:
+        return snapshot
+    schedules = snapshot["schedules"]
+    for i in range(len(schedules)):
+        if schedules[i] is not None and schedules[i].date != today_key:
+            schedules[i] = None
+    if not schedules or schedules[0] is None:
+        print("RTC belleğindeki durum eski, kullanılmıyor.")
+        return None
+    return snapshot
+
+def clear_snapshot(rtc=None):
+    _rtc(rtc).memory(b"")
+
+def is_warm_reset():
+    """RTC belleği ve saatin korunduğu (watchdog veya yazılımsal) bir reset mi?"""
+    try:
+        import machine
+        return machine.reset_cause() in (machine.WDT_RESET, machine.SOFT_RESET)
+    except (ImportError, AttributeError):
+        return False
+
+class Supervisor:
+    """
+    Donanım watchdog'unu yönetir. Ana döngü ve uzun bekleyen yerler feed() çağırır;
+    döngü bir soket çağrısında takılırsa cihaz resetlenir ve sıcak başlangıçla devam eder.
+    timeout_seconds 0 ise watchdog başlatılmaz. wdt verilirse (test) machine.WDT yerine o kullanılır.
+    """
+    def __init__(self, timeout_seconds, wdt=None):
+        self.wdt = wdt
+        if wdt is None and timeout_seconds > 0:
+            import machine
+            self.wdt = machine.WDT(timeout=timeout_seconds * 1000)
+
+    def feed(self):
+        if self.wdt is not None:
+            self.wdt.feed()